@@ -0,0 +1,92 @@
+# analysis/downsample.py
+
+import numpy as np
+import pandas as pd
+
+
+def bucket_starts(n, max_buckets):
+    """
+    Splits n bars into at most max_buckets runs of equal size, anchored on the last bar so only
+    the oldest run can be partial.
+
+    Returns:
+        tuple: (starts, size) - first bar position of each run, and the run size.
+    """
+    size = max(-(-n // max_buckets), 1)
+    count = -(-n // size)
+    starts = n - size * np.arange(count, 0, -1)
+    starts[0] = 0
+    return starts, size
+
+
+def downsample_ohlc(df, max_bars):
+    """
+    Aggregates candles into coarser buckets: first open, highest high, lowest low, last close and
+    total volume, so every wick of the full-resolution data is still drawn at its true price.
+
+    Each bucket is placed at the midpoint of the times of its first and last bar, so overlays drawn
+    at full-resolution times fall within the candle that contains them.
+
+    Args:
+        df (pd.DataFrame): Bars with a DatetimeIndex and Open/High/Low/Close(/Volume) columns.
+        max_bars (int): Maximum number of candles to return; None keeps every bar.
+
+    Returns:
+        tuple: (pd.DataFrame, int) - the downsampled bars and the number of bars per candle
+        (1 if df is returned unchanged).
+    """
+    n = len(df)
+    if not max_bars or n <= max_bars:
+        return df, 1
+    starts, size = bucket_starts(n, max_bars)
+    ends = np.append(starts[1:], n) - 1
+    times = pd.DatetimeIndex(df.index).values
+    index = pd.DatetimeIndex(times[starts] + (times[ends] - times[starts]) // 2)
+    candles = pd.DataFrame({
+        'Open': df['Open'].to_numpy()[starts],
+        'High': np.fmax.reduceat(df['High'].to_numpy(dtype=np.float64), starts),
+        'Low': np.fmin.reduceat(df['Low'].to_numpy(dtype=np.float64), starts),
+        'Close': df['Close'].to_numpy()[ends],
+    }, index=index)
+    if 'Volume' in df:
+        candles['Volume'] = np.add.reduceat(df['Volume'].to_numpy(), starts)
+    return candles, size
+
+
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets: picks threshold points of a line that keep its visual shape.
+    The first and last points are always kept; every bucket in between keeps the point forming
+    the largest triangle with the previously kept point and the mean of the next bucket.
+
+    Args:
+        x (array-like): Increasing x values (e.g. bar positions or epoch times).
+        y (array-like): Line values.
+        threshold (int): Number of points to keep.
+
+    Returns:
+        np.ndarray: Sorted positions of the kept points (all positions if there are no more than threshold).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (threshold - 2)
+    bounds = (np.arange(threshold - 1) * every).astype(np.int64) + 1
+    bounds[-1] = n - 1
+    bounds = np.append(bounds, n)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0] = 0
+    kept[-1] = n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end, next_end = bounds[i], bounds[i + 1], bounds[i + 2]
+        mean_x = x[end:next_end].mean()
+        mean_y = y[end:next_end].mean()
+        areas = np.abs((x[previous] - mean_x) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (mean_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        kept[i + 1] = previous
+    return kept
@@ -0,0 +1,183 @@
+# analysis/fvg.py
+
+import numpy as np
+
+
+BULLISH = 1
+BEARISH = -1
+
+# Lifecycle states, see fvg_states
+FVG_OPEN = 0  # Price has not traded into the gap yet
+FVG_MITIGATED = 1  # Price traded into the gap; it has contracted to the unfilled part
+FVG_VIOLATED = 2  # Price moved through the far edge of the gap
+
+
+def _sparse_table(values, reduce):
+    """
+    Builds a sparse table: level k holds reduce(values[j:j + 2**k]) for every j.
+    """
+    levels = [values]
+    span = 1
+    while span * 2 <= len(values):
+        previous = levels[-1]
+        levels.append(reduce(previous[:-span], previous[span:]))
+        span *= 2
+    return levels
+
+
+def _first_crossing(levels, start, threshold, below, inclusive):
+    """
+    Finds, for every query, the first index j >= start where the values cross the threshold.
+
+    Uses binary lifting over the sparse table, vectorized across all queries, so the cost is
+    O(len(start) * log n).
+
+    Args:
+        levels (list): Sparse table of running minima (below=True) or maxima (below=False).
+        start (np.ndarray): First index to test per query.
+        threshold (np.ndarray): Threshold per query.
+        below (bool): Look for values below the threshold (else above).
+        inclusive (bool): Count touching the threshold as a crossing.
+
+    Returns:
+        np.ndarray: Index of the first crossing per query, or n where there is none.
+    """
+    n = len(levels[0])
+    position = start.copy()
+    for k in range(len(levels) - 1, -1, -1):
+        span = 1 << k
+        fits = position + span <= n
+        block = levels[k][np.where(fits, position, 0)]
+        if below:
+            clear = block > threshold if inclusive else block >= threshold
+        else:
+            clear = block < threshold if inclusive else block <= threshold
+        position = np.where(fits & clear, position + span, position)
+    return position
+
+
+def _range_reduce(levels, start, stop, reduce, empty):
+    """
+    Computes reduce(values[start:stop]) per query in O(1) from the sparse table; empty ranges give `empty`.
+    """
+    length = stop - start
+    valid = length > 0
+    k = np.zeros(len(start), dtype=np.int64)
+    k[valid] = np.floor(np.log2(length[valid])).astype(np.int64)
+    result = np.full(len(start), empty, dtype=np.float64)
+    for level in np.unique(k[valid]):
+        rows = valid & (k == level)
+        span = 1 << int(level)
+        values = levels[int(level)]
+        result[rows] = reduce(values[start[rows]], values[stop[rows] - span])
+    return result
+
+
+def detect_fvgs(high, low, close, close_only=False):
+    """
+    Detects Fair Value Gaps and tracks their lifecycle in a single vectorized pass.
+
+    A bullish gap opens at bar i when the previous high is below the current low, leaving the
+    zone [high[i-1], low[i]] untraded; a bearish gap opens when the previous low is above the
+    current high. After a gap opens:
+      - it is mitigated at the first bar that trades into the zone (wick touch),
+      - it contracts as price fills it: the remaining zone is the part no later bar traded into,
+      - it is violated at the first bar that moves through the far edge. With close_only the bar
+        must close beyond the edge; otherwise a wick beyond it is enough.
+
+    Gap detection is O(n); lifecycle queries use sparse tables, O((n + gaps) log n) overall.
+
+    Args:
+        high (array-like): High prices.
+        low (array-like): Low prices.
+        close (array-like): Close prices.
+        close_only (bool): Violate gaps on closes only instead of wicks.
+
+    Returns:
+        dict: Arrays with one entry per gap, ordered by the bar that created it:
+            - 'index': Bar index that created the gap.
+            - 'direction': BULLISH (1) or BEARISH (-1).
+            - 'top', 'bottom': Original gap bounds.
+            - 'mitigated_index': First bar that traded into the gap, or -1.
+            - 'violated_index': First bar that moved through the far edge, or -1.
+            - 'remaining_top', 'remaining_bottom': Unfilled part of the gap up to its violation
+              (or the last bar while it is still active).
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    n = len(high)
+
+    bullish = np.flatnonzero(high[:-1] < low[1:]) + 1
+    bearish = np.flatnonzero(low[:-1] > high[1:]) + 1
+
+    index = np.concatenate([bullish, bearish]).astype(np.int64)
+    direction = np.concatenate([
+        np.full(len(bullish), BULLISH, dtype=np.int8),
+        np.full(len(bearish), BEARISH, dtype=np.int8),
+    ])
+    top = np.concatenate([low[bullish], low[bearish - 1]])
+    bottom = np.concatenate([high[bullish - 1], high[bearish]])
+    mitigated_index = np.full(len(index), n, dtype=np.int64)
+    violated_index = np.full(len(index), n, dtype=np.int64)
+    remaining_top = top.copy()
+    remaining_bottom = bottom.copy()
+
+    if len(bullish):
+        rows = slice(0, len(bullish))
+        start = bullish + 1
+        low_min = _sparse_table(low, np.minimum)
+        mitigated_index[rows] = _first_crossing(low_min, start, top[rows], below=True, inclusive=True)
+        violation_levels = _sparse_table(close, np.minimum) if close_only else low_min
+        violated_index[rows] = _first_crossing(violation_levels, start, bottom[rows], below=True, inclusive=False)
+        # Lowest wick while the gap was active, clipped to the gap
+        filled_to = _range_reduce(low_min, start, violated_index[rows], np.minimum, np.inf)
+        remaining_top[rows] = np.clip(filled_to, bottom[rows], top[rows])
+
+    if len(bearish):
+        rows = slice(len(bullish), len(index))
+        start = bearish + 1
+        high_max = _sparse_table(high, np.maximum)
+        mitigated_index[rows] = _first_crossing(high_max, start, bottom[rows], below=False, inclusive=True)
+        violation_levels = _sparse_table(close, np.maximum) if close_only else high_max
+        violated_index[rows] = _first_crossing(violation_levels, start, top[rows], below=False, inclusive=False)
+        filled_to = _range_reduce(high_max, start, violated_index[rows], np.maximum, -np.inf)
+        remaining_bottom[rows] = np.clip(filled_to, bottom[rows], top[rows])
+
+    # A bar that violates a gap also trades into it
+    mitigated_index = np.minimum(mitigated_index, violated_index)
+    mitigated_index[mitigated_index == n] = -1
+    violated_index[violated_index == n] = -1
+
+    order = np.argsort(index, kind='stable')
+    return {
+        'index': index[order],
+        'direction': direction[order],
+        'top': top[order],
+        'bottom': bottom[order],
+        'mitigated_index': mitigated_index[order],
+        'violated_index': violated_index[order],
+        'remaining_top': remaining_top[order],
+        'remaining_bottom': remaining_bottom[order],
+    }
+
+
+def fvg_states(fvgs, at_index=None):
+    """
+    Returns the lifecycle state of every gap as of a bar.
+
+    Args:
+        fvgs (dict): Result of detect_fvgs.
+        at_index (int): Bar to evaluate the state at. Defaults to the last bar.
+
+    Returns:
+        np.ndarray: FVG_OPEN, FVG_MITIGATED or FVG_VIOLATED per gap.
+    """
+    mitigated = fvgs['mitigated_index']
+    violated = fvgs['violated_index']
+    if at_index is None:
+        at_index = np.iinfo(np.int64).max
+    states = np.full(len(fvgs['index']), FVG_OPEN, dtype=np.int8)
+    states[(mitigated >= 0) & (mitigated <= at_index)] = FVG_MITIGATED
+    states[(violated >= 0) & (violated <= at_index)] = FVG_VIOLATED
+    return states
@@ -0,0 +1,444 @@
+# analysis/incremental.py
+#
+# Keeps the state of the mxwll indicator for one ticker so that new bars can be absorbed without
+# recomputing the whole history. The state covers the ticker's full history; IndicatorState.update
+# (new_bars, start) returns the same MxwllResult as compute_mxwll(all bars seen so far, start=start).
+
+from bisect import bisect_left
+
+import numpy as np
+import pandas as pd
+
+from analysis.fvg import BEARISH, BULLISH
+from analysis.mxwll_engine import (
+    ENGINE_VERSION, MxwllResult, compute_mxwll, frequency_settings, slice_result, wilder_atr
+)
+from analysis.pivots import detect_pivots
+
+
+OHLCV_COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+FVG_DTYPES = {
+    'index': np.int64, 'direction': np.int8, 'top': np.float64, 'bottom': np.float64,
+    'mitigated_index': np.int64, 'violated_index': np.int64, 'remaining_top': np.float64, 'remaining_bottom': np.float64,
+}
+
+
+def _true_range(high, low, previous_close):
+    return np.maximum.reduce([high - low, np.abs(high - previous_close), np.abs(low - previous_close)])
+
+
+def _stamps(index):
+    return pd.DatetimeIndex(index).values.astype('datetime64[ns]')
+
+
+def _from(positions, start):
+    # Tail of sorted bar positions, from the first one at or after start
+    return positions[np.searchsorted(positions, start):]
+
+
+class _Buffer:
+    """
+    Growable array: values are appended into spare capacity that doubles when full, so n appends
+    cost O(n) overall instead of a full copy each.
+    """
+
+    def __init__(self, values=(), dtype=np.float64):
+        values = np.asarray(values, dtype=dtype)
+        self._data = np.empty(max(2 * len(values), 16), dtype=dtype)
+        self._data[:len(values)] = values
+        self.size = len(values)
+
+    def __len__(self):
+        return self.size
+
+    def __getstate__(self):
+        # Keep some spare capacity, so the bars of the next runs are appended without a copy
+        data = np.zeros(self.size + self.size // 8 + 16, dtype=self._data.dtype)
+        data[:self.size] = self.values
+        return {'_data': data, 'size': self.size}
+
+    @property
+    def values(self):
+        """
+        View of the stored values. Appending may move the data, so do not keep it across extend().
+        """
+        return self._data[:self.size]
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._data.dtype)
+        end = self.size + len(values)
+        if end > len(self._data):
+            grown = np.empty(max(end, 2 * len(self._data)), dtype=self._data.dtype)
+            grown[:self.size] = self.values
+            self._data = grown
+        self._data[self.size:end] = values
+        self.size = end
+
+    def truncate(self, size):
+        self.size = min(self.size, size)
+
+
+class _StructureTracker:
+    """
+    Per-bar form of analysis.structure.detect_structure: the tracked pivot level of each side,
+    the events so far and the order blocks still waiting to be mitigated or violated.
+    """
+
+    def __init__(self, sensitivity, order_blocks):
+        self.sensitivity = sensitivity
+        self.order_blocks = order_blocks
+        self.tracked = {BULLISH: None, BEARISH: None}  # Side -> [pivot bar, broken]
+        self.events = {key: [] for key in ('index', 'direction', 'pivot', 'level', 'choch')}
+        self.blocks = {key: [] for key in ('index', 'direction', 'top', 'bottom', 'break_index', 'mitigated_index', 'violated_index')}
+        self.open_blocks = []  # Positions in self.blocks not yet violated
+
+    @classmethod
+    def from_structure(cls, structure, pivot_highs, pivot_lows, sensitivity, order_blocks):
+        tracker = cls(sensitivity, order_blocks)
+        for key, values in structure['events'].items():
+            tracker.events[key] = values.tolist()
+        for key, values in structure['order_blocks'].items():
+            tracker.blocks[key] = values.tolist()
+        tracker.open_blocks = [i for i, violated in enumerate(tracker.blocks['violated_index']) if violated < 0]
+        for side, pivots in ((BULLISH, pivot_highs), (BEARISH, pivot_lows)):
+            if len(pivots):
+                pivot = int(pivots[-1])
+                broken = any(p == pivot and d == side for p, d in zip(tracker.events['pivot'], tracker.events['direction']))
+                tracker.tracked[side] = [pivot, broken]
+        return tracker
+
+    def advance(self, j, high, low, close, confirmed_high, confirmed_low):
+        """
+        Processes bar j. confirmed_high/low is the pivot confirmed at this bar (pivot + sensitivity == j), or None.
+        """
+        if confirmed_high is not None:
+            self.tracked[BULLISH] = [confirmed_high, False]
+        if confirmed_low is not None:
+            self.tracked[BEARISH] = [confirmed_low, False]
+
+        # Blocks created before this bar
+        still_open = []
+        for i in self.open_blocks:
+            top, bottom = self.blocks['top'][i], self.blocks['bottom'][i]
+            if self.blocks['direction'][i] == BULLISH:
+                touched, through = low[j] <= top, close[j] < bottom
+            else:
+                touched, through = high[j] >= bottom, close[j] > top
+            if touched and self.blocks['mitigated_index'][i] < 0:
+                self.blocks['mitigated_index'][i] = j
+            if through:
+                self.blocks['violated_index'][i] = j
+            else:
+                still_open.append(i)
+        self.open_blocks = still_open
+
+        for side in (BULLISH, BEARISH):
+            tracked = self.tracked[side]
+            if tracked is None or tracked[1] or j <= tracked[0] + self.sensitivity:
+                continue
+            pivot = tracked[0]
+            level = high[pivot] if side == BULLISH else low[pivot]
+            if not (close[j] > level if side == BULLISH else close[j] < level):
+                continue
+            tracked[1] = True
+            directions = self.events['direction']
+            self.events['choch'].append(bool(directions) and directions[-1] != side)
+            self.events['index'].append(j)
+            self.events['direction'].append(side)
+            self.events['pivot'].append(pivot)
+            self.events['level'].append(level)
+            if self.order_blocks:
+                if side == BULLISH:
+                    block = pivot + 1 + int(np.argmin(low[pivot + 1:j]))
+                else:
+                    block = pivot + 1 + int(np.argmax(high[pivot + 1:j]))
+                self.blocks['index'].append(block)
+                self.blocks['direction'].append(side)
+                self.blocks['top'].append(high[block])
+                self.blocks['bottom'].append(low[block])
+                self.blocks['break_index'].append(j)
+                self.blocks['mitigated_index'].append(-1)
+                self.blocks['violated_index'].append(-1)
+                self.open_blocks.append(len(self.blocks['index']) - 1)
+
+    def as_structure(self, start=0):
+        """
+        Same layout and dtypes as detect_structure, limited to the breaks at or after bar start.
+        """
+        first = bisect_left(self.events['index'], start)
+        events = {
+            'index': np.array(self.events['index'][first:], dtype=np.int64),
+            'direction': np.array(self.events['direction'][first:], dtype=np.int8),
+            'pivot': np.array(self.events['pivot'][first:], dtype=np.int64),
+            'level': np.array(self.events['level'][first:], dtype=np.float64),
+            'choch': np.array(self.events['choch'][first:], dtype=bool),
+        }
+        # Blocks are one per break when tracked, so the same tail applies
+        blocks = {key: np.array(self.blocks[key][first:], dtype=np.int64) for key in ('index', 'break_index', 'mitigated_index', 'violated_index')}
+        blocks['direction'] = np.array(self.blocks['direction'][first:], dtype=np.int8)
+        blocks['top'] = np.array(self.blocks['top'][first:], dtype=np.float64)
+        blocks['bottom'] = np.array(self.blocks['bottom'][first:], dtype=np.float64)
+        directions = self.events['direction']
+        return {
+            'events': events,
+            'order_blocks': blocks,
+            'trend': int(directions[-1]) if directions else 0,
+        }
+
+
+class IndicatorState:
+    """
+    Incremental mxwll indicator state of one ticker.
+
+    Holds the bars seen so far and everything needed to extend the result bar by bar:
+      - the Wilder ATR recursion (O(1) per bar),
+      - pivots: only the last 2 * sensitivity bars are re-examined (amortized O(sensitivity)),
+      - FVGs and order blocks that are still open, and the tracked structure levels; bars only
+        visit the open ones.
+    Bars, pivots, gaps and the ATR live in growable buffers, so absorbing k bars costs O(k)
+    amortized plus the open gaps and blocks, whatever the length of the history.
+
+    The state is anchored to the first bar of the history, so it serves any analysis window:
+    result(start) slices the window out as compute_mxwll(..., start=start) does, in O(window).
+    It pickles, so it can be kept between runs.
+
+    Args:
+        ticker (str): Stock ticker symbol.
+        params (dict): Dictionary of analysis parameters.
+    """
+
+    def __init__(self, ticker, params):
+        self.ticker = ticker
+        self.params = dict(params)
+        self.engine_version = ENGINE_VERSION
+        self.settings = frequency_settings(params['data_frequency'])
+        self.dates = _Buffer(dtype='datetime64[ns]')
+        self.bars = {column: _Buffer() for column in OHLCV_COLUMNS}
+        self.atr = _Buffer()
+        self.pivots = {}
+        self.fvgs = {key: _Buffer(dtype=dtype) for key, dtype in FVG_DTYPES.items()}
+        self.open_fvgs = np.empty(0, dtype=np.int64)  # Positions in self.fvgs not yet violated
+        self.structures = {}  # 'external' / 'internal' -> _StructureTracker
+
+    @classmethod
+    def from_frame(cls, df, ticker, params, result=None):
+        """
+        Builds the state from a full history.
+
+        Args:
+            df (pd.DataFrame): OHLCV data indexed by date, oldest first.
+            ticker (str): Stock ticker symbol.
+            params (dict): Dictionary of analysis parameters.
+            result (MxwllResult): compute_mxwll(df, ticker, params), if already computed.
+
+        Returns:
+            IndicatorState: The state after the last bar of df.
+        """
+        state = cls(ticker, params)
+        result = result if result is not None else compute_mxwll(df, ticker, params)
+        state.dates = _Buffer(_stamps(df.index), dtype='datetime64[ns]')
+        state.bars = {column: _Buffer(df[column].to_numpy(dtype=np.float64)) for column in OHLCV_COLUMNS}
+        if result.atr is not None:
+            state.atr = _Buffer(result.atr)
+        pivots = detect_pivots(state.bars['High'].values, state.bars['Low'].values, state._sensitivities())
+        for s, found in pivots.items():
+            state.pivots[s] = {
+                'highs': _Buffer(found['highs'], dtype=np.int64),
+                'lows': _Buffer(found['lows'], dtype=np.int64),
+                'provisional_highs': found['provisional_highs'],
+                'provisional_lows': found['provisional_lows'],
+            }
+        state.fvgs = {key: _Buffer(result.fvgs[key], dtype=dtype) for key, dtype in FVG_DTYPES.items()}
+        state.open_fvgs = np.flatnonzero(result.fvgs['violated_index'] < 0)
+        if result.external_structure is not None:
+            state.structures['external'] = _StructureTracker.from_structure(
+                result.external_structure, result.swing_highs, result.swing_lows,
+                params['external_sensitivity'], params['show_order_blocks']
+            )
+        if result.internal_structure is not None:
+            state.structures['internal'] = _StructureTracker.from_structure(
+                result.internal_structure, result.internal_highs, result.internal_lows,
+                params['internal_sensitivity'], False
+            )
+        return state
+
+    def __len__(self):
+        return len(self.dates)
+
+    @property
+    def last_date(self):
+        return pd.Timestamp(self.dates.values[-1]) if len(self.dates) else None
+
+    def matches(self, params):
+        """
+        True if this state was built with the given parameters and the current engine.
+        """
+        return self.params == params and self.engine_version == ENGINE_VERSION
+
+    def _sensitivities(self):
+        params = self.params
+        return [params['external_sensitivity']] + ([params['internal_sensitivity']] if params['show_internals'] else [])
+
+    def update(self, df, start=0):
+        """
+        Appends new bars and returns the updated result.
+
+        Args:
+            df (pd.DataFrame): OHLCV bars indexed by date, oldest first, all after last_date.
+            start (int): Position of the first bar of the analysed window among all absorbed bars.
+
+        Returns:
+            MxwllResult: Identical to compute_mxwll over every bar absorbed so far with the same start.
+
+        Raises:
+            ValueError: If a bar is not after the last absorbed bar.
+        """
+        if df.empty:
+            return self.result(start)
+        index = pd.DatetimeIndex(df.index)
+        if not index.is_monotonic_increasing or not index.is_unique or (len(self.dates) and index[0] <= self.last_date):
+            raise ValueError(f"New bars for '{self.ticker}' must be sorted and after {self.last_date}.")
+        if not len(self.dates):
+            # Nothing to extend yet
+            state = IndicatorState.from_frame(df, self.ticker, self.params)
+            self.__dict__.update(state.__dict__)
+            return self.result(start)
+
+        old_count = len(self.dates)
+        self.dates.extend(_stamps(index))
+        for column in OHLCV_COLUMNS:
+            self.bars[column].extend(df[column].to_numpy(dtype=np.float64))
+
+        if self.params['show_aoe']:
+            self._update_atr(old_count)
+        self._update_pivots(old_count)
+        high, low, close = self.bars['High'].values, self.bars['Low'].values, self.bars['Close'].values
+        confirmations = {name: self._confirmations(name, old_count) for name in self.structures}
+        for j in range(old_count, len(self.dates)):
+            self._advance_fvgs(j, high, low, close)
+            for name, tracker in self.structures.items():
+                confirmed_high, confirmed_low = confirmations[name]
+                tracker.advance(j, high, low, close, confirmed_high.get(j), confirmed_low.get(j))
+        return self.result(start)
+
+    def catch_up(self, df, start=0):
+        """
+        Brings the state up to date with a frame that extends the bars absorbed so far.
+
+        Args:
+            df (pd.DataFrame): The ticker's full OHLCV history indexed by date, oldest first.
+            start (int): Position in df of the first bar of the analysed window.
+
+        Returns:
+            MxwllResult: The updated result of the window, or None if df does not extend this
+            state (it starts elsewhere, or bars were inserted before the last absorbed bar).
+        """
+        count = len(self.dates)
+        dates = self.dates.values
+        if not count or len(df) < count or df.index[0] != pd.Timestamp(dates[0]) or df.index[count - 1] != pd.Timestamp(dates[-1]):
+            return None
+        return self.update(df.iloc[count:], start)
+
+    def _update_atr(self, old_count):
+        window = self.settings['atr_window']
+        high, low, close = self.bars['High'].values, self.bars['Low'].values, self.bars['Close'].values
+        n = len(close)
+        if old_count < window:
+            # Not seeded yet: the first value is the mean of the first window true ranges
+            self.atr = _Buffer(wilder_atr(high, low, close, window))
+            return
+        true_range = _true_range(high[old_count:], low[old_count:], close[old_count - 1:n - 1])
+        # Continue the same pandas recursion from the last value, so results match to the bit
+        continued = pd.Series(np.concatenate([[self.atr.values[-1]], true_range])).ewm(alpha=1 / window, adjust=False).mean().to_numpy()
+        self.atr.extend(continued[1:])
+
+    def _update_pivots(self, old_count):
+        sensitivities = self._sensitivities()
+        cap = max(sensitivities)
+        # Bars before old_count - s are settled; re-examine the rest with 2 * cap bars of context
+        offset = max(old_count - 2 * cap, 0)
+        tail = detect_pivots(self.bars['High'].values[offset:], self.bars['Low'].values[offset:], sensitivities)
+        for s in sensitivities:
+            pivots, fresh = self.pivots[s], tail[s]
+            for side in ('highs', 'lows'):
+                pivots[side].truncate(np.searchsorted(pivots[side].values, old_count - s))
+                recent = fresh[side] + offset
+                pivots[side].extend(recent[recent >= old_count - s])
+                pivots[f"provisional_{side}"] = (fresh[f"provisional_{side}"] + offset).astype(np.int64)
+
+    def _confirmations(self, name, old_count):
+        # Pivots confirmed by the new bars, keyed by their confirmation bar
+        s = self.params['external_sensitivity'] if name == 'external' else self.params['internal_sensitivity']
+        pivots = self.pivots[s]
+        return tuple(
+            {int(p) + s: int(p) for p in _from(pivots[side].values, old_count - s)}
+            for side in ('highs', 'lows')
+        )
+
+    def _advance_fvgs(self, j, high, low, close):
+        fvgs = {key: buffer.values for key, buffer in self.fvgs.items()}
+        close_only = self.params['close_only_fvg']
+        active = self.open_fvgs
+        if len(active):
+            bullish = fvgs['direction'][active] == BULLISH
+            top, bottom = fvgs['top'][active], fvgs['bottom'][active]
+            touched = np.where(bullish, low[j] <= top, high[j] >= bottom)
+            if close_only:
+                through = np.where(bullish, close[j] < bottom, close[j] > top)
+            else:
+                through = np.where(bullish, low[j] < bottom, high[j] > top)
+            mitigate = active[(touched | through) & (fvgs['mitigated_index'][active] < 0)]
+            fvgs['mitigated_index'][mitigate] = j
+            fvgs['violated_index'][active[through]] = j
+            # The unfilled part shrinks with every bar before the violating one
+            filling = active[~through]
+            up = fvgs['direction'][filling] == BULLISH
+            fvgs['remaining_top'][filling[up]] = np.clip(
+                np.minimum(fvgs['remaining_top'][filling[up]], low[j]), fvgs['bottom'][filling[up]], fvgs['top'][filling[up]])
+            fvgs['remaining_bottom'][filling[~up]] = np.clip(
+                np.maximum(fvgs['remaining_bottom'][filling[~up]], high[j]), fvgs['bottom'][filling[~up]], fvgs['top'][filling[~up]])
+            self.open_fvgs = filling
+
+        if j == 0:
+            return
+        if high[j - 1] < low[j]:
+            gap = (BULLISH, low[j], high[j - 1])
+        elif low[j - 1] > high[j]:
+            gap = (BEARISH, low[j - 1], high[j])
+        else:
+            return
+        direction, top, bottom = gap
+        new = {
+            'index': j, 'direction': direction, 'top': top, 'bottom': bottom,
+            'mitigated_index': -1, 'violated_index': -1, 'remaining_top': top, 'remaining_bottom': bottom,
+        }
+        self.open_fvgs = np.append(self.open_fvgs, len(self.fvgs['index']))
+        for key, value in new.items():
+            self.fvgs[key].extend([value])
+
+    def result(self, start=0):
+        """
+        Returns the MxwllResult of the bars absorbed so far, from position start on. Only the
+        pivots, gaps and breaks from start on are read, so this is O(window), not O(history).
+        """
+        params = self.params
+        result = MxwllResult(ticker=self.ticker, data_frequency=params['data_frequency'])
+        external = self.pivots[params['external_sensitivity']]
+        result.swing_highs, result.swing_lows = _from(external['highs'].values, start), _from(external['lows'].values, start)
+        result.provisional_highs, result.provisional_lows = external['provisional_highs'], external['provisional_lows']
+        if params['show_internals']:
+            internal = self.pivots[params['internal_sensitivity']]
+            result.internal_highs, result.internal_lows = _from(internal['highs'].values, start), _from(internal['lows'].values, start)
+        first = np.searchsorted(self.fvgs['index'].values, start)
+        result.fvgs = {key: buffer.values[first:] for key, buffer in self.fvgs.items()}
+        if 'external' in self.structures:
+            result.external_structure = self.structures['external'].as_structure(start)
+        if 'internal' in self.structures:
+            result.internal_structure = self.structures['internal'].as_structure(start)
+        if params['show_aoe']:
+            result.atr = self.atr.values
+        bars = {column: buffer.values for column, buffer in self.bars.items()}
+        # slice_result copies what it keeps, so the result does not change with later updates
+        return slice_result(result, start, self.last_date, bars['Open'], bars['High'], bars['Low'], bars['Close'],
+                            bars['Volume'], params)
@@ -0,0 +1,354 @@
+# analysis/mxwll_engine.py
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from analysis.fvg import BULLISH, detect_fvgs
+from analysis.pivots import detect_pivots
+from analysis.structure import BOS, CHOCH, detect_structure, structure_tables
+
+
+# Indicator windows per data frequency
+FREQUENCY_SETTINGS = {
+    '15m': {'atr_window': 14, 'aoi_length': 50, 'session_enabled': True},
+    '4h': {'atr_window': 14, 'aoi_length': 50, 'session_enabled': True},
+    '1D': {'atr_window': 14, 'aoi_length': 50, 'session_enabled': False},  # Sessions are not time-based for daily data
+}
+
+SESSION_TIMES = {
+    'New York': {'start': '09:30', 'end': '16:00'},
+    'Asia': {'start': '20:00', 'end': '02:00'},
+    'London': {'start': '03:00', 'end': '11:30'}
+}
+
+# Volume activity levels and the quantiles separating them
+VOLUME_LEVELS = ("Very Low", "Low", "Average", "High", "Very High")
+VOLUME_QUANTILES = (0.1, 0.33, 0.5, 0.66, 0.9)
+
+EMPTY_INDEX = np.empty(0, dtype=np.int64)
+
+# Bump when the meaning of MxwllResult fields changes, so cached results are recomputed
+ENGINE_VERSION = 4
+
+
+@dataclass
+class MxwllResult:
+    """
+    Numeric output of the mxwll suite indicator. Bar positions are integer indexes into the
+    analysed DataFrame; render it with analysis.mxwll_renderer.render_mxwll.
+    """
+    ticker: str
+    data_frequency: str
+    swing_highs: np.ndarray = field(default_factory=lambda: EMPTY_INDEX)
+    swing_lows: np.ndarray = field(default_factory=lambda: EMPTY_INDEX)
+    internal_highs: np.ndarray = field(default_factory=lambda: EMPTY_INDEX)
+    internal_lows: np.ndarray = field(default_factory=lambda: EMPTY_INDEX)
+    provisional_highs: np.ndarray = field(default_factory=lambda: EMPTY_INDEX)  # Unconfirmed external pivots
+    provisional_lows: np.ndarray = field(default_factory=lambda: EMPTY_INDEX)
+    fvgs: dict = None  # See analysis.fvg.detect_fvgs
+    external_structure: dict = None  # See analysis.structure.detect_structure; order blocks are tracked here
+    internal_structure: dict = None
+    atr: np.ndarray = None
+    aoi_start: int = None  # First bar of the AOI window
+    aoi_high: float = None  # Top of the high AOI box
+    aoi_low: float = None  # Bottom of the low AOI box
+    aoi_high_base: float = None  # Highest high/open in the AOI window
+    aoi_low_base: float = None  # Lowest low/open in the AOI window
+    main_line: dict = None  # Latest swing low to latest swing high
+    fib_levels: list = field(default_factory=list)  # (level, color, price)
+    volume_thresholds: np.ndarray = None
+    volume_activity: np.ndarray = None  # Index into VOLUME_LEVELS per bar
+    current_session: str = "Dead Zone"
+    time_until_change: str = "N/A"
+    summary: dict = field(default_factory=dict)
+
+    @property
+    def latest_volume_activity(self):
+        return VOLUME_LEVELS[self.volume_activity[-1]]
+
+
+def frequency_settings(data_frequency):
+    """
+    Returns the indicator windows for a data frequency.
+
+    Raises:
+        ValueError: If the frequency is not supported.
+    """
+    if data_frequency not in FREQUENCY_SETTINGS:
+        raise ValueError("Invalid data_frequency. Choose from '15m', '4h', or '1D'.")
+    return FREQUENCY_SETTINGS[data_frequency]
+
+
+def wilder_atr(high, low, close, window):
+    """
+    Average True Range with Wilder smoothing, matching ta.volatility.AverageTrueRange: the first
+    value (at window - 1) is the mean true range of the first window bars, earlier values are 0.
+
+    Returns:
+        np.ndarray: ATR per bar.
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    atr = np.zeros(len(close))
+    if len(close) < window:
+        return atr
+    true_range = high - low
+    previous_close = close[:-1]
+    true_range[1:] = np.maximum.reduce([true_range[1:], np.abs(high[1:] - previous_close), np.abs(low[1:] - previous_close)])
+    # atr[i] = (atr[i-1] * (window - 1) + tr[i]) / window is an EWM with alpha = 1 / window
+    seeded = np.concatenate([[true_range[:window].mean()], true_range[window:]])
+    atr[window - 1:] = pd.Series(seeded).ewm(alpha=1 / window, adjust=False).mean().to_numpy()
+    return atr
+
+
+def session_at(timestamp):
+    """
+    Returns the trading session a timestamp falls in and the time until the next session starts.
+
+    Returns:
+        tuple: (session name or "Dead Zone", "Xh Ym" or "N/A")
+    """
+    for session, props in SESSION_TIMES.items():
+        start_time = datetime.strptime(props['start'], '%H:%M').time()
+        end_time = datetime.strptime(props['end'], '%H:%M').time()
+        if start_time <= timestamp.time() <= end_time:
+            # Next session is the following session in the list
+            session_names = list(SESSION_TIMES.keys())
+            next_session = session_names[(session_names.index(session) + 1) % len(session_names)]
+            next_start_time = datetime.strptime(SESSION_TIMES[next_session]['start'], '%H:%M').time()
+            next_start_datetime = datetime.combine(timestamp.date(), next_start_time)
+            if next_start_time <= timestamp.time():
+                next_start_datetime += timedelta(days=1)
+            time_diff = next_start_datetime - timestamp
+            hours, remainder = divmod(int(time_diff.total_seconds()), 3600)
+            minutes, _ = divmod(remainder, 60)
+            return session, f"{hours}h {minutes}m"
+    return "Dead Zone", "N/A"
+
+
+def aoi_summary(ticker, last_open, last_close, aoi_high, aoi_low):
+    """
+    Builds the AOI summary row: distances from the last candle body to the AOI boxes.
+    """
+    if aoi_high is None or aoi_low is None:
+        return {
+            'Ticker': ticker,
+            'Highest AOI (Red)': None,
+            'Lowest AOI (Green)': None,
+            'Difference (Last Candle Bottom to AOI Top)': None,
+            'Difference (Last Candle Upper to AOI Bottom)': None,
+            'Percentage (Bottom to AOI Top)': None,
+            'Percentage (Upper to AOI Bottom)': None
+        }
+
+    # Last Candle (excluding wicks)
+    last_candle_bottom = min(last_open, last_close)
+    last_candle_upper = max(last_open, last_close)
+
+    difference_bottom_to_AOI_top = aoi_high - last_candle_bottom
+    difference_upper_to_AOI_bottom = last_candle_upper - aoi_low
+
+    percentage_diff_bottom_to_AOI_top = (difference_bottom_to_AOI_top / aoi_high) * 100 if aoi_high != 0 else None
+    percentage_diff_upper_to_AOI_bottom = (difference_upper_to_AOI_bottom / aoi_low) * 100 if aoi_low != 0 else None
+
+    return {
+        'Ticker': ticker,
+        'Highest AOI (Red)': round(aoi_high, 2),
+        'Lowest AOI (Green)': round(aoi_low, 2),
+        'Difference (Last Candle Bottom to AOI Top)': round(difference_bottom_to_AOI_top, 2),
+        'Difference (Last Candle Upper to AOI Bottom)': round(difference_upper_to_AOI_bottom, 2),
+        'Percentage (Bottom to AOI Top)': round(percentage_diff_bottom_to_AOI_top, 2) if percentage_diff_bottom_to_AOI_top is not None else None,
+        'Percentage (Upper to AOI Bottom)': round(percentage_diff_upper_to_AOI_bottom, 2) if percentage_diff_upper_to_AOI_bottom is not None else None
+    }
+
+
+def structure_summary(structure):
+    """
+    Builds the market structure columns of the summary row from the external structure.
+    """
+    if structure is None or not len(structure['events']['index']):
+        return {'Trend': None, 'Last Structure Break': None, 'Active Order Blocks': 0}
+    events = structure['events']
+    side = "Bullish" if events['direction'][-1] == BULLISH else "Bearish"
+    blocks = structure['order_blocks']
+    return {
+        'Trend': side,
+        'Last Structure Break': f"{side} {CHOCH if events['choch'][-1] else BOS}",
+        'Active Order Blocks': int((blocks['violated_index'] < 0).sum()),
+    }
+
+
+def complete_result(result, timestamp, open_, high, low, close, volume, params):
+    """
+    Fills the parts of a result that follow from its pivots and the bars: volume regime, AOI,
+    main line and Fibonacci levels, session and summary. Shared by compute_mxwll and
+    analysis.incremental.IndicatorState so both give identical results.
+
+    Args:
+        result (MxwllResult): Result with pivots, structure and ATR already set.
+        timestamp (pd.Timestamp): Time of the last bar.
+        open_, high, low, close, volume (np.ndarray): Bars as float64 arrays, oldest first.
+        params (dict): Dictionary of analysis parameters.
+    """
+    settings = frequency_settings(params['data_frequency'])
+
+    # === Volume Activity ===
+    result.volume_thresholds = np.quantile(volume, VOLUME_QUANTILES)
+    # Level = number of thresholds strictly below the volume (volume <= 10% quantile is "Very Low")
+    result.volume_activity = np.searchsorted(result.volume_thresholds[:len(VOLUME_LEVELS) - 1], volume, side='left').astype(np.int8)
+
+    # === Area of Interest ===
+    if params['show_aoe']:
+        try:
+            result.aoi_start = max(len(high) - settings['aoi_length'], 0)
+            result.aoi_high_base = max(high[result.aoi_start:].max(), open_[result.aoi_start:].max())
+            result.aoi_low_base = min(low[result.aoi_start:].min(), open_[result.aoi_start:].min())
+            result.aoi_high = result.aoi_high_base * 1.01
+            result.aoi_low = result.aoi_low_base * 0.99
+        except Exception as e:
+            result.aoi_high, result.aoi_low = None, None
+            logging.error(f"Error computing AOE for '{result.ticker}': {e}")
+
+    # === Main Line and Fibonacci Levels ===
+    if len(result.swing_highs) and len(result.swing_lows):
+        latest_swing_high = int(result.swing_highs[-1])
+        latest_swing_low = int(result.swing_lows[-1])
+        result.main_line = {
+            'x1': latest_swing_low,
+            'y1': low[latest_swing_low],
+            'x2': latest_swing_high,
+            'y2': high[latest_swing_high]
+        }
+        if params['show_fibs']:
+            fib_diff = result.main_line['y1'] - result.main_line['y2']
+            for level, color in zip(params['fib_levels'], params['fib_colors']):
+                if level == 0.5 and not params['show_fib5']:
+                    continue
+                result.fib_levels.append((level, color, result.main_line['y2'] + fib_diff * level))
+
+    # === Session ===
+    if params['data_frequency'] in ['15m', '4h']:
+        result.current_session, result.time_until_change = session_at(timestamp)
+
+    result.summary = aoi_summary(result.ticker, open_[-1], close[-1], result.aoi_high, result.aoi_low)
+    result.summary.update(structure_summary(result.external_structure))
+
+
+def _shift(positions, start):
+    # Bar positions relative to start; -1 (none) stays -1
+    return np.where(positions >= 0, positions - start, positions)
+
+
+def _slice_structure(structure, start):
+    events = structure['events']
+    first = np.searchsorted(events['index'], start)
+    # Breaks of pivots before the window could not be drawn in it
+    keep = first + np.flatnonzero(events['pivot'][first:] >= start)
+    window_events = {key: values[keep] for key, values in events.items()}
+    window_events['index'] = window_events['index'] - start
+    window_events['pivot'] = window_events['pivot'] - start
+    blocks = structure['order_blocks']
+    # Order blocks are one per break, in the same order, or empty
+    window_blocks = {key: values[keep] if len(values) else values.copy() for key, values in blocks.items()}
+    for key in ('index', 'break_index', 'mitigated_index', 'violated_index'):
+        window_blocks[key] = _shift(window_blocks[key], start)
+    return {'events': window_events, 'order_blocks': window_blocks, 'trend': structure['trend']}
+
+
+def slice_result(result, start, timestamp, open_, high, low, close, volume, params):
+    """
+    Restricts a result computed over a whole history to the bars from position start on.
+
+    Pivots, FVGs, structure breaks and the ATR keep the values they have over the whole history,
+    so they do not depend on where the window starts; breaks of pivots before the window are left
+    out. The volume regime, AOI, main line and summary are computed over the window bars.
+
+    Args:
+        result (MxwllResult): Result over the whole history with pivots, FVGs, structure and ATR set. It is not modified.
+        start (int): Position of the first bar of the window.
+        timestamp (pd.Timestamp): Time of the last bar.
+        open_, high, low, close, volume (np.ndarray): Bars of the whole history as float64 arrays, oldest first.
+        params (dict): Dictionary of analysis parameters.
+
+    Returns:
+        MxwllResult: A new result whose bar positions are relative to the first bar of the window.
+    """
+    window = MxwllResult(ticker=result.ticker, data_frequency=result.data_frequency)
+    for name in ('swing_highs', 'swing_lows', 'internal_highs', 'internal_lows', 'provisional_highs', 'provisional_lows'):
+        positions = getattr(result, name)
+        setattr(window, name, positions[np.searchsorted(positions, start):] - start)
+    if result.fvgs is not None:
+        first = np.searchsorted(result.fvgs['index'], start)
+        window.fvgs = {key: values[first:].copy() for key, values in result.fvgs.items()}
+        for key in ('index', 'mitigated_index', 'violated_index'):
+            window.fvgs[key] = _shift(window.fvgs[key], start)
+    if result.external_structure is not None:
+        window.external_structure = _slice_structure(result.external_structure, start)
+    if result.internal_structure is not None:
+        window.internal_structure = _slice_structure(result.internal_structure, start)
+    if result.atr is not None:
+        window.atr = result.atr[start:].copy()
+    complete_result(window, timestamp, open_[start:], high[start:], low[start:], close[start:], volume[start:], params)
+    return window
+
+
+def compute_mxwll(df, ticker, params, start=0):
+    """
+    Runs the numeric part of the mxwll suite indicator without building any figure.
+
+    Args:
+        df (pd.DataFrame): OHLCV data indexed by date, oldest first. It is not modified.
+        ticker (str): Stock ticker symbol.
+        params (dict): Dictionary of analysis parameters.
+        start (int): Position of the first bar of the analysed window. The indicator still runs
+            over every bar of df, so pivots, FVGs and structure carry into the window; see slice_result.
+
+    Returns:
+        MxwllResult: Pivots, FVGs, market structure, AOI bounds, Fibonacci levels, volume regime and the summary,
+        with bar positions relative to the window.
+    """
+    settings = frequency_settings(params['data_frequency'])
+    open_ = df['Open'].to_numpy(dtype=np.float64)
+    high = df['High'].to_numpy(dtype=np.float64)
+    low = df['Low'].to_numpy(dtype=np.float64)
+    close = df['Close'].to_numpy(dtype=np.float64)
+    volume = df['Volume'].to_numpy(dtype=np.float64)
+
+    result = MxwllResult(ticker=ticker, data_frequency=params['data_frequency'])
+
+    # === Pivots and FVG ===
+    sensitivities = [params['external_sensitivity']] + ([params['internal_sensitivity']] if params['show_internals'] else [])
+    pivots = detect_pivots(high, low, sensitivities)
+    external = pivots[params['external_sensitivity']]
+    result.swing_highs, result.swing_lows = external['highs'], external['lows']
+    result.provisional_highs, result.provisional_lows = external['provisional_highs'], external['provisional_lows']
+    if params['show_internals']:
+        internal = pivots[params['internal_sensitivity']]
+        result.internal_highs, result.internal_lows = internal['highs'], internal['lows']
+    result.fvgs = detect_fvgs(high, low, close, close_only=params['close_only_fvg'])
+
+    # === Market Structure and Order Blocks ===
+    tables = structure_tables(high, low, close)
+    if params['show_externals']:
+        result.external_structure = detect_structure(
+            high, low, close, result.swing_highs, result.swing_lows, params['external_sensitivity'],
+            tables=tables, order_blocks=params['show_order_blocks']
+        )
+    if params['show_internals']:
+        result.internal_structure = detect_structure(
+            high, low, close, result.internal_highs, result.internal_lows, params['internal_sensitivity'],
+            tables=tables, order_blocks=False
+        )
+
+    if params['show_aoe']:
+        result.atr = wilder_atr(high, low, close, settings['atr_window'])
+
+    if start:
+        return slice_result(result, start, df.index[-1], open_, high, low, close, volume, params)
+    complete_result(result, df.index[-1], open_, high, low, close, volume, params)
+    return result
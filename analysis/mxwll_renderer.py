@@ -0,0 +1,390 @@
+# analysis/mxwll_renderer.py
+#
+# Figures are kept lean: every kind of marker is one trace, FVGs, order blocks and sessions are
+# one filled trace per colour instead of one shape per box, and marker/line traces switch to
+# WebGL (Scattergl) on long histories. Long histories are drawn with at most MAX_CANDLES
+# aggregated candles and MAX_OVERLAYS points per overlay, so the figure size stays bounded
+# whatever the lookback; overlays keep their full-resolution times and prices.
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from analysis.downsample import downsample_ohlc, lttb
+from analysis.fvg import BULLISH
+from analysis.mxwll_engine import SESSION_TIMES, frequency_settings
+from analysis.structure import BOS, CHOCH, filter_events
+
+
+# Bump when the figures change, so cached figure JSON is rendered again
+RENDERER_VERSION = 3
+WEBGL_THRESHOLD = 5000  # Bars above which marker and line traces use Scattergl
+MAX_CANDLES = 1000  # Longer histories are aggregated into coarser candles
+MAX_OVERLAYS = 500  # Most markers, structure events or FVGs drawn per trace
+MAX_SESSION_DAYS = 30  # Sessions are highlighted over the latest days only
+PRICE_HOVER_FORMAT = ',.2f'
+
+
+def chart_x(df):
+    """
+    Returns the x values of a chart as epoch milliseconds, which the figure JSON carries as a
+    packed binary array rather than one date string per bar. The x axis is typed as date.
+    """
+    return pd.DatetimeIndex(df.index).as_unit('ms').asi8.astype(np.float64)
+
+
+def _prices(series):
+    """
+    Candle prices as float32: half the payload of float64 and exact to well below a tick
+    (prices are shown with PRICE_HOVER_FORMAT).
+    """
+    return series.to_numpy(dtype=np.float32)
+
+
+def _boxes(x0, x1, y0, y1):
+    """
+    Packs rectangles into the x/y arrays of a single trace drawn with fill='toself', separated by NaN gaps.
+    """
+    gap = np.full(len(x0), np.nan)
+    x = np.column_stack([x0, x1, x1, x0, x0, gap]).ravel()
+    y = np.column_stack([y0, y0, y1, y1, y0, gap]).ravel()
+    return x, y
+
+
+def _segments(x0, x1, y):
+    """
+    Packs horizontal segments into the x/y arrays of a single line trace.
+    """
+    gap = np.full(len(x0), np.nan)
+    return np.column_stack([x0, x1, gap]).ravel(), np.column_stack([y, y, gap]).ravel()
+
+
+def _latest(mask, limit):
+    """
+    Keeps only the last limit selected rows of a boolean mask.
+    """
+    mask = mask.copy()
+    mask[np.flatnonzero(mask)[:-limit]] = False
+    return mask
+
+
+def _thin_swings(x, high, low, highs, lows, limit):
+    """
+    Thins swing highs/lows to at most limit points with LTTB over the zigzag line they form, which
+    keeps the swings that shape it.
+    """
+    if len(highs) + len(lows) <= limit:
+        return highs, lows
+    positions = np.concatenate([highs, lows])
+    prices = np.concatenate([high[highs], low[lows]])
+    is_high = np.r_[np.ones(len(highs), dtype=bool), np.zeros(len(lows), dtype=bool)]
+    order = np.argsort(positions, kind='stable')
+    kept = order[lttb(x[positions[order]], prices[order], limit)]
+    return positions[kept][is_high[kept]], positions[kept][~is_high[kept]]
+
+
+def _fill_trace(x, y, color, opacity, name, yaxis='y'):
+    return go.Scatter(
+        x=x,
+        y=y,
+        mode='lines',
+        fill='toself',
+        fillcolor=color,
+        line=dict(width=0),
+        opacity=opacity,
+        yaxis=yaxis,
+        hoverinfo='skip',
+        name=name,
+        showlegend=False
+    )
+
+
+def draw_swings(fig, df, x, result, params, scatter=go.Scatter):
+    """
+    Marks the latest external swing highs/lows and, when enabled, all internal swings, one trace per kind.
+    """
+    high = df['High'].to_numpy()
+    low = df['Low'].to_numpy()
+    latest_highs = result.swing_highs[-params['swing_order_blocks']:]
+    latest_lows = result.swing_lows[-params['swing_order_blocks']:]
+    if params['show_hhlh'] and len(latest_highs):
+        fig.add_trace(scatter(
+            x=x[latest_highs],
+            y=high[latest_highs],
+            mode='markers+text',
+            marker=dict(color=params['bear_color'], size=10, symbol='triangle-up'),
+            text=['HH'] * len(latest_highs),
+            textposition='bottom center',
+            name='Swing High',
+            showlegend=False
+        ))
+    if params['show_hlll'] and len(latest_lows):
+        fig.add_trace(scatter(
+            x=x[latest_lows],
+            y=low[latest_lows],
+            mode='markers+text',
+            marker=dict(color=params['bull_color'], size=10, symbol='triangle-down'),
+            text=['LL'] * len(latest_lows),
+            textposition='top center',
+            name='Swing Low',
+            showlegend=False
+        ))
+
+    if params['show_internals']:
+        internal_highs, internal_lows = _thin_swings(x, high, low, result.internal_highs, result.internal_lows, MAX_OVERLAYS)
+        for positions, prices, color, symbol, name in (
+            (internal_highs, high, params['bear_color'], 'triangle-up', 'Internal Swing High'),
+            (internal_lows, low, params['bull_color'], 'triangle-down', 'Internal Swing Low'),
+        ):
+            if len(positions):
+                fig.add_trace(scatter(
+                    x=x[positions],
+                    y=prices[positions],
+                    mode='markers',
+                    marker=dict(color=color, size=6, symbol=symbol),
+                    name=name,
+                    showlegend=False
+                ))
+
+
+def draw_structure(fig, x, structure, setting, params, internal=False, scatter=go.Scatter, min_span=1):
+    """
+    Draws BoS/CHoCH events as a level line from the broken pivot to the breaking bar, labelled at its middle.
+    One line trace and one label trace per direction. Events spanning fewer than min_span bars
+    (e.g. within one aggregated candle) are left out.
+    """
+    events = structure['events']
+    shown = filter_events(events, setting) & (events['index'] - events['pivot'] >= min_span)
+    for side, color in ((BULLISH, params['bull_color']), (-BULLISH, params['bear_color'])):
+        rows = _latest(shown & (events['direction'] == side), MAX_OVERLAYS)
+        if not rows.any():
+            continue
+        line_x, line_y = _segments(x[events['pivot'][rows]], x[events['index'][rows]], events['level'][rows])
+        fig.add_trace(scatter(
+            x=line_x,
+            y=line_y,
+            mode='lines',
+            line=dict(color=color, width=1, dash='dot' if internal else 'dash'),
+            name=f"{'Internal' if internal else 'Swing'} Structure",
+            hoverinfo='skip',
+            showlegend=False
+        ))
+        middles = (events['pivot'][rows] + events['index'][rows]) // 2
+        fig.add_trace(scatter(
+            x=x[middles],
+            y=events['level'][rows],
+            mode='text',
+            text=[CHOCH if choch else BOS for choch in events['choch'][rows]],
+            textposition='top center' if side == BULLISH else 'bottom center',
+            textfont=dict(color=color, size=9 if internal else 11),
+            name=f"{'Internal' if internal else 'Swing'} Structure",
+            showlegend=False
+        ))
+
+
+def draw_order_blocks(fig, x, structure, params):
+    """
+    Draws the latest swing_order_blocks order blocks that have not been violated, extended to the
+    last bar, as one filled trace per direction and mitigation state. Mitigated blocks are fainter.
+    """
+    blocks = structure['order_blocks']
+    active = np.flatnonzero(blocks['violated_index'] < 0)[-params['swing_order_blocks']:]
+    for side, color, name in ((BULLISH, params['bull_color'], 'Bullish OB'), (-BULLISH, params['bear_color'], 'Bearish OB')):
+        for mitigated, opacity in ((False, 0.3), (True, 0.15)):
+            rows = active[(blocks['direction'][active] == side) & ((blocks['mitigated_index'][active] >= 0) == mitigated)]
+            if not len(rows):
+                continue
+            box_x, box_y = _boxes(x[blocks['index'][rows]], np.repeat(x[-1:], len(rows)), blocks['bottom'][rows], blocks['top'][rows])
+            fig.add_trace(_fill_trace(box_x, box_y, color, opacity, name))
+
+
+def draw_fvgs(fig, x, result, params):
+    """
+    Draws Fair Value Gaps as one filled trace. Active gaps extend to the last bar, showing only
+    their unfilled part. Violated gaps are dropped, or kept up to the violating bar when
+    contract_violated_fvg is set.
+    """
+    fvgs = result.fvgs
+    violated = fvgs['violated_index'] >= 0
+    rows = _latest(np.ones(len(violated), dtype=bool) if params['contract_violated_fvg'] else ~violated, MAX_OVERLAYS)
+    if not rows.any():
+        return
+    last_bar = len(x) - 1
+    ends = np.where(violated, fvgs['violated_index'], last_bar)[rows]
+    box_x, box_y = _boxes(x[fvgs['index'][rows]], x[ends], fvgs['remaining_bottom'][rows], fvgs['remaining_top'][rows])
+    fig.add_trace(_fill_trace(box_x, box_y, params['fvg_color'], params['fvg_transparency'] / 100, 'FVG'))
+
+
+def draw_aoe(fig, x, result, params):
+    """
+    Draws the high and low Area of Interest (AOE) boxes over the AOI window.
+    """
+    x0 = x[result.aoi_start]
+    x1 = x[-1]
+    fig.add_shape(type="rect",
+                  x0=x0,
+                  y0=result.aoi_high,
+                  x1=x1,
+                  y1=result.aoi_high_base,
+                  fillcolor=params['bear_color'],
+                  opacity=0.2,
+                  line=dict(width=0),
+                  layer='below',
+                  name='High AOE')
+    fig.add_shape(type="rect",
+                  x0=x0,
+                  y0=result.aoi_low_base,
+                  x1=x1,
+                  y1=result.aoi_low,
+                  fillcolor=params['bull_color'],
+                  opacity=0.2,
+                  line=dict(width=0),
+                  layer='below',
+                  name='Low AOE')
+
+
+def highlight_sessions(fig, df, params):
+    """
+    Highlights trading sessions (New York, Asia, London) over the latest MAX_SESSION_DAYS days, one
+    filled trace per session on a hidden 0-1 axis so the bands span the full height. Applicable
+    only for intra-day data frequencies.
+    """
+    if not frequency_settings(params['data_frequency'])['session_enabled']:
+        return
+
+    session_colors = {
+        'New York': params['bear_color'],  # Bear Color (Red)
+        'Asia': params['bull_color'],      # Bull Color (Green)
+        'London': params['fvg_color']      # FVG Color
+    }
+    days = pd.DatetimeIndex(df.index).normalize().unique().as_unit('ms')[-MAX_SESSION_DAYS:]
+    fig.update_layout(yaxis2=dict(overlaying='y', range=[0, 1], visible=False, fixedrange=True))
+    for session, props in SESSION_TIMES.items():
+        start_time = datetime.strptime(props['start'], '%H:%M')
+        end_time = datetime.strptime(props['end'], '%H:%M')
+        starts = days + pd.Timedelta(hours=start_time.hour, minutes=start_time.minute)
+        ends = days + pd.Timedelta(hours=end_time.hour, minutes=end_time.minute)
+        # Handle sessions that span over midnight
+        if end_time <= start_time:
+            ends += pd.Timedelta(days=1)
+
+        box_x, box_y = _boxes(starts.asi8.astype(np.float64), ends.asi8.astype(np.float64), np.zeros(len(days)), np.ones(len(days)))
+        fig.add_trace(_fill_trace(box_x, box_y, session_colors.get(session, 'rgba(0,0,0,0)'),
+                                  params['transparency'], session, yaxis='y2'))
+        # Label the session of the last day only
+        fig.add_annotation(x=starts[-1], y=1, xref='x', yref='paper', text=session, showarrow=False,
+                           xanchor='left', yanchor='top', font=dict(size=10, color="white"))
+
+
+def draw_main_line(fig, x, result, scatter=go.Scatter):
+    """
+    Draws the main line connecting the latest swing low and high.
+    """
+    main_line = result.main_line
+    fig.add_trace(scatter(
+        x=[x[main_line['x1']], x[main_line['x2']]],
+        y=[main_line['y1'], main_line['y2']],
+        mode='lines',
+        line=dict(color='blue', dash='dash'),
+        name='Main Line'
+    ))
+
+
+def add_volume_annotation(fig, df, x, result):
+    """
+    Adds the session and volume activity annotation to the latest data point.
+    """
+    annotation_text = f"""
+    Session: {result.current_session}<br>
+    Session Close: {result.time_until_change}<br>
+    Volume Activity: {result.latest_volume_activity}
+    """
+    fig.add_annotation(
+        x=x[-1],
+        y=df['High'].iloc[-1],
+        text=annotation_text,
+        showarrow=True,
+        arrowhead=1,
+        align="left",
+        bgcolor="rgba(0,0,0,0.5)",
+        font=dict(color="white")
+    )
+
+
+def figure_payload_bytes(fig):
+    """
+    Size of the figure JSON sent to the browser, in bytes.
+    """
+    return len(fig.to_json().encode('utf-8'))
+
+
+def render_mxwll(df, result, params, webgl=None, max_candles=MAX_CANDLES):
+    """
+    Builds the Plotly figure for a computed mxwll suite indicator result.
+
+    Args:
+        df (pd.DataFrame): The DataFrame the result was computed from.
+        result (MxwllResult): Output of analysis.mxwll_engine.compute_mxwll.
+        params (dict): Dictionary of analysis parameters.
+        webgl (bool): Draw marker and line traces with Scattergl. Defaults to True above WEBGL_THRESHOLD bars.
+        max_candles (int): Longer histories are drawn as at most this many aggregated candles
+            (see analysis.downsample.downsample_ohlc); None draws every bar.
+
+    Returns:
+        plotly.graph_objects.Figure: The generated Plotly figure.
+    """
+    fig = go.Figure()
+    x = chart_x(df)
+    scatter = go.Scattergl if (webgl if webgl is not None else len(df) > WEBGL_THRESHOLD) else go.Scatter
+
+    # Filled areas first, so they sit below the candles
+    highlight_sessions(fig, df, params)
+    if params['show_fvg']:
+        draw_fvgs(fig, x, result, params)
+    if result.external_structure is not None and params['show_order_blocks']:
+        draw_order_blocks(fig, x, result.external_structure, params)
+
+    candles, bars_per_candle = downsample_ohlc(df, max_candles)
+    fig.add_trace(go.Candlestick(
+        x=chart_x(candles),
+        open=_prices(candles['Open']),
+        high=_prices(candles['High']),
+        low=_prices(candles['Low']),
+        close=_prices(candles['Close']),
+        name='Price' if bars_per_candle == 1 else f'Price ({bars_per_candle} bars per candle)',
+        increasing_line_color='green',
+        decreasing_line_color='red'
+    ))
+
+    draw_swings(fig, df, x, result, params, scatter)
+    if result.external_structure is not None:
+        draw_structure(fig, x, result.external_structure, params['external_structure'], params,
+                       scatter=scatter, min_span=bars_per_candle)
+    if result.internal_structure is not None:
+        draw_structure(fig, x, result.internal_structure, params['internal_structure'], params, internal=True,
+                       scatter=scatter, min_span=bars_per_candle)
+    if params['show_aoe'] and result.aoi_high is not None and result.aoi_low is not None:
+        draw_aoe(fig, x, result, params)
+    if result.main_line:
+        draw_main_line(fig, x, result, scatter)
+        for level, color, price in result.fib_levels:
+            fig.add_hline(y=price, line=dict(color=color, dash='dash'),
+                          annotation_text=f'Fib {level}', annotation_position="top left")
+    add_volume_annotation(fig, df, x, result)
+
+    fig.update_layout(
+        title=f'AOI for {result.ticker}',
+        yaxis_title='Price',
+        xaxis_title='Date',
+        legend=dict(orientation="h"),
+        margin=dict(l=50, r=50, t=50, b=50),
+        hovermode='x unified'
+    )
+    # Remove the separate range slider chart
+    fig.update_xaxes(rangeslider_visible=False, type='date',
+                     hoverformat='%Y-%m-%d' if (df.index == df.index.normalize()).all() else '%Y-%m-%d %H:%M')
+    fig.update_yaxes(hoverformat=PRICE_HOVER_FORMAT)
+    fig.update_layout(showlegend=True)
+    return fig
@@ -0,0 +1,109 @@
+# analysis/parallel.py
+#
+# Runs compute_mxwll over many tickers on a process pool. The OHLCV panel is copied once into
+# a shared memory block that every worker maps read-only, so tasks only carry ticker bounds and
+# results stream back as each chunk completes.
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+import pandas as pd
+
+from analysis.mxwll_engine import compute_mxwll
+from analysis.screener import group_bounds
+
+
+# Columns placed in shared memory, in order. Date is stored as int64 nanoseconds, the rest as float64.
+SHARED_COLUMNS = ('Date', 'Open', 'High', 'Low', 'Close', 'Volume')
+DEFAULT_CHUNK_SIZE = 8  # Tickers per task
+
+# Worker-side views of the shared panel, set by _attach_panel
+_shared = {}
+
+
+def share_panel(panel):
+    """
+    Copies the OHLCV columns of a panel into a new shared memory block.
+
+    Args:
+        panel (pd.DataFrame): Cleaned panel with a Date column, sorted by Ticker then Date.
+
+    Returns:
+        tuple: (SharedMemory, rows). The caller must close() and unlink() the block.
+    """
+    rows = len(panel)
+    block = shared_memory.SharedMemory(create=True, size=max(rows * len(SHARED_COLUMNS) * 8, 1))
+    columns = np.ndarray((len(SHARED_COLUMNS), rows), dtype=np.float64, buffer=block.buf)
+    columns[0].view(np.int64)[:] = pd.to_datetime(panel['Date']).to_numpy(dtype='datetime64[ns]').view(np.int64)
+    for i, column in enumerate(SHARED_COLUMNS[1:], start=1):
+        columns[i] = panel[column].to_numpy(dtype=np.float64)
+    return block, rows
+
+
+def _attach_panel(name, rows):
+    # Worker initializer: map the shared block once per process
+    # Spawned workers share the parent's resource tracker, which unlinks the block only if the
+    # parent dies without doing so itself
+    block = shared_memory.SharedMemory(name=name)
+    _shared['block'] = block
+    _shared['columns'] = np.ndarray((len(SHARED_COLUMNS), rows), dtype=np.float64, buffer=block.buf)
+
+
+def _analyze_chunk(items, params):
+    columns = _shared['columns']
+    results = []
+    for ticker, start, end in items:
+        df = pd.DataFrame(
+            {column: columns[i, start:end] for i, column in enumerate(SHARED_COLUMNS) if column != 'Date'},
+            index=pd.DatetimeIndex(columns[0, start:end].view('datetime64[ns]'), name='Date'),
+        )
+        try:
+            results.append((ticker, compute_mxwll(df, ticker, params), None))
+        except Exception as e:
+            results.append((ticker, None, str(e)))
+    return results
+
+
+def analyze_universe(panel, params, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Runs compute_mxwll for every ticker of a panel on a process pool, yielding results as they complete.
+
+    Workers are started with the 'spawn' method, which is safe from the multi-threaded Streamlit
+    server. Chunks are submitted largest first so long histories do not end up last.
+
+    Args:
+        panel (pd.DataFrame): Cleaned panel with a Date column, sorted by Ticker then Date.
+        params (dict): Dictionary of analysis parameters.
+        workers (int): Number of worker processes. Defaults to the CPU count.
+        chunk_size (int): Tickers per task.
+
+    Yields:
+        tuple: (ticker, MxwllResult or None, error message or None), in completion order.
+    """
+    if panel.empty:
+        return
+    tickers = panel['Ticker'].to_numpy()
+    starts, ends = group_bounds(tickers)
+    items = sorted(zip(tickers[starts], starts.tolist(), ends.tolist()), key=lambda item: item[1] - item[2])
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+
+    block, rows = share_panel(panel)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'),
+                                 initializer=_attach_panel, initargs=(block.name, rows)) as executor:
+            futures = [executor.submit(_analyze_chunk, chunk, params) for chunk in chunks]
+            try:
+                for future in as_completed(futures):
+                    yield from future.result()
+            finally:
+                # Drop queued chunks if the consumer stops early
+                for future in futures:
+                    future.cancel()
+    finally:
+        block.close()
+        block.unlink()
+        logging.info(f"Analyzed {len(items)} tickers on {workers} worker processes.")
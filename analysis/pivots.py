@@ -0,0 +1,94 @@
+# analysis/pivots.py
+
+import numpy as np
+
+
+def _run_lengths(values, cap, stop_on_equal):
+    """
+    Counts, for every bar, how many of the following bars (at most cap) stay below its value.
+
+    The run of bar i ends at the first later bar that is greater (or greater or equal with
+    stop_on_equal) or at the end of the data. Runs are found by binary lifting over a sparse table
+    of running maxima limited to spans <= cap, vectorized across all bars: O(n log cap).
+
+    Returns:
+        np.ndarray: Run length per bar, clipped to cap.
+    """
+    n = len(values)
+    # levels[k][j] = max(values[j:j + 2**k]), +inf past the end so runs stop at the last bar
+    levels = [np.append(values, np.inf)]
+    span = 1
+    while span * 2 <= cap:
+        shifted = np.full(n + 1, np.inf)
+        shifted[:max(n + 1 - span, 0)] = levels[-1][span:]
+        levels.append(np.maximum(levels[-1], shifted))
+        span *= 2
+
+    first = np.arange(1, n + 1)
+    position = first.copy()
+    for k in range(len(levels) - 1, -1, -1):
+        block = levels[k][position]
+        clear = block < values if stop_on_equal else block <= values
+        position += clear << k
+    return np.minimum(position - first, cap)
+
+
+def _pivot_extents(values, cap):
+    # Left run: earlier bars strictly below (an equal earlier bar owns the plateau)
+    # Right run: later bars below or equal
+    left = _run_lengths(values[::-1], cap, stop_on_equal=True)[::-1]
+    right = _run_lengths(values, cap, stop_on_equal=False)
+    return left, right
+
+
+def _select(left, right, sensitivity):
+    n = len(left)
+    confirmed = np.flatnonzero((left >= sensitivity) & (right >= sensitivity))
+    # Not enough bars yet on the right, and none of them is higher so far
+    provisional = np.flatnonzero((left >= sensitivity) & (right < sensitivity) & (np.arange(n) + right == n - 1))
+    return confirmed, provisional
+
+
+def detect_pivots(high, low, sensitivities):
+    """
+    Detects swing highs and lows for several sensitivities in one pass.
+
+    A bar is a pivot high of sensitivity s when its high is the maximum of the s bars on each side
+    and no earlier bar in that window has the same high, so a flat top yields a single pivot (its
+    first bar); pivot lows mirror this on the lows. The left and right extents of every bar are
+    computed once, up to the largest sensitivity, and each sensitivity is a threshold on them.
+
+    A pivot is confirmed once s bars exist on its right (at bar index + s). Bars among the last s
+    that are still the extreme of their truncated window are reported as provisional: a later
+    bar may yet invalidate them.
+
+    Args:
+        high (array-like): High prices.
+        low (array-like): Low prices.
+        sensitivities (iterable): Number of bars on each side, e.g. (3, 25).
+
+    Returns:
+        dict: Sensitivity -> dict of int64 bar index arrays, ascending:
+            - 'highs', 'lows': Confirmed pivots.
+            - 'provisional_highs', 'provisional_lows': Unconfirmed pivots among the last s bars.
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    sensitivities = sorted({int(s) for s in sensitivities})
+    if not sensitivities:
+        return {}
+    cap = sensitivities[-1]
+    high_left, high_right = _pivot_extents(high, cap)
+    low_left, low_right = _pivot_extents(-low, cap)
+
+    pivots = {}
+    for sensitivity in sensitivities:
+        highs, provisional_highs = _select(high_left, high_right, sensitivity)
+        lows, provisional_lows = _select(low_left, low_right, sensitivity)
+        pivots[sensitivity] = {
+            'highs': highs,
+            'lows': lows,
+            'provisional_highs': provisional_highs,
+            'provisional_lows': provisional_lows,
+        }
+    return pivots
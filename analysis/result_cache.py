@@ -0,0 +1,272 @@
+# analysis/result_cache.py
+
+import hashlib
+import json
+import logging
+import pickle
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+
+from analysis.mxwll_engine import ENGINE_VERSION
+from analysis.mxwll_renderer import RENDERER_VERSION
+from utils.disk_store import DiskStore
+
+
+DEFAULT_CACHE_DIR = 'data/indicator_cache'
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512 MB on disk
+DEFAULT_MAX_MEMORY_BYTES = 64 * 1024 * 1024  # 64 MB in memory
+
+
+def params_hash(params):
+    """
+    Returns a stable hex digest of a dictionary of analysis parameters.
+    """
+    return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+class CachedIndicator:
+    """
+    A cached indicator result, with the figure JSON if it was rendered and the incremental state
+    (analysis.incremental.IndicatorState) it can be extended from.
+    """
+
+    def __init__(self, result, figure_json=None, state=None):
+        self.result = result
+        self.figure_json = figure_json
+        self.state = state
+
+    @property
+    def summary(self):
+        return self.result.summary
+
+    @property
+    def figure(self):
+        """
+        The cached figure rebuilt from its JSON, or None if it was never rendered.
+        """
+        return pio.from_json(self.figure_json) if self.figure_json is not None else None
+
+
+class IndicatorCache:
+    """
+    Two-tier cache of mxwll indicator results keyed by ticker, date range, data version, parameters,
+    ENGINE_VERSION and RENDERER_VERSION.
+
+    The data version is the ticker's watermark (last stored date, row count). Ticker rows are only
+    ever inserted, never updated, so any sync that writes new rows changes the version and the old
+    entries stop matching. purge_stale() then deletes them from both tiers.
+
+    Entries are pickled into a utils.disk_store.DiskStore, as utils.response_cache stores its bodies;
+    the most recently used entries are also kept unpickled in memory. Both tiers evict least recently
+    used entries when over their size bound.
+
+    Entries may carry an IndicatorState under a state key that leaves out the data version, so
+    after a sync get_state() still finds the previous state and only the new bars are processed.
+
+    Args:
+        directory (str): Cache directory.
+        max_bytes (int): Upper bound on the total size of entries on disk.
+        max_memory_bytes (int): Upper bound on the (pickled) size of entries held in memory.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, max_memory_bytes=DEFAULT_MAX_MEMORY_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_memory_bytes = max_memory_bytes
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()  # key -> (CachedIndicator, size)
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._store = DiskStore(directory, max_bytes, {'Ticker': 'TEXT', 'Version': 'TEXT', 'State_Key': 'TEXT'},
+                                suffix='.pkl', name="Indicator cache")
+        self._store.index.execute("CREATE INDEX IF NOT EXISTS idx_entries_state_key ON Entries (State_Key);")
+        self._store.index.commit()
+
+    @staticmethod
+    def make_key(ticker, date_range, version, params):
+        """
+        Builds the cache key of an indicator run.
+
+        Args:
+            ticker (str): The stock ticker symbol.
+            date_range (tuple): (start_date, end_date) of the analysed bars.
+            version (tuple): (last_date, row_count) watermark of the ticker.
+            params (dict): Dictionary of analysis parameters.
+
+        Returns:
+            str: Hex digest identifying the run.
+        """
+        text = json.dumps([ticker, list(date_range), list(version), params_hash(params), ENGINE_VERSION, RENDERER_VERSION],
+                          default=str)
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def make_state_key(ticker, params):
+        """
+        Builds the key under which the incremental state of a ticker is found again after new bars
+        are stored: like make_key, but without the date range and data version. States cover the
+        full history, so every analysis window of the ticker shares one.
+        """
+        text = json.dumps(['state', ticker, params_hash(params), ENGINE_VERSION], default=str)
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _version_text(version):
+        return json.dumps(list(version), default=str)
+
+    def get(self, key):
+        """
+        Returns the CachedIndicator for a key, or None. Disk hits are promoted to memory.
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key][0]
+            row = self._store.index.execute("SELECT Size FROM Entries WHERE Key = ?;", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            try:
+                entry = pickle.loads(self._store.read(key))
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as e:
+                # Missing or unreadable (e.g. written by an older MxwllResult); drop it and recompute
+                logging.warning(f"Dropping unreadable indicator cache entry {key}: {e}")
+                self._delete([key])
+                self.misses += 1
+                return None
+            self._store.touch(key)
+            self._remember(key, entry, row[0])
+            self.disk_hits += 1
+            return entry
+
+    def get_state(self, state_key):
+        """
+        Returns a private copy of the most recently used IndicatorState stored under a state key, or
+        None. The cached state is shared by every session and stays the one pickled on disk, so callers
+        extend the copy and put() it under the new key.
+        """
+        with self._lock:
+            row = self._store.index.execute(
+                "SELECT Key FROM Entries WHERE State_Key = ? ORDER BY Last_Access DESC LIMIT 1;", (state_key,)
+            ).fetchone()
+        if row is None:
+            return None
+        entry = self.get(row[0])
+        if entry is None or entry.state is None:
+            return None
+        return pickle.loads(pickle.dumps(entry.state, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def put(self, key, ticker, version, result, figure_json=None, state=None, state_key=None):
+        """
+        Stores an indicator result, replacing any entry with the same key.
+
+        Args:
+            key (str): Cache key from make_key.
+            ticker (str): The stock ticker symbol.
+            version (tuple): (last_date, row_count) watermark the result was computed from.
+            result (MxwllResult): Result of analysis.mxwll_engine.compute_mxwll.
+            figure_json (str): Rendered figure as plotly JSON, if any.
+            state (IndicatorState): Incremental state after the last bar of the result, if any.
+            state_key (str): Key from make_state_key, required to find the state again.
+
+        Returns:
+            CachedIndicator: The stored entry.
+        """
+        entry = CachedIndicator(result, figure_json, state)
+        body = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._forget(key)
+            evicted = self._store.write(key, body, Ticker=ticker, Version=self._version_text(version),
+                                        State_Key=state_key if state is not None else None)
+            for evicted_key in evicted:
+                self._forget(evicted_key)
+            if key not in evicted:
+                self._remember(key, entry, len(body))
+        return entry
+
+    def purge_stale(self, versions):
+        """
+        Deletes every entry of the given tickers whose data version is not the current one.
+
+        Args:
+            versions (dict): Ticker symbol -> current (last_date, row_count) watermark.
+
+        Returns:
+            int: Number of entries deleted.
+        """
+        if not versions:
+            return 0
+        current = json.dumps({ticker: self._version_text(version) for ticker, version in versions.items()})
+        with self._lock:
+            keys = [row[0] for row in self._store.index.execute("""
+                SELECT e.Key FROM Entries e JOIN json_each(?) v ON e.Ticker = v.key
+                WHERE e.Version <> v.value;
+            """, (current,)).fetchall()]
+            self._delete(keys)
+        if keys:
+            logging.info(f"Indicator cache dropped {len(keys)} entries invalidated by new data.")
+        return len(keys)
+
+    def _remember(self, key, entry, size):
+        if size > self.max_memory_bytes:
+            return
+        self._memory[key] = (entry, size)
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_memory_bytes:
+            _, (_, evicted_size) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+
+    def _forget(self, key):
+        if key in self._memory:
+            self._memory_bytes -= self._memory.pop(key)[1]
+
+    def _delete(self, keys):
+        # Removes entries from both tiers
+        for key in keys:
+            self._forget(key)
+        self._store.delete(keys)
+
+    def clear(self):
+        """
+        Removes every cached entry.
+        """
+        with self._lock:
+            self._store.clear()
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def as_dict(self):
+        with self._lock:
+            entries, size = self._store.totals()
+            memory_entries = len(self._memory)
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_ratio': round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+            'entries': entries,
+            'bytes': size,
+            'memory_entries': memory_entries,
+            'memory_bytes': self._memory_bytes,
+        }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_indicator_cache():
+    """
+    Returns the process-wide indicator cache, creating it on first use.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = IndicatorCache()
+        return _default_cache
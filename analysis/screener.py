@@ -0,0 +1,159 @@
+# analysis/screener.py
+
+import numpy as np
+import pandas as pd
+
+from analysis.mxwll_engine import frequency_settings
+
+
+REQUIRED_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+TRADING_DAYS_PER_YEAR = 252  # For annualized volatility
+
+COMPARISON_COLUMNS = ['Ticker', 'High_AOI', 'Low_AOI', 'Last Close', 'ATR', 'Potential Profit (%)', 'Volatility', 'Volume']
+
+
+def clean_panel(panel):
+    """
+    Drops rows with missing or infinite values in any required column and enforces dtypes.
+
+    Args:
+        panel (pd.DataFrame): Panel from utils.db_manager.get_ticker_panel.
+
+    Returns:
+        pd.DataFrame: The cleaned panel, still sorted by Ticker then Date.
+    """
+    values = panel[REQUIRED_COLUMNS].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+    panel = panel.loc[np.isfinite(values).all(axis=1)].reset_index(drop=True)
+    return panel.astype({
+        "Open": "float64",
+        "High": "float64",
+        "Low": "float64",
+        "Close": "float64",
+        "Volume": "int64"
+    })
+
+
+def group_bounds(tickers):
+    """
+    Returns the start and end (exclusive) row of every ticker in a panel sorted by ticker.
+    """
+    tickers = np.asarray(tickers)
+    if len(tickers) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, tickers[1:] != tickers[:-1]])
+    ends = np.r_[starts[1:], len(tickers)]
+    return starts, ends
+
+
+def segment_reduce(ufunc, values, starts, ends):
+    """
+    Applies ufunc.reduce to values[starts[i]:ends[i]] for every (non-empty) segment in one call.
+    """
+    # reduceat reduces between consecutive indices; interleaving starts and ends and keeping
+    # every other result gives the requested segments. The pad keeps `ends` in bounds.
+    padded = np.append(values, values[:1])
+    indices = np.column_stack([starts, ends]).ravel()
+    return ufunc.reduceat(padded, indices)[::2]
+
+
+def last_wilder_atr(high, low, close, starts, ends, window):
+    """
+    Latest Wilder ATR of every ticker, identical to analysis.mxwll_engine.wilder_atr(...)[-1].
+
+    The recursion atr[i] = atr[i-1] + (tr[i] - atr[i-1]) / window unrolls to
+    (1 - a)^(L - window) * seed + a * sum_j (1 - a)^(L - 1 - j) * tr[j], with a = 1 / window and seed
+    the mean of the first window true ranges, so all tickers are computed with one weighted reduction.
+
+    Returns:
+        np.ndarray: ATR per ticker, 0 for tickers with fewer than window bars.
+    """
+    n = len(close)
+    previous_close = np.r_[np.nan, close[:-1]]
+    previous_close[starts] = np.nan  # No previous close across tickers
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - previous_close), np.abs(low - previous_close)))
+
+    lengths = ends - starts
+    valid = lengths >= window
+    decay = 1 - 1 / window
+    group_of_row = np.repeat(np.arange(len(starts)), lengths)
+    position = np.arange(n) - starts[group_of_row]
+    # Rows after the seed window contribute tr * a * decay^(bars until the last row)
+    weights = np.where(position >= window, (1 / window) * decay ** (ends[group_of_row] - 1 - np.arange(n)), 0.0)
+    tail = segment_reduce(np.add, true_range * weights, starts, ends)
+
+    seed_ends = np.minimum(starts + window, ends)
+    seed = segment_reduce(np.add, true_range, starts, seed_ends) / window
+    atr = decay ** np.maximum(lengths - window, 0) * seed + tail
+    return np.where(valid, atr, 0.0)
+
+
+def screen_universe(panel, params, min_profit=0.0, min_volume=0):
+    """
+    Computes the AOI comparison metrics of every ticker in a panel in one vectorized pass.
+
+    Matches the per-ticker analysis: the AOI high/low are the extremes of the last aoi_length highs,
+    lows and opens (+1% / -1%), potential profit is the distance from the last close up to the AOI
+    high, and volatility is the annualized standard deviation of daily returns.
+
+    Args:
+        panel (pd.DataFrame): Cleaned panel (see clean_panel), sorted by Ticker then Date.
+        params (dict): Dictionary of analysis parameters.
+        min_profit (float): Minimum potential profit (%) to keep a ticker.
+        min_volume (int): Minimum volume of the last bar to keep a ticker.
+
+    Returns:
+        pd.DataFrame: One row per ticker passing the filters, with COMPARISON_COLUMNS.
+    """
+    if panel.empty or not params['show_aoe']:
+        return pd.DataFrame(columns=COMPARISON_COLUMNS)
+
+    settings = frequency_settings(params['data_frequency'])
+    tickers = panel['Ticker'].to_numpy()
+    open_ = panel['Open'].to_numpy()
+    high = panel['High'].to_numpy()
+    low = panel['Low'].to_numpy()
+    close = panel['Close'].to_numpy()
+    volume = panel['Volume'].to_numpy()
+    starts, ends = group_bounds(tickers)
+    last = ends - 1
+
+    # === Area of Interest over the last aoi_length bars ===
+    aoi_starts = np.maximum(starts, ends - settings['aoi_length'])
+    high_aoi = np.round(segment_reduce(np.maximum, np.maximum(high, open_), aoi_starts, ends) * 1.01, 2)
+    low_aoi = np.round(segment_reduce(np.minimum, np.minimum(low, open_), aoi_starts, ends) * 0.99, 2)
+
+    # === Potential profit and volatility ===
+    last_close = close[last]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        potential_profit = np.where(high_aoi != 0, (high_aoi - last_close) / high_aoi * 100, np.nan)
+        returns = close[1:] / close[:-1] - 1
+    returns = np.r_[np.nan, returns]
+    returns[starts] = np.nan  # No return across tickers
+    volatility = pd.Series(returns).groupby(np.repeat(np.arange(len(starts)), ends - starts)).std().to_numpy()
+    volatility = volatility * np.sqrt(TRADING_DAYS_PER_YEAR)
+
+    comparison_df = pd.DataFrame({
+        'Ticker': tickers[starts],
+        'High_AOI': high_aoi,
+        'Low_AOI': low_aoi,
+        'Last Close': last_close,
+        'ATR': np.round(last_wilder_atr(high, low, close, starts, ends, settings['atr_window']), 2),
+        'Potential Profit (%)': np.round(potential_profit, 2),
+        'Volatility': np.round(volatility, 2),
+        'Volume': volume[last],
+    })
+    keep = (comparison_df['Potential Profit (%)'] >= min_profit) & (comparison_df['Volume'] >= min_volume)
+    return comparison_df.loc[keep].reset_index(drop=True)
+
+
+def ticker_frame(panel, ticker):
+    """
+    Extracts one ticker from a panel as a Date-indexed OHLCV DataFrame, as used by compute_mxwll.
+    """
+    tickers = panel['Ticker'].to_numpy()
+    start = np.searchsorted(tickers, ticker, side='left')
+    end = np.searchsorted(tickers, ticker, side='right')
+    df = panel.iloc[start:end].drop(columns='Ticker')
+    df = df.set_index(pd.to_datetime(df['Date'])).drop(columns='Date')
+    df.index.name = 'Date'
+    return df
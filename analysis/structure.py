@@ -0,0 +1,163 @@
+# analysis/structure.py
+
+import numpy as np
+
+from analysis.fvg import BEARISH, BULLISH, _first_crossing, _range_reduce, _sparse_table
+
+
+# Structure labels, as used by the internal_structure / external_structure parameters
+BOS = "BoS"  # Break of structure: a break in the direction of the current trend
+CHOCH = "CHoCH"  # Change of character: the first break against the current trend
+
+
+def structure_tables(high, low, close):
+    """
+    Builds the sparse tables shared by every detect_structure call on the same bars.
+    """
+    return {
+        'close_max': _sparse_table(close, np.maximum),
+        'close_min': _sparse_table(close, np.minimum),
+        'high_max': _sparse_table(high, np.maximum),
+        'low_min': _sparse_table(low, np.minimum),
+    }
+
+
+def _as_index(position, n):
+    # _first_crossing returns n where there is no crossing
+    return np.where(position < n, position, -1)
+
+
+def _breaks(pivots, levels, sensitivity, table, direction, n):
+    """
+    Finds the bar where each pivot level is first closed beyond, while it is the latest level.
+
+    A pivot becomes the tracked level when it is confirmed (sensitivity bars later) and stays so
+    until the next pivot of the same side is confirmed.
+    """
+    confirmed_at = pivots + sensitivity
+    replaced_at = np.append(confirmed_at[1:], n)
+    start = np.minimum(confirmed_at + 1, n)
+    crossing = _first_crossing(table, start, levels, below=direction == BEARISH, inclusive=False)
+    broken = crossing < replaced_at
+    return pivots[broken], crossing[broken]
+
+
+def _order_blocks(pivots, break_bars, direction, high, low, close, tables):
+    """
+    Locates the order block of each break: the bar with the lowest low (bullish) or highest high
+    (bearish) between the pivot and the break, then tracks when price returns to it.
+    """
+    n = len(close)
+    start = pivots + 1
+    if direction == BULLISH:
+        extreme = _range_reduce(tables['low_min'], start, break_bars, np.minimum, np.inf)
+        index = _first_crossing(tables['low_min'], start, extreme, below=True, inclusive=True)
+    else:
+        extreme = _range_reduce(tables['high_max'], start, break_bars, np.maximum, -np.inf)
+        index = _first_crossing(tables['high_max'], start, extreme, below=False, inclusive=True)
+    top = high[index]
+    bottom = low[index]
+
+    after = np.minimum(break_bars + 1, n)
+    if direction == BULLISH:
+        # Mitigated when a wick trades back down into the block, violated on a close below it
+        mitigated = _first_crossing(tables['low_min'], after, top, below=True, inclusive=True)
+        violated = _first_crossing(tables['close_min'], after, bottom, below=True, inclusive=False)
+    else:
+        mitigated = _first_crossing(tables['high_max'], after, bottom, below=False, inclusive=True)
+        violated = _first_crossing(tables['close_max'], after, top, below=False, inclusive=False)
+    return index, top, bottom, _as_index(mitigated, n), _as_index(violated, n)
+
+
+def detect_structure(high, low, close, pivot_highs, pivot_lows, sensitivity, tables=None, order_blocks=True):
+    """
+    Detects breaks of structure (BoS), changes of character (CHoCH) and order blocks from confirmed pivots.
+
+    The latest confirmed swing high (low) is the tracked level; the first close above (below) it
+    is a bullish (bearish) break, and each level breaks at most once. A break against the
+    direction of the previous break is a CHoCH, otherwise a BoS (the first break is a BoS).
+
+    Each break leaves an order block on the bar with the lowest low (bullish) or highest high
+    (bearish) between the pivot and the break. A block is mitigated when price trades back into
+    it and violated when a bar closes beyond its far edge.
+
+    All queries are vectorized over the sparse tables, O((n + pivots) log n) overall.
+
+    Args:
+        high (array-like): High prices.
+        low (array-like): Low prices.
+        close (array-like): Close prices.
+        pivot_highs (np.ndarray): Confirmed pivot high bar indexes, see analysis.pivots.detect_pivots.
+        pivot_lows (np.ndarray): Confirmed pivot low bar indexes.
+        sensitivity (int): Sensitivity the pivots were detected with; a pivot is confirmed that many bars later.
+        tables (dict): Output of structure_tables for these bars, to share it between calls.
+        order_blocks (bool): Also locate and track order blocks.
+
+    Returns:
+        dict:
+            - 'events': Arrays with one entry per break, ordered by bar:
+                'index' (breaking bar), 'direction' (BULLISH/BEARISH), 'pivot' (bar of the broken
+                pivot), 'level' (broken price) and 'choch' (True for a CHoCH, False for a BoS).
+            - 'order_blocks': Arrays with one entry per break, in the same order: 'index' (block
+              bar), 'direction', 'top', 'bottom', 'break_index', 'mitigated_index' and
+              'violated_index' (-1 if none). Empty when order_blocks is False.
+            - 'trend': Direction of the last break, or 0 if there was none.
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    pivot_highs = np.asarray(pivot_highs, dtype=np.int64)
+    pivot_lows = np.asarray(pivot_lows, dtype=np.int64)
+    n = len(close)
+    if tables is None:
+        tables = structure_tables(high, low, close)
+
+    bull_pivots, bull_bars = _breaks(pivot_highs, high[pivot_highs], sensitivity, tables['close_max'], BULLISH, n)
+    bear_pivots, bear_bars = _breaks(pivot_lows, low[pivot_lows], sensitivity, tables['close_min'], BEARISH, n)
+
+    index = np.concatenate([bull_bars, bear_bars]).astype(np.int64)
+    direction = np.concatenate([
+        np.full(len(bull_bars), BULLISH, dtype=np.int8),
+        np.full(len(bear_bars), BEARISH, dtype=np.int8),
+    ])
+    pivot = np.concatenate([bull_pivots, bear_pivots]).astype(np.int64)
+    level = np.concatenate([high[bull_pivots], low[bear_pivots]])
+    order = np.lexsort((-direction, index))
+    index, direction, pivot, level = index[order], direction[order], pivot[order], level[order]
+    choch = np.r_[False, direction[1:] != direction[:-1]][:len(direction)]
+
+    blocks = {key: np.empty(0, dtype=np.int64) for key in ('index', 'break_index', 'mitigated_index', 'violated_index')}
+    blocks.update(direction=np.empty(0, dtype=np.int8), top=np.empty(0), bottom=np.empty(0))
+    if order_blocks and len(index):
+        parts = [
+            _order_blocks(pivot[direction == side], index[direction == side], side, high, low, close, tables)
+            for side in (BULLISH, BEARISH)
+        ]
+        # Scatter each side back into event order
+        for key, position in (('index', 0), ('top', 1), ('bottom', 2), ('mitigated_index', 3), ('violated_index', 4)):
+            values = np.empty(len(index), dtype=parts[0][position].dtype)
+            values[direction == BULLISH] = parts[0][position]
+            values[direction == BEARISH] = parts[1][position]
+            blocks[key] = values
+        blocks['direction'] = direction.copy()
+        blocks['break_index'] = index.copy()
+
+    return {
+        'events': {'index': index, 'direction': direction, 'pivot': pivot, 'level': level, 'choch': choch},
+        'order_blocks': blocks,
+        'trend': int(direction[-1]) if len(direction) else 0,
+    }
+
+
+def filter_events(events, structure):
+    """
+    Selects the events shown for an internal_structure / external_structure setting ("All", "BoS" or "CHoCH").
+
+    Returns:
+        np.ndarray: Boolean mask over the events.
+    """
+    if structure == BOS:
+        return ~events['choch']
+    if structure == CHOCH:
+        return events['choch'].copy()
+    return np.ones(len(events['index']), dtype=bool)
@@ -0,0 +1,72 @@
+# benchmarks/bench_analysis.py
+#
+# Times compute_mxwll over a synthetic universe, sequentially and on the process pool of
+# analysis/parallel.py with increasing worker counts, to show how a full-universe run scales
+# with cores.
+#
+# Usage (from the project root):
+#     python -m benchmarks.bench_analysis --tickers 550 --bars 1250 --workers 1 2 4 8
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from analysis.mxwll_engine import compute_mxwll
+from analysis.parallel import analyze_universe
+from analysis.screener import ticker_frame
+from functionalities.analyze_tickers import ANALYSIS_PARAMS
+
+
+def make_panel(tickers, bars, seed=0):
+    """
+    Builds a random-walk OHLCV panel shaped like utils.db_manager.get_ticker_panel output.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end='2024-10-11', periods=bars).strftime('%Y-%m-%d')
+    frames = []
+    for i in range(tickers):
+        close = np.abs(50 + np.cumsum(rng.normal(0, 1, bars))) + 1
+        open_ = close + rng.normal(0, 0.5, bars)
+        frames.append(pd.DataFrame({
+            'Ticker': f"T{i:04d}",
+            'Date': dates,
+            'Open': open_,
+            'High': np.maximum(open_, close) + rng.uniform(0, 1, bars),
+            'Low': np.minimum(open_, close) - rng.uniform(0, 1, bars),
+            'Close': close,
+            'Volume': rng.integers(0, 1_000_000, bars),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sequential vs process-pool compute_mxwll over a synthetic universe.")
+    parser.add_argument('--tickers', type=int, default=550)
+    parser.add_argument('--bars', type=int, default=1250, help="Bars per ticker (1250 is about 5 years of daily data).")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    panel = make_panel(args.tickers, args.bars)
+    results = {'tickers': args.tickers, 'bars': args.bars, 'cpu_count': os.cpu_count(), 'seconds': {}}
+
+    started_at = time.perf_counter()
+    for ticker in panel['Ticker'].unique():
+        compute_mxwll(ticker_frame(panel, ticker), ticker, ANALYSIS_PARAMS)
+    results['seconds']['sequential'] = round(time.perf_counter() - started_at, 3)
+
+    for workers in sorted(set(args.workers)):
+        started_at = time.perf_counter()
+        errors = [error for _, _, error in analyze_universe(panel, ANALYSIS_PARAMS, workers=workers) if error]
+        results['seconds'][f"workers_{workers}"] = round(time.perf_counter() - started_at, 3)
+        if errors:
+            results.setdefault('errors', []).extend(errors)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
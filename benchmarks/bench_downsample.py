@@ -0,0 +1,72 @@
+# benchmarks/bench_downsample.py
+#
+# Shows that chart payload and render time stay bounded as the lookback grows once candles are
+# aggregated (downsample_ohlc) and overlays thinned, and checks the aggregated candles keep the
+# true highs and lows.
+#
+# Usage (from the project root):
+#     python -m benchmarks.bench_downsample --bars 1250 5000 20000 40000
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from analysis.downsample import downsample_ohlc, lttb
+from analysis.mxwll_engine import compute_mxwll
+from analysis.mxwll_renderer import MAX_CANDLES, figure_payload_bytes, render_mxwll
+from analysis.screener import ticker_frame
+from benchmarks.bench_analysis import make_panel
+from functionalities.analyze_tickers import ANALYSIS_PARAMS
+
+
+def check_candles(df, candles, size):
+    assert len(candles) <= MAX_CANDLES
+    assert candles['High'].max() == df['High'].max() and candles['Low'].min() == df['Low'].min()
+    assert candles['Open'].iloc[0] == df['Open'].iloc[0] and candles['Close'].iloc[-1] == df['Close'].iloc[-1]
+    assert candles['Volume'].sum() == df['Volume'].sum()
+    # Every bar lies within the time span of its candle's bucket
+    assert candles.index.is_monotonic_increasing and candles.index[-1] <= df.index[-1]
+    assert size == 1 or candles.index[0] >= df.index[0]
+
+
+def render(df, result, params, max_candles):
+    started_at = time.perf_counter()
+    fig = render_mxwll(df, result, params, max_candles=max_candles)
+    payload = figure_payload_bytes(fig)
+    return {'render_ms': round((time.perf_counter() - started_at) * 1000, 1), 'payload_kb': round(payload / 1024, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chart payload and render time vs lookback, with and without downsampling.")
+    parser.add_argument('--bars', type=int, nargs='+', default=[1250, 5000, 20_000, 40_000], help="15m bars per chart.")
+    args = parser.parse_args()
+
+    params = {**ANALYSIS_PARAMS, 'data_frequency': '15m'}
+    results = []
+    for bars in args.bars:
+        df = ticker_frame(make_panel(1, bars), 'T0000')
+        df.index = pd.date_range(end='2024-10-11 23:45', periods=len(df), freq='15min')
+        result = compute_mxwll(df, 'T0000', params)
+
+        candles, size = downsample_ohlc(df, MAX_CANDLES)
+        check_candles(df, candles, size)
+        started_at = time.perf_counter()
+        kept = lttb(np.arange(bars), df['Close'].to_numpy(), MAX_CANDLES)
+        lttb_ms = (time.perf_counter() - started_at) * 1000
+
+        results.append({
+            'bars': bars,
+            'bars_per_candle': size,
+            'full': render(df, result, params, None),
+            'downsampled': render(df, result, params, MAX_CANDLES),
+            'lttb_ms': round(lttb_ms, 2),
+            'lttb_points': len(kept),
+        })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
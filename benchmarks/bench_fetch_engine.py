@@ -0,0 +1,49 @@
+# benchmarks/bench_fetch_engine.py
+#
+# Runs fetch_all_tickers_data against the local stand-in server (benchmarks/standin_server.py)
+# with injected throttling and server errors, and reports tickers/second and retry accounting.
+#
+# Usage (from the project root):
+#     python -m benchmarks.bench_fetch_engine --tickers 500 --error-rate 0.05 --throttle-rate 0.05
+
+import argparse
+import asyncio
+import json
+
+from benchmarks.standin_server import make_app, make_tickers, start_server
+from utils.data_fetcher import fetch_all_tickers_data
+from utils.fetch_engine import FetchEngine
+
+
+async def run(args):
+    app = make_app(tickers=args.tickers, rows=args.rows, latency=args.latency,
+                   error_rate=args.error_rate, throttle_rate=args.throttle_rate)
+    runner, base_url = await start_server(app)
+
+    tickers = make_tickers(args.tickers)
+    engine = FetchEngine(max_concurrency=args.concurrency, rate_per_host=args.rate, burst=args.concurrency)
+    try:
+        data = await fetch_all_tickers_data(tickers, "01 Jan 2000", "31 Dec 2024", engine=engine, base_url=base_url)
+    finally:
+        await runner.cleanup()
+
+    stats = engine.stats.as_dict()
+    stats['missing'] = sum(1 for value in data.values() if value is None)
+    stats['server'] = app['stats']
+    print(json.dumps(stats, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ticker fetch engine against a local stand-in server.")
+    parser.add_argument('--tickers', type=int, default=500)
+    parser.add_argument('--rows', type=int, default=250)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--error-rate', type=float, default=0.05)
+    parser.add_argument('--throttle-rate', type=float, default=0.05)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--rate', type=float, default=200.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
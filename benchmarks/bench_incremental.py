@@ -0,0 +1,80 @@
+# benchmarks/bench_incremental.py
+#
+# Times IndicatorState.update for one new bar against compute_mxwll over the whole history, and
+# checks that both give the same result. The update only depends on the analysed window, so its
+# time stays flat as the history grows.
+#
+# Usage (from the project root):
+#     python -m benchmarks.bench_incremental --bars 1250 20000 100000 --window 1250 --repeat 20
+
+import argparse
+import json
+import pickle
+import time
+
+import numpy as np
+
+from analysis.incremental import IndicatorState
+from analysis.mxwll_engine import compute_mxwll
+from analysis.screener import ticker_frame
+from benchmarks.bench_analysis import make_panel
+from functionalities.analyze_tickers import ANALYSIS_PARAMS
+
+
+def assert_same(expected, actual, path='result'):
+    if isinstance(expected, dict):
+        assert expected.keys() == actual.keys(), path
+        for key in expected:
+            assert_same(expected[key], actual[key], f"{path}.{key}")
+    elif isinstance(expected, np.ndarray):
+        assert expected.dtype == actual.dtype and np.array_equal(expected, actual, equal_nan=True), path
+    elif isinstance(expected, (list, tuple)):
+        assert len(expected) == len(actual), path
+        for left, right in zip(expected, actual):
+            assert_same(left, right, path)
+    else:
+        assert expected == actual, path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental update of one bar vs a full indicator recompute.")
+    parser.add_argument('--bars', type=int, nargs='+', default=[1250, 20_000, 100_000])
+    parser.add_argument('--window', type=int, default=1250, help="Analysed bars at the end of the history.")
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    results = []
+    for bars in args.bars:
+        df = ticker_frame(make_panel(1, bars + 1), 'T0000')
+        state = IndicatorState.from_frame(df.iloc[:-1], 'T0000', ANALYSIS_PARAMS)
+        blob = pickle.dumps(state)
+        start = max(len(df) - args.window, 0)
+
+        expected = compute_mxwll(df, 'T0000', ANALYSIS_PARAMS, start=start)
+        actual = pickle.loads(blob).update(df.iloc[-1:], start)
+        for name in expected.__dataclass_fields__:
+            assert_same(getattr(expected, name), getattr(actual, name), name)
+
+        states = [pickle.loads(blob) for _ in range(args.repeat)]
+        started_at = time.perf_counter()
+        for state in states:
+            state.update(df.iloc[-1:], start)
+        update_seconds = (time.perf_counter() - started_at) / args.repeat
+
+        started_at = time.perf_counter()
+        for _ in range(args.repeat):
+            compute_mxwll(df, 'T0000', ANALYSIS_PARAMS, start=start)
+        full_seconds = (time.perf_counter() - started_at) / args.repeat
+
+        results.append({
+            'bars': bars,
+            'update_ms': round(update_seconds * 1000, 3),
+            'full_recompute_ms': round(full_seconds * 1000, 3),
+            'speedup': round(full_seconds / update_seconds, 2),
+            'state_kb': len(blob) // 1024,
+        })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
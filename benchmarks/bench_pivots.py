@@ -0,0 +1,92 @@
+# benchmarks/bench_pivots.py
+#
+# Compares the original centred rolling max/min pivot detection (kept below as
+# legacy_calculate_pivots, one call per sensitivity) against analysis.pivots.detect_pivots, which
+# handles every sensitivity in one pass. Results are checked against a brute-force reference on
+# the smallest size.
+#
+# Usage (from the project root):
+#     python -m benchmarks.bench_pivots --bars 10000 1000000 --repeat 5
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from analysis.pivots import detect_pivots
+
+
+SENSITIVITIES = (3, 5, 8, 10, 25, 50)  # Internal and external options of analyze_tickers
+
+
+def legacy_calculate_pivots(high, low, sensitivity):
+    window = 2 * sensitivity + 1
+    rolling_max = pd.Series(high).rolling(window=window, center=True).max().to_numpy()
+    rolling_min = pd.Series(low).rolling(window=window, center=True).min().to_numpy()
+    return np.flatnonzero(high == rolling_max), np.flatnonzero(low == rolling_min)
+
+
+def reference_pivots(values, sensitivity):
+    """
+    Brute force: the first bar of the window maximum, confirmed once sensitivity bars follow it.
+    """
+    confirmed, provisional = [], []
+    for i in range(sensitivity, len(values)):
+        window = values[i - sensitivity:i + sensitivity + 1]
+        if np.argmax(window) == sensitivity:
+            (confirmed if i + sensitivity < len(values) else provisional).append(i)
+    return confirmed, provisional
+
+
+def make_bars(bars, seed=0):
+    # Prices rounded to the tick so flat tops and bottoms occur, as in real data
+    rng = np.random.default_rng(seed)
+    close = np.round(100 + np.cumsum(rng.normal(0, 0.5, bars)), 1)
+    high = close + np.round(rng.uniform(0, 0.5, bars), 1)
+    low = close - np.round(rng.uniform(0, 0.5, bars), 1)
+    return high, low
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started_at)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Legacy rolling pivots vs the one-pass pivot engine.")
+    parser.add_argument('--bars', type=int, nargs='+', default=[10_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    high, low = make_bars(min(args.bars))
+    pivots = detect_pivots(high, low, SENSITIVITIES)
+    for sensitivity in SENSITIVITIES:
+        assert (pivots[sensitivity]['highs'].tolist(), pivots[sensitivity]['provisional_highs'].tolist()) == reference_pivots(high, sensitivity)
+        assert (pivots[sensitivity]['lows'].tolist(), pivots[sensitivity]['provisional_lows'].tolist()) == reference_pivots(-low, sensitivity)
+
+    results = []
+    for bars in args.bars:
+        high, low = make_bars(bars)
+        legacy_seconds = best_of(args.repeat, lambda: [legacy_calculate_pivots(high, low, s) for s in SENSITIVITIES])
+        engine_seconds = best_of(args.repeat, lambda: detect_pivots(high, low, SENSITIVITIES))
+        legacy_highs = legacy_calculate_pivots(high, low, 25)[0]
+        results.append({
+            'bars': bars,
+            'sensitivities': list(SENSITIVITIES),
+            'legacy_seconds': round(legacy_seconds, 4),
+            'engine_seconds': round(engine_seconds, 4),
+            'speedup': round(legacy_seconds / engine_seconds, 2),
+            'legacy_highs_25': len(legacy_highs),
+            'engine_highs_25': len(detect_pivots(high, low, [25])[25]['highs']),  # Plateaus de-duplicated
+        })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
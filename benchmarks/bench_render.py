@@ -0,0 +1,148 @@
+# benchmarks/bench_render.py
+#
+# Compares the figure JSON size and render time of render_mxwll against the previous renderer
+# (one trace per marker, one shape per box and session), on a 5-year daily chart and a 15m chart.
+#
+# Usage (from the project root):
+#     python -m benchmarks.bench_render --daily-bars 1250 --intraday-bars 2000 --repeat 3
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+import plotly.graph_objects as go
+
+from analysis.fvg import BULLISH
+from analysis.mxwll_engine import SESSION_TIMES, compute_mxwll, frequency_settings
+from analysis.mxwll_renderer import figure_payload_bytes, render_mxwll
+from analysis.screener import ticker_frame
+from analysis.structure import BOS, CHOCH, filter_events
+from benchmarks.bench_analysis import make_panel
+from functionalities.analyze_tickers import ANALYSIS_PARAMS
+
+
+def legacy_render_mxwll(df, result, params):
+    """
+    The renderer before figures were packed: one trace per swing marker, one shape per order
+    block, FVG and session day.
+    """
+    fig = go.Figure()
+    fig.add_trace(go.Candlestick(x=df.index, open=df['Open'], high=df['High'], low=df['Low'], close=df['Close'],
+                                 name='Price', increasing_line_color='green', decreasing_line_color='red'))
+
+    markers = []
+    if params['show_hhlh']:
+        markers += [(p, 'High', params['bear_color'], 10, 'triangle-up', 'HH') for p in result.swing_highs[-params['swing_order_blocks']:]]
+    if params['show_hlll']:
+        markers += [(p, 'Low', params['bull_color'], 10, 'triangle-down', 'LL') for p in result.swing_lows[-params['swing_order_blocks']:]]
+    if params['show_internals']:
+        markers += [(p, 'High', params['bear_color'], 6, 'triangle-up', None) for p in result.internal_highs]
+        markers += [(p, 'Low', params['bull_color'], 6, 'triangle-down', None) for p in result.internal_lows]
+    for position, column, color, size, symbol, text in markers:
+        fig.add_trace(go.Scatter(x=[df.index[position]], y=[df[column].iloc[position]],
+                                 mode='markers+text' if text else 'markers',
+                                 marker=dict(color=color, size=size, symbol=symbol),
+                                 text=[text] if text else None, showlegend=False))
+
+    for structure, setting, internal in ((result.external_structure, params['external_structure'], False),
+                                         (result.internal_structure, params['internal_structure'], True)):
+        if structure is None:
+            continue
+        events = structure['events']
+        shown = filter_events(events, setting)
+        for side, color in ((BULLISH, params['bull_color']), (-BULLISH, params['bear_color'])):
+            rows = shown & (events['direction'] == side)
+            if not rows.any():
+                continue
+            x, y = [], []
+            for start, end, level in zip(events['pivot'][rows], events['index'][rows], events['level'][rows]):
+                x += [df.index[start], df.index[end], None]
+                y += [level, level, None]
+            fig.add_trace(go.Scatter(x=x, y=y, mode='lines', line=dict(color=color, width=1, dash='dot' if internal else 'dash'),
+                                     hoverinfo='skip', showlegend=False))
+            middles = (events['pivot'][rows] + events['index'][rows]) // 2
+            fig.add_trace(go.Scatter(x=df.index[middles], y=events['level'][rows], mode='text',
+                                     text=[CHOCH if choch else BOS for choch in events['choch'][rows]],
+                                     textfont=dict(color=color), showlegend=False))
+        if not internal and params['show_order_blocks']:
+            blocks = structure['order_blocks']
+            active = [i for i in range(len(blocks['index'])) if blocks['violated_index'][i] < 0]
+            for i in active[-params['swing_order_blocks']:]:
+                fig.add_shape(type="rect", x0=df.index[blocks['index'][i]], y0=blocks['bottom'][i], x1=df.index[-1], y1=blocks['top'][i],
+                              fillcolor=params['bull_color'] if blocks['direction'][i] == BULLISH else params['bear_color'],
+                              opacity=0.15 if blocks['mitigated_index'][i] >= 0 else 0.3, line=dict(width=0), layer='below')
+
+    if params['show_fvg']:
+        fvgs = result.fvgs
+        for i in range(len(fvgs['index'])):
+            violated_at = fvgs['violated_index'][i]
+            if violated_at >= 0 and not params['contract_violated_fvg']:
+                continue
+            fig.add_shape(type="rect", x0=df.index[fvgs['index'][i]], y0=fvgs['remaining_bottom'][i],
+                          x1=df.index[violated_at if violated_at >= 0 else len(df) - 1], y1=fvgs['remaining_top'][i],
+                          fillcolor=params['fvg_color'], opacity=params['fvg_transparency'] / 100, line=dict(width=0), layer='below')
+
+    if frequency_settings(params['data_frequency'])['session_enabled']:
+        for session, props in SESSION_TIMES.items():
+            start_time = datetime.strptime(props['start'], '%H:%M').time()
+            end_time = datetime.strptime(props['end'], '%H:%M').time()
+            for date in df.index.normalize().unique():
+                start_datetime = datetime.combine(date, start_time)
+                end_datetime = datetime.combine(date, end_time)
+                if end_datetime <= start_datetime:
+                    end_datetime += timedelta(days=1)
+                fig.add_vrect(x0=start_datetime, x1=end_datetime, fillcolor=params['fvg_color'], opacity=params['transparency'],
+                              layer="below", line_width=0,
+                              annotation_text=session if (date == df.index[-1].normalize()) else "",
+                              annotation_position="top left")
+    fig.update_xaxes(rangeslider_visible=False)
+    return fig
+
+
+def measure(render, df, result, params, repeat):
+    started_at = time.perf_counter()
+    for _ in range(repeat):
+        fig = render(df, result, params)
+        payload = figure_payload_bytes(fig)
+    return {
+        'render_ms': round((time.perf_counter() - started_at) / repeat * 1000, 1),
+        'payload_kb': round(payload / 1024, 1),
+        'traces': len(fig.data),
+        'shapes': len(fig.layout.shapes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Figure payload and render time, packed vs per-object renderer.")
+    parser.add_argument('--daily-bars', type=int, default=1250, help="1250 is about 5 years of daily data.")
+    parser.add_argument('--intraday-bars', type=int, default=2000, help="15m bars, around-the-clock.")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    charts = []
+    daily = ticker_frame(make_panel(1, args.daily_bars), 'T0000')
+    charts.append(('1D', daily, ANALYSIS_PARAMS))
+    intraday = ticker_frame(make_panel(1, args.intraday_bars, seed=1), 'T0000')
+    intraday.index = pd.date_range(end='2024-10-11 23:45', periods=len(intraday), freq='15min')
+    charts.append(('15m', intraday, {**ANALYSIS_PARAMS, 'data_frequency': '15m'}))
+
+    results = []
+    for name, df, params in charts:
+        result = compute_mxwll(df, 'T0000', params)
+        legacy = measure(legacy_render_mxwll, df, result, params, args.repeat)
+        packed = measure(render_mxwll, df, result, params, args.repeat)
+        results.append({
+            'chart': name,
+            'bars': len(df),
+            'legacy': legacy,
+            'packed': packed,
+            'payload_reduction': round(legacy['payload_kb'] / packed['payload_kb'], 2),
+            'render_speedup': round(legacy['render_ms'] / packed['render_ms'], 2),
+        })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# benchmarks/bench_sync.py
+#
+# End-to-end benchmark of synchronize_database against the local stand-in server and a temporary
+# SQLite file. For every universe size it records the wall time of each stage (market watch,
+# ticker fetch, ticker insert, transactions), requests/second, rows/second and peak RSS, and
+# writes the results as JSON so runs can be compared.
+#
+# Each size runs in a fresh subprocess so peak RSS is measured per size; the stand-in server
+# runs in this (parent) process so it does not count towards the sync's memory.
+#
+# Usage (from the project root):
+#     python -m benchmarks.bench_sync --sizes 50 500 2000 --output bench_sync.json
+
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+from benchmarks.standin_server import StandinServer
+
+
+DEFAULT_SIZES = [50, 500, 2000]
+DEFAULT_DATE = "2024-10-11"
+
+
+def run_child(args):
+    """
+    Runs one synchronization against the stand-in at args.base_url and writes the measurements to args.result_file.
+    """
+    from utils import data_fetcher, http_client, response_archive, response_cache
+    from utils.db_manager import SYNC_MODE_FULL, initialize_db_and_tables, synchronize_database
+    from utils.fetch_engine import FetchEngine
+
+    # Per-ticker logging and caching would distort the measurement
+    logging.getLogger().setLevel(logging.ERROR)
+    response_cache.set_default_cache(None)
+    response_archive.set_default_archive(None)
+    data_fetcher.configure_base_urls(args.base_url, args.base_url)
+
+    with tempfile.TemporaryDirectory() as directory:
+        conn = initialize_db_and_tables(os.path.join(directory, 'bench.db'))
+        engine = FetchEngine(max_concurrency=args.concurrency, rate_per_host=args.rate, burst=args.concurrency)
+        http_client.stats.reset()
+        summary = synchronize_database(conn, args.date, mode=SYNC_MODE_FULL, engine=engine)
+        conn.close()
+
+    timings = summary['timings']
+    rows = summary['tickers']['records_added']
+    requests = engine.stats.requests
+
+    def per_second(count, seconds):
+        return round(count / seconds, 1) if seconds else None
+
+    result = {
+        'tickers': args.tickers,
+        'rows_inserted': rows,
+        'market_watch_rows': summary['market_watch']['records_added'],
+        'transactions_inserted': summary['psx_transactions']['records_added'],
+        'ticker_errors': len(summary['tickers']['errors']),
+        'timings': timings,
+        'ticker_requests': requests,
+        'retries': sum(engine.stats.retries.values()),
+        'requests_per_second': per_second(requests, timings.get('ticker_fetch')),
+        'rows_per_second': per_second(rows, timings.get('tickers')),
+        'insert_rows_per_second': per_second(rows, timings.get('ticker_insert')),
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),  # ru_maxrss is KiB on Linux
+        'http': http_client.get_stats(),
+    }
+    with open(args.result_file, 'w') as result_file:
+        json.dump(result, result_file)
+
+
+def run_size(size, args):
+    """
+    Starts a stand-in for the given universe size and runs the sync in a subprocess.
+    """
+    with StandinServer(tickers=size, rows=args.rows, latency=args.latency, error_rate=args.error_rate) as server:
+        with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as result_file:
+            result_path = result_file.name
+        try:
+            command = [
+                sys.executable, '-m', 'benchmarks.bench_sync', '--child',
+                '--base-url', server.base_url, '--result-file', result_path, '--tickers', str(size),
+                '--date', args.date, '--concurrency', str(args.concurrency), '--rate', str(args.rate),
+            ]
+            subprocess.run(command, check=True)
+            with open(result_path) as result_file:
+                result = json.load(result_file)
+        finally:
+            os.remove(result_path)
+        result['server'] = dict(server.stats)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end synchronize_database benchmark against the local stand-in server.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Universe sizes (number of tickers).")
+    parser.add_argument('--rows', type=int, default=250, help="Price history rows served per ticker.")
+    parser.add_argument('--latency', type=float, default=0.02, help="Stand-in latency per request in seconds.")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of stand-in requests answered with 503.")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--rate', type=float, default=500.0, help="Fetch engine requests/second per host.")
+    parser.add_argument('--date', default=DEFAULT_DATE)
+    parser.add_argument('--output', default=None, help="Write the JSON results to this file as well as stdout.")
+    # Internal: a single measured run, started by the parent process
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    parser.add_argument('--result-file', help=argparse.SUPPRESS)
+    parser.add_argument('--tickers', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+        return
+
+    logging.getLogger().setLevel(logging.ERROR)
+    results = {
+        'meta': {
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'rows_per_ticker': args.rows,
+            'latency': args.latency,
+            'error_rate': args.error_rate,
+            'concurrency': args.concurrency,
+            'rate_per_host': args.rate,
+        },
+        'runs': [run_size(size, args) for size in args.sizes],
+    }
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(output)
+
+
+if __name__ == "__main__":
+    main()
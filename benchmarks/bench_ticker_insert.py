@@ -0,0 +1,138 @@
+# benchmarks/bench_ticker_insert.py
+#
+# Compares rows/second of the original per-record insert_ticker_data_into_db (kept below as
+# legacy_insert_ticker_data_into_db) against the vectorized, single-transaction bulk loader.
+#
+# Usage (from the project root):
+#     python -m benchmarks.bench_ticker_insert --tickers 200 --rows 2500
+
+import argparse
+import json
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from utils.db_manager import bulk_insert_ticker_data, create_ticker_watermark_table
+
+
+CREATE_TICKER_TABLE = """
+    CREATE TABLE IF NOT EXISTS Ticker (
+        Ticker TEXT,
+        Date TEXT,
+        Open REAL,
+        High REAL,
+        Low REAL,
+        Close REAL,
+        Change REAL,
+        "Change (%)" REAL,
+        Volume INTEGER,
+        PRIMARY KEY (Ticker, Date)
+    );
+"""
+
+
+def make_dataset(tickers, rows):
+    """
+    Builds synthetic raw responses shaped like the Investors Lounge price history API.
+    """
+    start = datetime(2000, 1, 3)
+    dataset = {}
+    for t in range(tickers):
+        price = random.uniform(10, 500)
+        records = []
+        for i in range(rows):
+            change = random.uniform(-2, 2)
+            price = max(1.0, price + change)
+            records.append({
+                'Date_': (start + timedelta(days=i)).strftime("%Y-%m-%dT00:00:00"),
+                'Open': str(price), 'High': str(price * 1.01), 'Low': str(price * 0.99), 'Close': str(price),
+                'Change': str(change), 'ChangeP': str(change / price * 100), 'Volume': random.randint(100, 10 ** 6),
+            })
+        dataset[f"T{t:04d}"] = records
+    return dataset
+
+
+def legacy_insert_ticker_data_into_db(conn, data, ticker, batch_size=100):
+    """
+    The original implementation: per-record strptime/round, a commit every batch and a COUNT(*) per ticker.
+    """
+    cursor = conn.cursor()
+    insert_query = """
+        INSERT OR IGNORE INTO Ticker
+        (Ticker, Date, Open, High, Low, Close, Change, "Change (%)", Volume)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);
+    """
+    data_to_insert = []
+    for record in data:
+        try:
+            date_raw = record.get('Date', record.get('Date_'))
+            date = datetime.strptime(date_raw[:10], "%Y-%m-%d").strftime("%Y-%m-%d")
+            open_ = round(float(record['Open']), 2)
+            high = round(float(record['High']), 2)
+            low = round(float(record['Low']), 2)
+            close = round(float(record['Close']), 2)
+            change = round(float(record['Change']), 2)
+            change_p = round(float(record.get('Change (%)', record.get('ChangeP', record.get('change_valueP')))), 2)
+            volume = int(record['Volume'])
+            if date and open_ and high and low and close and volume:
+                data_to_insert.append((ticker, date, open_, high, low, close, change, change_p, volume))
+        except (ValueError, KeyError):
+            continue
+
+    records_added = 0
+    for i in range(0, len(data_to_insert), batch_size):
+        cursor.executemany(insert_query, data_to_insert[i:i + batch_size])
+        conn.commit()
+        records_added += cursor.rowcount
+    cursor.execute("SELECT COUNT(*) FROM Ticker WHERE Ticker = ?;", (ticker,))
+    cursor.fetchone()
+    return True, records_added
+
+
+def fresh_connection(directory, name):
+    conn = sqlite3.connect(os.path.join(directory, name))
+    conn.execute(CREATE_TICKER_TABLE)
+    create_ticker_watermark_table(conn)
+    return conn
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ticker inserts: legacy per-record loader vs bulk loader.")
+    parser.add_argument('--tickers', type=int, default=100)
+    parser.add_argument('--rows', type=int, default=2500)
+    args = parser.parse_args()
+
+    # Per-record logging would dominate the measurement
+    logging.getLogger().setLevel(logging.ERROR)
+
+    dataset = make_dataset(args.tickers, args.rows)
+    total_rows = args.tickers * args.rows
+    results = {'tickers': args.tickers, 'rows': total_rows}
+
+    with tempfile.TemporaryDirectory() as directory:
+        conn = fresh_connection(directory, 'legacy.db')
+        started_at = time.perf_counter()
+        for ticker, data in dataset.items():
+            legacy_insert_ticker_data_into_db(conn, data, ticker)
+        elapsed = time.perf_counter() - started_at
+        conn.close()
+        results['legacy'] = {'seconds': round(elapsed, 3), 'rows_per_second': round(total_rows / elapsed)}
+
+        conn = fresh_connection(directory, 'bulk.db')
+        started_at = time.perf_counter()
+        success, records_added, _ = bulk_insert_ticker_data(conn, dataset)
+        elapsed = time.perf_counter() - started_at
+        conn.close()
+        results['bulk'] = {'seconds': round(elapsed, 3), 'rows_per_second': round(total_rows / elapsed),
+                           'records_added': records_added}
+
+    results['speedup'] = round(results['bulk']['rows_per_second'] / results['legacy']['rows_per_second'], 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
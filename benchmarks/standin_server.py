@@ -0,0 +1,378 @@
+# benchmarks/standin_server.py
+#
+# Local aiohttp stand-in for dps.psx.com.pk and investorslounge.com. It serves synthetic (or,
+# with --replay, recorded) responses for every endpoint the fetchers use, with injectable
+# latency, server errors and throttling, so the whole sync can run and be measured offline.
+#
+# Run standalone and point the app at it:
+#     python -m benchmarks.standin_server --port 8080 --tickers 500 --latency 0.05
+#     PSX_BASE_URL=http://127.0.0.1:8080 INVESTORS_LOUNGE_BASE_URL=http://127.0.0.1:8080 streamlit run main.py
+#
+# Or from code: with StandinServer(tickers=50) as server: configure_base_urls(server.base_url, server.base_url)
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from io import BytesIO
+from urllib.parse import urlsplit
+
+import pandas as pd
+from aiohttp import web
+
+from utils.data_fetcher import SECTOR_MAPPING, STOCK_DATA_PATH
+from utils.response_archive import ResponseArchive, read_partition
+
+
+SECTOR_CODES = sorted(SECTOR_MAPPING)
+INDICES = ['KSE100', 'KSE30', 'ALLSHR', 'KMI30']
+DEFAULTER_EVERY = 50  # Every n-th ticker is listed as a defaulter
+
+
+def make_tickers(count):
+    return [f"T{i:04d}" for i in range(count)]
+
+
+def base_price(ticker):
+    return 20 + zlib.crc32(ticker.encode()) % 480
+
+
+def price_on(ticker, day):
+    """
+    Deterministic synthetic close of a ticker on a date, so repeated runs return identical data.
+    """
+    seed = zlib.crc32(ticker.encode())
+    return round(base_price(ticker) * (1 + 0.2 * math.sin(day.toordinal() / 17 + seed)), 2)
+
+
+def make_price_history(ticker, date_from, date_to, max_rows):
+    """
+    Builds price history records shaped like the Investors Lounge response for the requested range,
+    limited to the max_rows most recent business days.
+    """
+    # Walk back from date_to so a full-history range (from 2000) costs max_rows days, not decades
+    days = []
+    day = date_to
+    while day >= date_from and len(days) < max_rows:
+        if day.weekday() < 5:
+            days.append(day)
+        day -= timedelta(days=1)
+    days.reverse()
+    records = []
+    previous = None
+    for day in days:
+        close = price_on(ticker, day)
+        change = round(close - previous, 2) if previous else 0.0
+        records.append({
+            'Date_': day.strftime("%Y-%m-%dT00:00:00"),
+            'Open': str(round(close * 0.995, 2)), 'High': str(round(close * 1.01, 2)),
+            'Low': str(round(close * 0.99, 2)), 'Close': str(close),
+            'Change': str(change), 'ChangeP': str(round(change / previous * 100, 2) if previous else 0.0),
+            'Volume': 1000 + zlib.crc32(f"{ticker}{day}".encode()) % 100000,
+        })
+        previous = close
+    return records
+
+
+def listed_in(index):
+    return ','.join(INDICES[:1 + index % len(INDICES)])
+
+
+def make_market_watch_html(tickers):
+    today = datetime.today()
+    rows = []
+    for i, ticker in enumerate(tickers):
+        current = price_on(ticker, today)
+        ldcp = price_on(ticker, today - timedelta(days=1))
+        change = round(current - ldcp, 2)
+        rows.append(
+            f"<tr><td>{ticker}</td><td>{SECTOR_CODES[i % len(SECTOR_CODES)]}</td><td>{listed_in(i)}</td>"
+            f"<td>{ldcp:,.2f}</td><td>{ldcp:,.2f}</td><td>{max(ldcp, current) * 1.01:,.2f}</td>"
+            f"<td>{min(ldcp, current) * 0.99:,.2f}</td><td>{current:,.2f}</td><td>{change}</td>"
+            f"<td>{round(change / ldcp * 100, 2)}%</td><td>{1000 + i * 37:,}</td></tr>"
+        )
+    return f"<html><body><table class='tbl'><tbody>{''.join(rows)}</tbody></table></body></html>"
+
+
+def make_listings_html(tickers, defaulters):
+    rows = []
+    for i, ticker in enumerate(tickers):
+        clause = "<td>5.11.1(a)</td>" if defaulters else ""
+        tags = ''.join(f"<div class='tag'>{index}</div>" for index in listed_in(i).split(','))
+        rows.append(
+            f"<tr><td>{ticker}</td><td>{ticker} Limited</td><td>{SECTOR_MAPPING[SECTOR_CODES[i % len(SECTOR_CODES)]]}</td>"
+            f"{clause}<td>CDS</td><td>{(i + 1) * 1000000:,}</td><td>{(i + 1) * 250000:,}</td><td>{tags}</td></tr>"
+        )
+    return f"<table class='tbl'><tbody>{''.join(rows)}</tbody></table>"
+
+
+def make_index_html(tickers):
+    headers = ['SYMBOL', 'NAME', 'LDCP', 'CURRENT', 'CHANGE', 'CHANGE (%)', 'IDX WTG (%)', 'IDX POINT',
+               'VOLUME', 'FREEFLOAT (M)', 'MARKET CAP (M)']
+    today = datetime.today()
+    rows = []
+    for i, ticker in enumerate(tickers):
+        current, ldcp = price_on(ticker, today), price_on(ticker, today - timedelta(days=1))
+        values = [ldcp, current, round(current - ldcp, 2), round((current - ldcp) / ldcp * 100, 2),
+                  round(100 / len(tickers), 2), 1.5, 1000 + i, 100 + i, 1000 + i * 10]
+        cells = ''.join(f"<td data-order='{value}'>{value}</td>" for value in values)
+        rows.append(f"<tr><td><strong>{ticker}</strong></td><td>{ticker} Limited</td>{cells}</tr>")
+    thead = ''.join(f"<th>{header}</th>" for header in headers)
+    return f"<table class='tbl'><thead><tr>{thead}</tr></thead><tbody>{''.join(rows)}</tbody></table>"
+
+
+def make_timeseries(symbol, points):
+    now = int(time.time())
+    seed = zlib.crc32(symbol.encode())
+    return {
+        'status': 1,
+        'message': '',
+        'data': [[now - i * 30, round(10000 + 50 * math.sin(i / 10 + seed), 4), 100 + i % 50] for i in range(points)],
+    }
+
+
+def make_off_market_csv(tickers, date):
+    day = datetime.strptime(date, '%Y-%m-%d')
+    settlement = (day + timedelta(days=2)).strftime('%d-%b-%y')
+    trade_date = day.strftime('%d-%b-%y')
+    header = "Date,Settlement Date,Member Code,Symbol Code,Company,Turnover,Rate,Value"
+    b2b, i2i = [header], [header]
+    for i, ticker in enumerate(tickers[::10]):
+        rate = price_on(ticker, day)
+        b2b.append(f"{trade_date},{settlement},MEMBER +{i % 300:03d} -{(i + 7) % 300:03d},{ticker},{ticker} Limited,{1000 * (i + 1)},{rate},{rate * 1000 * (i + 1):.2f}")
+        i2i.append(f"{trade_date},{settlement},Member {(i + 3) % 300:03d},{ticker},{ticker} Limited,{500 * (i + 1)},{rate},{rate * 500 * (i + 1):.2f}")
+    marker = "CROSS ,TRANSACTIONS, BETWEEN, CLIENT TO ,CLIENT & FINANCIAL, INSTITUTIONS"
+    return '\n'.join(b2b) + '\n' + marker + '\n' + '\n'.join(i2i) + '\n'
+
+
+def make_constituents_excel(tickers, date):
+    """
+    Returns the constituents workbook, or None if pandas has no Excel writer installed.
+    """
+    day = datetime.strptime(date, '%Y-%m-%d')
+    df = pd.DataFrame({
+        'ISIN': [f"PK{i:010d}" for i in range(len(tickers))],
+        'SYMBOL': tickers,
+        'COMPANY': [f"{ticker} Limited" for ticker in tickers],
+        'PRICE': [price_on(ticker, day) for ticker in tickers],
+        'IDX WT %': [round(100 / len(tickers), 4)] * len(tickers),
+        'FF BASED SHARES': [(i + 1) * 250000 for i in range(len(tickers))],
+        'FF BASED MCAP': [(i + 1) * 250000 * 10.0 for i in range(len(tickers))],
+        'ORD SHARES': [(i + 1) * 1000000 for i in range(len(tickers))],
+        'ORD SHARES MCAP': [(i + 1) * 1000000 * 10.0 for i in range(len(tickers))],
+        'VOLUME': [1000 + i for i in range(len(tickers))],
+    })
+    buffer = BytesIO()
+    try:
+        df.to_excel(buffer, index=False)
+    except ImportError:
+        return None
+    return buffer.getvalue()
+
+
+def load_replay(archive_dir):
+    """
+    Loads recorded responses from a response archive, keyed by (method, path, payload).
+    Later recordings of the same request replace earlier ones.
+    """
+    responses = {}
+    archive = ResponseArchive(archive_dir)
+    for path in archive.partitions():
+        for record in read_partition(path):
+            key = (record['method'], urlsplit(record['url']).path, json.dumps(record['payload'], sort_keys=True))
+            responses[key] = record['body']
+    return responses
+
+
+def make_app(tickers=500, rows=250, latency=0.0, jitter=0.0, error_rate=0.0, throttle_rate=0.0,
+             rate_limit=None, replay_dir=None):
+    """
+    Creates the stand-in aiohttp application.
+
+    Args:
+        tickers (int or list): Number of synthetic tickers (T0000, T0001, ...) or an explicit list of symbols.
+        rows (int): Maximum price history records returned per request.
+        latency (float): Seconds of artificial latency per request.
+        jitter (float): Extra random latency of up to this many seconds.
+        error_rate (float): Probability of answering 503 instead of data.
+        throttle_rate (float): Probability of answering 429 with Retry-After: 0.
+        rate_limit (float): Requests per second above which requests are answered with 429.
+        replay_dir (str): Optional response archive directory; recorded responses take precedence over synthetic ones.
+
+    Returns:
+        aiohttp.web.Application: The application. app['stats'] counts served, failed and throttled requests.
+    """
+    symbols = make_tickers(tickers) if isinstance(tickers, int) else list(tickers)
+    replay = load_replay(replay_dir) if replay_dir else {}
+    stats = {'requests': 0, 'errors_injected': 0, 'throttled': 0, 'replayed': 0}
+    window = {'second': 0, 'count': 0}
+
+    @web.middleware
+    async def inject_faults(request, handler):
+        stats['requests'] += 1
+        if latency or jitter:
+            await asyncio.sleep(latency + random.uniform(0, jitter))
+        if rate_limit:
+            second = int(time.monotonic())
+            if window['second'] != second:
+                window['second'], window['count'] = second, 0
+            window['count'] += 1
+            if window['count'] > rate_limit:
+                stats['throttled'] += 1
+                return web.Response(status=429, headers={'Retry-After': '1'})
+        roll = random.random()
+        if roll < throttle_rate:
+            stats['throttled'] += 1
+            return web.Response(status=429, headers={'Retry-After': '0'})
+        if roll < throttle_rate + error_rate:
+            stats['errors_injected'] += 1
+            return web.Response(status=503)
+
+        payload = await request.json() if request.method == 'POST' else None
+        recorded = replay.get((request.method, request.path, json.dumps(payload, sort_keys=True)))
+        if recorded is not None:
+            stats['replayed'] += 1
+            return web.Response(body=recorded)
+        request['payload'] = payload
+        return await handler(request)
+
+    async def price_history(request):
+        data = json.loads(request['payload']['data'])
+        date_from = datetime.strptime(data['DateFrom'], "%d %b %Y")
+        date_to = datetime.strptime(data['DateTo'], "%d %b %Y")
+        return web.json_response(make_price_history(data['company'], date_from, date_to, rows))
+
+    async def market_watch(request):
+        return web.Response(text=make_market_watch_html(symbols), content_type='text/html')
+
+    async def listings(request):
+        if request.match_info['kind'] == 'dc':
+            defaulters = symbols[::DEFAULTER_EVERY] + ['DFLT1', 'DFLT2']
+            return web.Response(text=make_listings_html(defaulters, defaulters=True), content_type='text/html')
+        return web.Response(text=make_listings_html(symbols, defaulters=False), content_type='text/html')
+
+    async def symbols_list(request):
+        return web.json_response([
+            {'symbol': ticker, 'name': f"{ticker} Limited", 'sectorName': SECTOR_MAPPING[SECTOR_CODES[i % len(SECTOR_CODES)]],
+             'isETF': False, 'isDebt': False}
+            for i, ticker in enumerate(symbols)
+        ])
+
+    async def index_page(request):
+        return web.Response(text=make_index_html(symbols[:30]), content_type='text/html')
+
+    async def timeseries(request):
+        return web.json_response(make_timeseries(request.match_info['symbol'], rows))
+
+    async def off_market_csv(request):
+        return web.Response(text=make_off_market_csv(symbols, request.match_info['date']), content_type='text/csv')
+
+    async def constituents(request):
+        workbook = make_constituents_excel(symbols, request.match_info['date'])
+        if workbook is None:
+            raise web.HTTPNotFound(text="No Excel writer installed for synthetic constituents.")
+        return web.Response(body=workbook, content_type='application/vnd.ms-excel')
+
+    app = web.Application(middlewares=[inject_faults])
+    app['stats'] = stats
+    app.router.add_post(STOCK_DATA_PATH, price_history)
+    app.router.add_get('/market-watch', market_watch)
+    app.router.add_get('/listings-table/main/{kind}', listings)
+    app.router.add_get('/symbols', symbols_list)
+    app.router.add_get('/indices/{symbol}', index_page)
+    app.router.add_get('/timeseries/eod/{symbol}', timeseries)
+    app.router.add_get('/download/omts/{date}.csv', off_market_csv)
+    app.router.add_get('/download/indhist/{date}.xls', constituents)
+    return app
+
+
+async def start_server(app, host='127.0.0.1', port=0):
+    """
+    Starts the application on the running event loop.
+
+    Returns:
+        tuple: (runner, base_url). Call await runner.cleanup() to stop it.
+    """
+    # No access log: keeps a line per request out of app.log and the stand-in's request cost
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{port}"
+
+
+class StandinServer:
+    """
+    Runs the stand-in on a background thread with its own event loop, for synchronous callers
+    such as synchronize_database (which starts its own event loops).
+
+    Args:
+        **options: Arguments for make_app.
+    """
+
+    def __init__(self, **options):
+        self.app = make_app(**options)
+        self.base_url = None
+        self._loop = None
+        self._runner = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="StandinServer", daemon=True)
+
+    @property
+    def stats(self):
+        return self.app['stats']
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._runner, self.base_url = self._loop.run_until_complete(start_server(self.app))
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.run_until_complete(self._runner.cleanup())
+        self._loop.close()
+
+    def start(self):
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the PSX and Investors Lounge endpoints.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--tickers', type=int, default=500)
+    parser.add_argument('--rows', type=int, default=250)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=float, default=None)
+    parser.add_argument('--replay', default=None, help="Serve recorded responses from this response archive directory.")
+    args = parser.parse_args()
+
+    app = make_app(tickers=args.tickers, rows=args.rows, latency=args.latency, jitter=args.jitter,
+                   error_rate=args.error_rate, throttle_rate=args.throttle_rate, rate_limit=args.rate_limit,
+                   replay_dir=args.replay)
+    web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,12 +6,19 @@ from utils.db_manager import get_unique_tickers_from_db, insert_ticker_data_into
 from utils.data_fetcher import get_stock_data
 import pandas as pd
 
-def add_new_ticker_ui(conn):
+def add_new_ticker_ui(manager):
+    """
+    Streamlit page that downloads the history of a new ticker and stores it.
+
+    Args:
+        manager (ConnectionManager): The writer connection is only taken for the insert, not
+            while the history is downloaded.
+    """
     st.header("➕ Add New Ticker")
     ticker_input = st.text_input("Enter Ticker Symbol (e.g., AAPL, MSFT):").upper()
     if st.button("Add Ticker"):
         if ticker_input:
-            tickers_in_db = get_unique_tickers_from_db(conn)
+            tickers_in_db = get_unique_tickers_from_db(manager.reader())
             if ticker_input in tickers_in_db:
                 st.warning(f"Ticker '{ticker_input}' already exists in the database.")
                 logging.warning(f"Attempted to add existing ticker '{ticker_input}'.")
@@ -19,7 +26,8 @@ def add_new_ticker_ui(conn):
                 with st.spinner(f"Fetching data for ticker '{ticker_input}'..."):
                     raw_data = get_stock_data(ticker_input, "01 Jan 2020", pd.Timestamp.today().strftime("%d %b %Y"))
                 if raw_data:
-                    success, records_added = insert_ticker_data_into_db(conn, raw_data, ticker_input)
+                    with manager.write() as conn:
+                        success, records_added = insert_ticker_data_into_db(conn, raw_data, ticker_input)
                     if success:
                         if records_added > 0:
                             st.success(f"Added {records_added} records for ticker '{ticker_input}'.")
@@ -2,12 +2,87 @@
 
 import streamlit as st
 import pandas as pd
-import numpy as np
 import plotly.express as px
-import plotly.graph_objects as go
 import logging
-from utils.db_manager import get_unique_tickers_from_db, get_all_portfolios
-from analysis.mxwll_suite_indicator import mxwll_suite_indicator
+from utils.db_manager import get_unique_tickers_from_db, get_all_portfolios, get_ticker_panel, get_ticker_versions
+from analysis.mxwll_engine import compute_mxwll
+from analysis.mxwll_renderer import render_mxwll
+from analysis.screener import clean_panel, screen_universe, ticker_frame
+from analysis.parallel import analyze_universe
+from analysis.result_cache import get_indicator_cache
+from analysis.incremental import IndicatorState
+
+# Analysis parameters for the mxwll suite indicator
+ANALYSIS_PARAMS = {
+    "bull_color": '#14D990',
+    "bear_color": '#F24968',
+    "show_internals": True,
+    "internal_sensitivity": 3,  # Options: 3, 5, 8
+    "internal_structure": "All",  # Options: "All", "BoS", "CHoCH"
+    "show_externals": True,
+    "external_sensitivity": 25,  # Options: 10, 25, 50
+    "external_structure": "All",  # Options: "All", "BoS", "CHoCH"
+    "show_order_blocks": True,
+    "swing_order_blocks": 10,
+    "show_hhlh": True,
+    "show_hlll": True,
+    "show_aoe": True,
+    "show_prev_day_high": True,
+    "show_prev_day_labels": True,
+    "show_4h_high": True,
+    "show_4h_labels": True,
+    "show_fvg": True,
+    "contract_violated_fvg": False,
+    "close_only_fvg": False,
+    "fvg_color": '#F2B807',
+    "fvg_transparency": 80,  # Percentage
+    "show_fibs": True,
+    "show_fib236": True,
+    "show_fib382": True,
+    "show_fib5": True,
+    "show_fib618": True,
+    "show_fib786": True,
+    "fib_levels": [0.236, 0.382, 0.5, 0.618, 0.786],
+    "fib_colors": ['gray', 'lime', 'yellow', 'orange', 'red'],
+    "transparency": 0.98,  # For session highlighting
+    "data_frequency": '1D'  # Adjust as needed
+}
+
+# The indicator runs over each ticker's full history and the analysed window is sliced out of it
+INDICATOR_HISTORY_START = '1900-01-01'
+
+def indicator_cache_key(ticker, date_range, versions):
+    """
+    Builds the indicator cache key of a ticker from its current watermark.
+
+    Args:
+        ticker (str): The stock ticker symbol.
+        date_range (tuple): (start_date, end_date) of the analysis.
+        versions (dict): Ticker symbol -> (latest date, row count), from get_ticker_versions.
+
+    Returns:
+        str: The cache key.
+    """
+    return get_indicator_cache().make_key(ticker, date_range, versions[ticker], ANALYSIS_PARAMS)
+
+def indicator_state_key(ticker):
+    """
+    Builds the key of a ticker's incremental indicator state, which survives new data being stored
+    and is shared by every date range.
+    """
+    return get_indicator_cache().make_state_key(ticker, ANALYSIS_PARAMS)
+
+def load_history(conn, tickers, date_range):
+    """
+    Loads the full history of tickers up to the end of the analysis, as the indicator runs over it.
+    """
+    return clean_panel(get_ticker_panel(conn, tickers, INDICATOR_HISTORY_START, date_range[1]))
+
+def window_start(df, date_range):
+    """
+    Returns the position in a full-history frame of the first bar of the analysis window.
+    """
+    return int(df.index.searchsorted(pd.Timestamp(date_range[0])))
 
 def analyze_tickers(conn):
     st.header("🔍 Analyze Tickers")
@@ -67,222 +142,197 @@ def analyze_tickers(conn):
     end_date = pd.Timestamp.today()
     start_date = end_date - pd.Timedelta(days=days)
     
-    # Initialize list to collect summary data and comparison metrics
-    summary_list = []
-    comparison_metrics = []
-    
     # User filters for Potential Profit and Volume
     st.subheader("🔧 Set Filters for Analysis")
     min_profit = st.number_input("Minimum Potential Profit (%)", min_value=0.0, value=0.0, step=0.1)
     min_volume = st.number_input("Minimum Volume", min_value=0, value=0, step=1000)
+    full_analysis = st.checkbox(
+        "Run the full indicator for every ticker",
+        value=False,
+        help="Computes pivots, FVGs and the AOI summary of every selected ticker on parallel worker processes, so charts open instantly."
+    )
     
     # Button to perform analysis
     if st.button("Run Analysis"):
-        for ticker in selected_tickers:
-            st.subheader(f"📊 Analysis for {ticker}")
-            
-            # Fetch data from database within the selected date range
-            query = "SELECT * FROM Ticker WHERE Ticker = ? AND Date BETWEEN ? AND ? ORDER BY Date ASC;"
-            cursor = conn.cursor()
-            cursor.execute(query, (ticker, start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")))
-            fetched_data = cursor.fetchall()
-            columns = [description[0] for description in cursor.description]
-            
-            if not fetched_data:
-                st.warning(f"No data available for ticker '{ticker}' in the selected period.")
-                logging.warning(f"No data available for ticker '{ticker}' between {start_date.date()} and {end_date.date()}.")
-                continue
-            
-            # Convert fetched data to list of dictionaries
-            data = [dict(zip(columns, row)) for row in fetched_data]
-            
-            # Convert to DataFrame for analysis
-            df = pd.DataFrame(data)
-            
-            # Convert 'Date' column to datetime and set as index
-            df['Date'] = pd.to_datetime(df['Date'])
-            df.set_index('Date', inplace=True)
-            
-            # Enforce correct dtypes
-            try:
-                df = df.astype({
-                    "Open": "float64",
-                    "High": "float64",
-                    "Low": "float64",
-                    "Close": "float64",
-                    "Change": "float64",
-                    "Change (%)": "float64",
-                    "Volume": "int64"
-                })
-            except Exception as e:
-                st.error(f"Data type conversion error for ticker '{ticker}': {e}")
-                logging.error(f"Data type conversion error for ticker '{ticker}': {e}")
-                continue
-            
-            # Ensure all necessary columns are present and correct
-            required_columns = ["Open", "High", "Low", "Close", "Change", "Change (%)", "Volume"]
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            if missing_columns:
-                st.error(f"Missing columns in data: {missing_columns}")
-                logging.error(f"Missing columns for ticker '{ticker}': {missing_columns}")
-                continue
-            
-            # Check for any NaN or infinite values
-            if df[required_columns].isnull().any().any():
-                st.warning("Data contains NaN values. These will be dropped before analysis.")
-                logging.warning(f"Data for ticker '{ticker}' contains NaN values.")
-                df.dropna(subset=required_columns, inplace=True)
-            
-            if not np.isfinite(df[required_columns]).all().all():
-                st.warning("Data contains infinite values. These will be dropped before analysis.")
-                logging.warning(f"Data for ticker '{ticker}' contains infinite values.")
-                df = df[np.isfinite(df[required_columns]).all(axis=1)]
-            
-            if df.empty:
-                st.warning(f"All data for ticker '{ticker}' was dropped due to NaN or infinite values.")
-                logging.warning(f"All data for ticker '{ticker}' was dropped due to NaN or infinite values.")
-                continue
-            
-            # Define analysis parameters (use your original params)
-            analysis_params = {
-                "bull_color": '#14D990',
-                "bear_color": '#F24968',
-                "show_internals": True,
-                "internal_sensitivity": 3,  # Options: 3, 5, 8
-                "internal_structure": "All",  # Options: "All", "BoS", "CHoCH"
-                "show_externals": True,
-                "external_sensitivity": 25,  # Options: 10, 25, 50
-                "external_structure": "All",  # Options: "All", "BoS", "CHoCH"
-                "show_order_blocks": True,
-                "swing_order_blocks": 10,
-                "show_hhlh": True,
-                "show_hlll": True,
-                "show_aoe": True,
-                "show_prev_day_high": True,
-                "show_prev_day_labels": True,
-                "show_4h_high": True,
-                "show_4h_labels": True,
-                "show_fvg": True,
-                "contract_violated_fvg": False,
-                "close_only_fvg": False,
-                "fvg_color": '#F2B807',
-                "fvg_transparency": 80,  # Percentage
-                "show_fibs": True,
-                "show_fib236": True,
-                "show_fib382": True,
-                "show_fib5": True,
-                "show_fib618": True,
-                "show_fib786": True,
-                "fib_levels": [0.236, 0.382, 0.5, 0.618, 0.786],
-                "fib_colors": ['gray', 'lime', 'yellow', 'orange', 'red'],
-                "transparency": 0.98,  # For session highlighting
-                "data_frequency": '1D'  # Adjust as needed
-            }
-            
-            # Perform analysis with a spinner
-            with st.spinner(f"Performing analysis for '{ticker}'..."):
-                try:
-                    fig, summary = mxwll_suite_indicator(df, ticker, analysis_params)
-                    
-                    # Validate that fig is a Plotly figure
-                    if not isinstance(fig, go.Figure):
-                        st.error(f"Generated figure for ticker '{ticker}' is invalid.")
-                        logging.error(f"Generated figure for ticker '{ticker}' is invalid.")
-                        continue
-                    
-                    st.plotly_chart(fig, use_container_width=True)
-                    st.success(f"Analysis for ticker '{ticker}' completed successfully.")
-                    logging.info(f"Analysis for ticker '{ticker}' completed successfully.")
-                    
-                    # --- Real-Time High_AOI and Potential Profit Calculation ---
-                    
-                    # Calculate AOI based on the analysis parameters
-                    if analysis_params['show_aoe']:
-                        try:
-                            # Assuming 'summary' contains 'Highest AOI (Red)' and 'Lowest AOI (Green)'
-                            high_aoi = summary.get('Highest AOI (Red)')
-                            low_aoi = summary.get('Lowest AOI (Green)')
-                            last_close = df['Close'].iloc[-1]
-                            
-                            # Calculate Potential Profit (%) based on High_AOI
-                            potential_profit = ((high_aoi - last_close) / high_aoi) * 100 if high_aoi else None
-                            
-                            # Calculate Volatility
-                            df['Return'] = df['Close'].pct_change()
-                            volatility = df['Return'].std() * np.sqrt(252)  # Annualized volatility
-                            
-                            # Append to comparison metrics if calculation was successful and meets filters
-                            if (potential_profit is not None and 
-                                potential_profit >= min_profit and 
-                                df['Volume'].iloc[-1] >= min_volume):
-                                comparison_metrics.append({
-                                    'Ticker': ticker,
-                                    'High_AOI': high_aoi,
-                                    'Last Close': last_close,
-                                    'Potential Profit (%)': round(potential_profit, 2),
-                                    'Volatility': round(volatility, 2),
-                                    'Volume': df['Volume'].iloc[-1]
-                                })
-                            else:
-                                logging.info(f"Ticker '{ticker}' does not meet the filter criteria.")
-                        except Exception as e:
-                            st.error(f"Error calculating AOI, Potential Profit, or Volatility for '{ticker}': {e}")
-                            logging.error(f"Error calculating AOI, Potential Profit, or Volatility for '{ticker}': {e}")
-                    
-                    # Append summary data to the list
-                    summary_list.append(summary)
-                except Exception as e:
-                    st.error(f"An error occurred during analysis for ticker '{ticker}': {e}")
-                    logging.error(f"Error during analysis for ticker '{ticker}': {e}")
+        date_range = (start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d"))
+        with st.spinner(f"Screening {len(selected_tickers)} tickers..."):
+            # One query and one vectorized pass over the whole selection
+            panel = clean_panel(get_ticker_panel(conn, selected_tickers, *date_range, include_dates=full_analysis))
+            comparison_df = screen_universe(panel, ANALYSIS_PARAMS, min_profit, min_volume)
         
-        # --- Generate Scatter Plot After All Analyses ---
+        analysed_tickers = set(panel['Ticker'].unique())
+        # Watermarks identify the data each cached result was computed from
+        versions = get_ticker_versions(conn, analysed_tickers)
+        cache = get_indicator_cache()
         
-        if comparison_metrics:
-            st.subheader("📈 Potential Profit Scatter Plot")
-            comparison_df = pd.DataFrame(comparison_metrics)
-            
-            # Scatter Plot: Potential Profit (%) vs High_AOI with Volume as Size
-            fig_scatter = px.scatter(
-                comparison_df,
-                x='High_AOI',
-                y='Potential Profit (%)',
-                color='Volatility',
-                size='Volume',
-                hover_data=['Last Close'],
-                text='Ticker',
-                title='Potential Profit (%) vs High AOI with Volume',
-                labels={
-                    'High_AOI': 'High AOI',
-                    'Potential Profit (%)': 'Potential Profit (%)',
-                    'Volatility': 'Volatility',
-                    'Volume': 'Volume'
-                },
-                color_continuous_scale='Viridis'
-            )
+        indicator_results = {}
+        if full_analysis and analysed_tickers:
+            uncached = []
+            for ticker in sorted(analysed_tickers):
+                entry = cache.get(indicator_cache_key(ticker, date_range, versions)) if ticker in versions else None
+                if entry is not None:
+                    indicator_results[ticker] = entry.result
+                else:
+                    uncached.append(ticker)
+            history = load_history(conn, uncached, date_range) if uncached else panel.iloc[:0]
             
-            # Enhance the plot with text labels
-            fig_scatter.update_traces(textposition='top center')
-            fig_scatter.update_layout(showlegend=True)
+            pending = []
+            extended = 0
+            for ticker in uncached:
+                if ticker not in versions:
+                    pending.append(ticker)
+                    continue
+                # After a sync only the new bars are fed to the state of the previous run, whatever its window
+                state = cache.get_state(indicator_state_key(ticker))
+                frame = ticker_frame(history, ticker)
+                result = state.catch_up(frame, window_start(frame, date_range)) if state is not None and state.matches(ANALYSIS_PARAMS) else None
+                if result is None:
+                    pending.append(ticker)
+                    continue
+                indicator_results[ticker] = result
+                extended += 1
+                cache.put(indicator_cache_key(ticker, date_range, versions), ticker, versions[ticker], result,
+                          state=state, state_key=indicator_state_key(ticker))
+            logging.info(f"Indicator results: {len(indicator_results) - extended} cached, {extended} extended with new bars, {len(pending)} to compute.")
             
-            st.plotly_chart(fig_scatter, use_container_width=True)
-            
-            # Display the DataFrame used for the scatter plot
-            st.subheader("📊 Potential Profit Data")
-            st.dataframe(comparison_df)
-            
-            # Export comparison results as CSV
-            csv = comparison_df.to_csv(index=False).encode('utf-8')
-            st.download_button(
-                label="📥 Download Comparison Data as CSV",
-                data=csv,
-                file_name='comparison_metrics.csv',
-                mime='text/csv',
-            )
-            
-            # Highlight the stock with the highest potential profit
-            top_stock = comparison_df.loc[comparison_df['Potential Profit (%)'].idxmax()]
-            st.success(f"**Top Performer:** {top_stock['Ticker']} with a potential profit of {top_stock['Potential Profit (%)']:.2f}% and volatility of {top_stock['Volatility']}%")
+            # Results stream back from the worker processes as they complete
+            total = len(analysed_tickers)
+            completed = len(indicator_results)
+            progress_bar = st.progress(completed / total)
+            for ticker, result, error in analyze_universe(history.loc[history['Ticker'].isin(pending)], ANALYSIS_PARAMS):
+                completed += 1
+                if error:
+                    st.error(f"An error occurred during analysis for ticker '{ticker}': {error}")
+                    logging.error(f"Error during analysis for ticker '{ticker}': {error}")
+                else:
+                    # Workers return the result over the full history; the state slices the window out
+                    frame = ticker_frame(history, ticker)
+                    state = IndicatorState.from_frame(frame, ticker, ANALYSIS_PARAMS, result)
+                    indicator_results[ticker] = state.result(window_start(frame, date_range))
+                    if ticker in versions:
+                        cache.put(indicator_cache_key(ticker, date_range, versions), ticker, versions[ticker], indicator_results[ticker],
+                                  state=state, state_key=indicator_state_key(ticker))
+                progress_bar.progress(completed / total, text=f"Analyzed {completed}/{total}: {ticker}")
+            progress_bar.empty()
+            logging.info(f"Indicator cache after analysis: {cache.as_dict()}")
+        cache.purge_stale(versions)
         
-        else:
-            st.warning("No comparison metrics available to generate the scatter plot.")
-            logging.warning("No comparison metrics available after analysis.")
\ No newline at end of file
+        missing_tickers = [ticker for ticker in selected_tickers if ticker not in analysed_tickers]
+        if missing_tickers:
+            st.warning(f"No data available for {len(missing_tickers)} of the selected tickers in the selected period.")
+            logging.warning(f"No data available between {start_date.date()} and {end_date.date()} for tickers: {missing_tickers}")
+        logging.info(f"Screened {len(analysed_tickers)} tickers; {len(comparison_df)} meet the filter criteria.")
+        
+        # Kept in the session so charts can be opened without rerunning the analysis
+        st.session_state['analysis_results'] = {
+            'comparison_df': comparison_df,
+            'tickers': sorted(analysed_tickers),
+            'indicator_results': indicator_results,
+            'versions': versions,
+            'date_range': date_range,
+        }
+    
+    analysis_state = st.session_state.get('analysis_results')
+    if analysis_state is None:
+        return
+    comparison_df = analysis_state['comparison_df']
+    indicator_results = analysis_state['indicator_results']
+    
+    # --- Generate Scatter Plot After All Analyses ---
+    
+    if not comparison_df.empty:
+        st.subheader("📈 Potential Profit Scatter Plot")
+        
+        # Scatter Plot: Potential Profit (%) vs High_AOI with Volume as Size
+        fig_scatter = px.scatter(
+            comparison_df,
+            x='High_AOI',
+            y='Potential Profit (%)',
+            color='Volatility',
+            size='Volume',
+            hover_data=['Last Close'],
+            text='Ticker',
+            title='Potential Profit (%) vs High AOI with Volume',
+            labels={
+                'High_AOI': 'High AOI',
+                'Potential Profit (%)': 'Potential Profit (%)',
+                'Volatility': 'Volatility',
+                'Volume': 'Volume'
+            },
+            color_continuous_scale='Viridis'
+        )
+        
+        # Enhance the plot with text labels
+        fig_scatter.update_traces(textposition='top center')
+        fig_scatter.update_layout(showlegend=True)
+        
+        st.plotly_chart(fig_scatter, use_container_width=True)
+        
+        # Display the DataFrame used for the scatter plot
+        st.subheader("📊 Potential Profit Data")
+        st.dataframe(comparison_df)
+        
+        # Export comparison results as CSV
+        csv = comparison_df.to_csv(index=False).encode('utf-8')
+        st.download_button(
+            label="📥 Download Comparison Data as CSV",
+            data=csv,
+            file_name='comparison_metrics.csv',
+            mime='text/csv',
+        )
+        
+        # Highlight the stock with the highest potential profit
+        top_stock = comparison_df.loc[comparison_df['Potential Profit (%)'].idxmax()]
+        st.success(f"**Top Performer:** {top_stock['Ticker']} with a potential profit of {top_stock['Potential Profit (%)']:.2f}% and volatility of {top_stock['Volatility']}%")
+    
+    else:
+        st.warning("No comparison metrics available to generate the scatter plot.")
+        logging.warning("No comparison metrics available after analysis.")
+    
+    if indicator_results:
+        st.subheader("📋 Indicator Summary")
+        st.dataframe(pd.DataFrame([indicator_results[ticker].summary for ticker in sorted(indicator_results)]))
+    
+    # --- Charts for the tickers the user opens ---
+    st.subheader("📊 Ticker Charts")
+    opened_tickers = st.multiselect("Open charts for", analysis_state['tickers'])
+    if not opened_tickers:
+        return
+    cache = get_indicator_cache()
+    date_range = analysis_state['date_range']
+    # Re-read the watermarks: a sync since the analysis makes its results stale
+    versions = get_ticker_versions(conn, opened_tickers)
+    for ticker in opened_tickers:
+        st.markdown(f"**{ticker}**")
+        key = indicator_cache_key(ticker, date_range, versions) if ticker in versions else None
+        entry = cache.get(key) if key else None
+        if entry is not None and entry.figure_json is not None:
+            st.plotly_chart(entry.figure, use_container_width=True)
+            st.caption(f"Chart payload: {len(entry.figure_json.encode('utf-8')) / 1024:.0f} KB (cached)")
+            continue
+        try:
+            if entry is not None:
+                result = entry.result
+            elif versions.get(ticker) == analysis_state['versions'].get(ticker) and ticker in indicator_results:
+                result = indicator_results[ticker]
+            else:
+                result = None
+            if result is None:
+                frame = ticker_frame(load_history(conn, [ticker], date_range), ticker)
+                start = window_start(frame, date_range)
+                df = frame.iloc[start:]
+                result = compute_mxwll(frame, ticker, ANALYSIS_PARAMS, start=start)
+            else:
+                df = ticker_frame(clean_panel(get_ticker_panel(conn, [ticker], *date_range)), ticker)
+            fig = render_mxwll(df, result, ANALYSIS_PARAMS)
+            figure_json = fig.to_json()
+            if key:
+                cache.put(key, ticker, versions[ticker], result, figure_json,
+                          state=entry.state if entry is not None else None, state_key=indicator_state_key(ticker))
+            st.plotly_chart(fig, use_container_width=True)
+            st.caption(f"Chart payload: {len(figure_json.encode('utf-8')) / 1024:.0f} KB")
+            logging.info(f"Rendered chart for {ticker}: {len(df)} bars, {len(fig.data)} traces, "
+                         f"{len(figure_json.encode('utf-8'))} bytes.")
+        except Exception as e:
+            st.error(f"An error occurred during analysis for ticker '{ticker}': {e}")
+            logging.error(f"Error during analysis for ticker '{ticker}': {e}")
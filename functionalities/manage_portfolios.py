@@ -14,7 +14,14 @@ from utils.db_manager import (
 import pandas as pd
 import io
 
-def manage_portfolios(conn):
+def manage_portfolios(manager):
+    """
+    Streamlit page for creating, viewing, updating and deleting portfolios.
+
+    Args:
+        manager (ConnectionManager): Reads go through this thread's reader connection; the
+            writer connection is only taken around each write.
+    """
     st.header("📁 Manage Portfolios")
 
     # Create a tabbed interface
@@ -22,22 +29,23 @@ def manage_portfolios(conn):
 
     # ---- Tab 1: Create New Portfolio ---- #
     with tabs[0]:
-        create_new_portfolio(conn)
+        create_new_portfolio(manager)
 
     # ---- Tab 2: View Portfolios ---- #
     with tabs[1]:
-        view_portfolios(conn)
+        view_portfolios(manager)
 
     # ---- Tab 3: Update Portfolio ---- #
     with tabs[2]:
-        update_existing_portfolio(conn)
+        update_existing_portfolio(manager)
 
     # ---- Tab 4: Delete Portfolio ---- #
     with tabs[3]:
-        delete_existing_portfolio(conn)
+        delete_existing_portfolio(manager)
 
-def create_new_portfolio(conn):
+def create_new_portfolio(manager):
     st.subheader("➕ Create New Portfolio")
+    conn = manager.reader()
 
     # Initialize session state for tickers added per portfolio
     if 'new_portfolio_tickers' not in st.session_state:
@@ -107,7 +115,8 @@ def create_new_portfolio(conn):
 
         if added_symbols:
             # Create Portfolio
-            success = create_portfolio(conn, portfolio_name, added_symbols)
+            with manager.write() as writer:
+                success = create_portfolio(writer, portfolio_name, added_symbols)
             if success:
                 st.success(f"✅ Portfolio '{portfolio_name}' created successfully with {len(added_symbols)} tickers.")
                 logging.info(f"Portfolio '{portfolio_name}' created with tickers: {added_symbols}.")
@@ -180,7 +189,8 @@ def create_new_portfolio(conn):
 
         if new_added_symbols:
             # Create Portfolio
-            success = create_portfolio(conn, new_portfolio_name, new_added_symbols)
+            with manager.write() as writer:
+                success = create_portfolio(writer, new_portfolio_name, new_added_symbols)
             if success:
                 st.success(f"✅ Portfolio '{new_portfolio_name}' created successfully with {len(new_added_symbols)} tickers.")
                 logging.info(f"Portfolio '{new_portfolio_name}' created with tickers: {new_added_symbols}.")
@@ -191,8 +201,9 @@ def create_new_portfolio(conn):
             st.error("❌ No valid tickers were added to the portfolio. Please check your inputs.")
             logging.error("No valid tickers were added to the second portfolio.")
 
-def view_portfolios(conn):
+def view_portfolios(manager):
     st.subheader("📋 View Portfolios")
+    conn = manager.reader()
     portfolios = get_all_portfolios(conn)
     
     if portfolios:
@@ -232,8 +243,9 @@ def view_portfolios(conn):
         st.info("ℹ️ No portfolios found. Please create a new portfolio.")
         logging.info("No portfolios available to view.")
 
-def update_existing_portfolio(conn):
+def update_existing_portfolio(manager):
     st.subheader("🔄 Update Portfolio")
+    conn = manager.reader()
     portfolios = get_all_portfolios(conn)
     
     if portfolios:
@@ -255,7 +267,8 @@ def update_existing_portfolio(conn):
             
             if st.button("✅ Update Portfolio"):
                 if new_selected_tickers:
-                    success = update_portfolio(conn, portfolio['Portfolio_ID'], new_tickers=new_selected_tickers)
+                    with manager.write() as writer:
+                        success = update_portfolio(writer, portfolio['Portfolio_ID'], new_tickers=new_selected_tickers)
                     if success:
                         st.success(f"✅ Portfolio '{selected_portfolio_name}' updated successfully with {len(new_selected_tickers)} tickers.")
                         logging.info(f"Portfolio '{selected_portfolio_name}' updated with tickers: {new_selected_tickers}.")
@@ -269,8 +282,9 @@ def update_existing_portfolio(conn):
         st.info("ℹ️ No portfolios available to update. Please create a portfolio first.")
         logging.info("No portfolios available for update.")
 
-def delete_existing_portfolio(conn):
+def delete_existing_portfolio(manager):
     st.subheader("🗑️ Delete Portfolio")
+    conn = manager.reader()
     portfolios = get_all_portfolios(conn)
     
     if portfolios:
@@ -282,7 +296,8 @@ def delete_existing_portfolio(conn):
             if confirm:
                 portfolio = get_portfolio_by_name(conn, selected_portfolio_name)
                 if portfolio:
-                    success = delete_portfolio(conn, portfolio['Portfolio_ID'])
+                    with manager.write() as writer:
+                        success = delete_portfolio(writer, portfolio['Portfolio_ID'])
                     if success:
                         st.success(f"✅ Portfolio '{selected_portfolio_name}' deleted successfully.")
                         logging.info(f"Portfolio '{selected_portfolio_name}' deleted.")
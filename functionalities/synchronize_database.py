@@ -3,7 +3,7 @@
 import streamlit as st
 import logging
 import sqlite3
-from utils.db_manager import synchronize_database
+from utils.db_manager import synchronize_database, SYNC_MODE_INCREMENTAL, SYNC_MODE_FULL, SYNC_MODE_FAST_EOD
 from datetime import datetime, timedelta
 
 # Configure logging
@@ -30,12 +30,14 @@ def get_last_working_day(date):
         date -= timedelta(days=1)
     return date
 
-def synchronize_database_ui(conn):
+def synchronize_database_ui(manager):
     """
     Streamlit UI for synchronizing the database.
     
     Args:
-        conn (sqlite3.Connection): SQLite database connection.
+        manager (ConnectionManager): Reads go through this thread's reader connection; the
+            sync writes through its own writer thread, which holds the manager's writer lock
+            for each batch.
     """
     st.header("🔄 Synchronize Database")
     
@@ -52,12 +54,21 @@ def synchronize_database_ui(conn):
     ).strftime('%Y-%m-%d')
     
     st.write(f"Selected Date: {selected_date}")
+
+    # Sync mode: incremental only fetches data after each ticker's latest stored date
+    sync_mode_labels = {
+        "Incremental (new data only)": SYNC_MODE_INCREMENTAL,
+        "Fast EOD (today's bar from Market Watch, after close)": SYNC_MODE_FAST_EOD,
+        "Full history": SYNC_MODE_FULL,
+    }
+    selected_mode = st.radio("Ticker synchronization mode:", list(sync_mode_labels.keys()))
     
     if st.button("Start Synchronization"):
         progress_bar = st.progress(0.0)
         status_text = st.empty()
         
-        summary = synchronize_database(conn, selected_date, progress_bar, status_text)
+        summary = synchronize_database(manager.reader(), selected_date, progress_bar, status_text,
+                                       mode=sync_mode_labels[selected_mode], write_lock=manager.writer_lock)
         
         st.success("Synchronization process has completed. Check the summary below for details.")
         logging.info("Database synchronization completed.")
@@ -78,6 +89,15 @@ def synchronize_database_ui(conn):
                 st.success(summary['tickers']['message'])
                 if summary['tickers']['errors']:
                     st.warning(f"Encountered errors with {len(summary['tickers']['errors'])} tickers.")
+                    with st.expander("Ticker errors"):
+                        for error in summary['tickers']['errors']:
+                            st.write(error)
+                fetch_stats = summary['tickers'].get('fetch_stats')
+                if fetch_stats:
+                    st.caption(
+                        f"Fetched {fetch_stats['succeeded']} tickers at {fetch_stats['items_per_second']} tickers/s "
+                        f"with {fetch_stats['retries']} retries."
+                    )
             else:
                 st.error(summary['tickers']['message'])
             
@@ -87,5 +107,12 @@ def synchronize_database_ui(conn):
                 st.success(summary['psx_transactions']['message'])
             else:
                 st.error(summary['psx_transactions']['message'])
+
+            response_cache = summary.get('response_cache')
+            if response_cache:
+                st.caption(
+                    f"HTTP response cache: {response_cache['hit_ratio']:.0%} hit ratio "
+                    f"({response_cache['hits']} hits, {response_cache['revalidations']} revalidated, {response_cache['misses']} misses)."
+                )
         else:
             st.warning("No synchronization summary available.")
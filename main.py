@@ -4,7 +4,7 @@ import streamlit as st
 import logging
 
 from utils.logger import setup_logging
-from utils.db_manager import initialize_db_and_tables
+from utils.db_manager import create_connection_manager
 
 # Initialize logging
 setup_logging()
@@ -20,10 +20,14 @@ st.set_page_config(
 # Title of the App
 st.title("📈 PSX Scanner")
 
-# Initialize database
-conn = initialize_db_and_tables()
+# Initialize database once per process; the manager is shared across reruns and sessions
+@st.cache_resource
+def get_connection_manager():
+    return create_connection_manager()
 
-if conn is None:
+manager = get_connection_manager()
+
+if manager is None:
     st.error("Failed to connect to the database. Please check the logs.")
     logger.error("Database connection failed.")
     st.stop()
@@ -33,16 +37,19 @@ st.sidebar.header("Menu")
 app_mode = st.sidebar.selectbox("Choose the Scanner mode",
     ["Synchronize Database", "Add New Ticker", "Analyze Tickers", "Manage Portfolios"])
 
-# Import functionality modules based on user selection
+# Import functionality modules based on user selection.
+# Pages that write get the manager and read through this thread's reader connection, taking the
+# serialized writer connection only around their writes, so a page that is waiting on the user or
+# the network never blocks other sessions. Read-only pages just get the reader connection.
 if app_mode == "Synchronize Database":
     from functionalities.synchronize_database import synchronize_database_ui
-    synchronize_database_ui(conn)
+    synchronize_database_ui(manager)
 elif app_mode == "Add New Ticker":
     from functionalities.add_new_ticker import add_new_ticker_ui
-    add_new_ticker_ui(conn)
+    add_new_ticker_ui(manager)
 elif app_mode == "Analyze Tickers":
     from functionalities.analyze_tickers import analyze_tickers
-    analyze_tickers(conn)
+    analyze_tickers(manager.reader())
 elif app_mode == "Manage Portfolios":
     from functionalities.manage_portfolios import manage_portfolios
-    manage_portfolios(conn)
+    manage_portfolios(manager)
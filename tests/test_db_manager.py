@@ -0,0 +1,15 @@
+# tests/test_db_manager.py
+
+from datetime import datetime, timezone
+
+from utils.db_manager import is_final_snapshot_date
+
+
+def test_snapshot_is_final_after_close_in_karachi():
+    sync_date = datetime(2024, 10, 11)
+    # 12:30 UTC is 17:30 in Karachi (UTC+5), after the close
+    assert is_final_snapshot_date(sync_date, now=datetime(2024, 10, 11, 12, 30, tzinfo=timezone.utc))
+    # 11:30 UTC is 16:30 in Karachi, still trading
+    assert not is_final_snapshot_date(sync_date, now=datetime(2024, 10, 11, 11, 30, tzinfo=timezone.utc))
+    # 20:00 UTC on the 11th is already the 12th in Karachi
+    assert not is_final_snapshot_date(sync_date, now=datetime(2024, 10, 11, 20, 0, tzinfo=timezone.utc))
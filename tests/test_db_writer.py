@@ -0,0 +1,92 @@
+# tests/test_db_writer.py
+
+import sqlite3
+
+import pytest
+
+from utils.connection_manager import ConnectionManager
+from utils.db_manager import apply_market_watch_snapshot, initialize_db_and_tables, insert_ticker_rows
+from utils.db_writer import DatabaseWriter
+
+
+def make_rows(ticker, days=3):
+    return [(ticker, f"2024-01-0{day}", 10.0, 11.0, 9.0, 10.5, 0.5, 5.0, 1000) for day in range(1, days + 1)]
+
+
+def market_watch_row(symbol, current):
+    return (symbol, 'BANKS', 'KSE100', 10.0, 10.0, 11.0, 9.0, current, current - 10.0, 1.0, 1000,
+            False, None, None, None, None, None, None, None)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'tick_data.db')
+    conn = initialize_db_and_tables(path)
+    # Fails the watermark update of one ticker, after its Ticker rows have been inserted
+    conn.execute("""
+        CREATE TRIGGER fail_watermark BEFORE INSERT ON TickerWatermark WHEN NEW.Ticker = 'BAD'
+        BEGIN SELECT RAISE(ABORT, 'injected failure'); END;
+    """)
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_failed_job_in_batch_leaves_nothing_behind(db_path):
+    with DatabaseWriter(db_path, max_batch_delay=0.5) as writer:
+        good = writer.submit(insert_ticker_rows, make_rows('GOOD'), 'GOOD')
+        bad = writer.submit(insert_ticker_rows, make_rows('BAD'), 'BAD')
+        after = writer.submit(insert_ticker_rows, make_rows('AFTER', 2), 'AFTER')
+        assert good.result() == (True, 3)
+        with pytest.raises(sqlite3.IntegrityError):
+            bad.result()
+        assert after.result() == (True, 2)
+        assert writer.transactions == 1
+
+    conn = sqlite3.connect(db_path)
+    counts = dict(conn.execute("SELECT Ticker, COUNT(*) FROM Ticker GROUP BY Ticker;").fetchall())
+    watermarks = dict(conn.execute("SELECT Ticker, Row_Count FROM TickerWatermark;").fetchall())
+    conn.close()
+    assert counts == {'GOOD': 3, 'AFTER': 2}
+    assert watermarks == {'GOOD': 3, 'AFTER': 2}
+
+
+def test_failed_insert_rolls_back_when_committing_itself(db_path):
+    conn = sqlite3.connect(db_path)
+    assert insert_ticker_rows(conn, make_rows('BAD'), 'BAD') == (False, 0)
+    assert conn.execute("SELECT COUNT(*) FROM Ticker;").fetchone()[0] == 0
+    conn.close()
+
+
+def test_failed_snapshot_keeps_previous_market_watch(db_path):
+    first = {row[:3]: row for row in (market_watch_row('ABL', 10.5), market_watch_row('HBL', 20.0))}
+    with DatabaseWriter(db_path) as writer:
+        assert writer.submit(apply_market_watch_snapshot, first).result() == (True, 2)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TRIGGER fail_market_watch BEFORE INSERT ON MarketWatch WHEN NEW.SYMBOL = 'FAIL'
+        BEGIN SELECT RAISE(ABORT, 'injected failure'); END;
+    """)
+    conn.commit()
+    # HBL changes and is deleted before the insert of FAIL aborts; ABL is removed from the snapshot
+    second = {row[:3]: row for row in (market_watch_row('HBL', 21.0), market_watch_row('FAIL', 5.0))}
+    with DatabaseWriter(db_path) as writer:
+        with pytest.raises(sqlite3.IntegrityError):
+            writer.submit(apply_market_watch_snapshot, second).result()
+
+    stored = conn.execute("SELECT SYMBOL, CURRENT FROM MarketWatch ORDER BY SYMBOL;").fetchall()
+    conn.close()
+    assert stored == [('ABL', 10.5), ('HBL', 20.0)]
+
+
+def test_batches_wait_for_the_connection_manager_writer(db_path):
+    manager = ConnectionManager(db_path)
+    with DatabaseWriter(db_path, lock=manager.writer_lock) as writer:
+        with manager.write():
+            job = writer.submit(insert_ticker_rows, make_rows('GOOD'), 'GOOD')
+            # The batch cannot start while another thread holds the manager's writer
+            with pytest.raises(TimeoutError):
+                job.result(timeout=0.3)
+        assert job.result(timeout=5) == (True, 3)
+    manager.close()
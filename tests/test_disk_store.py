@@ -0,0 +1,36 @@
+# tests/test_disk_store.py
+
+import sqlite3
+
+from utils.disk_store import DiskStore
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    clock = iter(range(100))
+    monkeypatch.setattr('utils.disk_store.time.time', lambda: next(clock))
+    store = DiskStore(str(tmp_path), max_bytes=25, columns={'Url': 'TEXT'}, suffix='.bin')
+    assert store.write('aa1', b'x' * 10, Url='first') == []
+    assert store.write('bb2', b'y' * 10, Url='second') == []
+    store.touch('aa1')
+
+    assert store.write('cc3', b'z' * 10, Url='third') == ['bb2']
+    assert store.read('aa1') == b'x' * 10
+    assert not (tmp_path / 'bb' / 'bb2.bin').exists()
+    assert store.totals() == (2, 20)
+    assert store.index.execute("SELECT Url FROM Entries ORDER BY Key;").fetchall() == [('first',), ('third',)]
+
+    store.clear()
+    assert store.totals() == (0, 0)
+    assert not (tmp_path / 'aa' / 'aa1.bin').exists()
+
+
+def test_missing_columns_are_added_to_an_existing_index(tmp_path):
+    index = sqlite3.connect(str(tmp_path / 'index.db'))
+    index.execute("CREATE TABLE Entries (Key TEXT PRIMARY KEY, Ticker TEXT, Size INTEGER, Last_Access REAL);")
+    index.execute("INSERT INTO Entries VALUES ('old', 'T0000', 1, 0);")
+    index.commit()
+    index.close()
+
+    store = DiskStore(str(tmp_path), max_bytes=100, columns={'Ticker': 'TEXT', 'State_Key': 'TEXT'})
+    store.write('new', b'body', Ticker='T0001', State_Key='state')
+    assert store.index.execute("SELECT Key, State_Key FROM Entries ORDER BY Key;").fetchall() == [('new', 'state'), ('old', None)]
@@ -0,0 +1,30 @@
+# tests/test_fetch_engine.py
+
+import asyncio
+
+from utils import response_archive, response_cache
+from utils.fetch_engine import get_default_engine
+
+
+def test_default_engine_is_shared_per_event_loop(monkeypatch, tmp_path):
+    archive = response_archive.ResponseArchive(str(tmp_path))
+    monkeypatch.setattr(response_cache, '_default_cache', None)
+    monkeypatch.setattr(response_cache, '_default_cache_disabled', True)
+    monkeypatch.setattr(response_archive, '_default_archive', archive)
+
+    async def engines():
+        first = get_default_engine()
+        # Concurrent callers on the loop get the same engine, so they share its concurrency cap
+        others = await asyncio.gather(*(asyncio.to_thread(get_default_engine, asyncio.get_running_loop()) for _ in range(4)))
+        return first, others
+
+    first, others = asyncio.run(engines())
+    assert all(engine is first for engine in others)
+    assert first.response_archive is archive and first.response_cache is None
+
+    loop = asyncio.new_event_loop()
+    try:
+        assert get_default_engine(loop) is get_default_engine(loop)
+        assert get_default_engine(loop) is not first
+    finally:
+        loop.close()
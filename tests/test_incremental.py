@@ -0,0 +1,84 @@
+# tests/test_incremental.py
+
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analysis.incremental import IndicatorState
+from analysis.mxwll_engine import compute_mxwll
+from analysis.screener import ticker_frame
+from benchmarks.bench_analysis import make_panel
+from benchmarks.bench_incremental import assert_same
+from functionalities.analyze_tickers import ANALYSIS_PARAMS
+
+
+BARS = 600
+
+
+def random_params(rng):
+    return {
+        **ANALYSIS_PARAMS,
+        'external_sensitivity': int(rng.choice([10, 25, 50])),
+        'internal_sensitivity': int(rng.choice([3, 5, 8])),
+        'show_internals': bool(rng.integers(2)),
+        'show_externals': bool(rng.integers(2)),
+        'show_order_blocks': bool(rng.integers(2)),
+        'close_only_fvg': bool(rng.integers(2)),
+        'show_aoe': bool(rng.integers(2)),
+        'data_frequency': str(rng.choice(['1D', '15m'])),
+    }
+
+
+def make_frame(seed, params):
+    df = ticker_frame(make_panel(1, BARS, seed=seed), 'T0000')
+    if params['data_frequency'] == '15m':
+        df.index = pd.date_range(end='2024-10-11 23:45', periods=len(df), freq='15min', name='Date')
+    return df
+
+
+def assert_same_result(expected, actual):
+    for name in expected.__dataclass_fields__:
+        assert_same(getattr(expected, name), getattr(actual, name), name)
+
+
+@pytest.mark.parametrize('seed', range(12))
+def test_update_matches_full_recompute(seed):
+    rng = np.random.default_rng(seed)
+    params = random_params(rng)
+    df = make_frame(seed, params)
+
+    # Seed from a few bars (before the ATR is seeded) or an empty state, then absorb steps of 1 to 40 bars
+    count = int(rng.integers(1, 30))
+    state = IndicatorState.from_frame(df.iloc[:count], 'T0000', params) if seed % 2 else IndicatorState('T0000', params)
+    if not seed % 2:
+        state.update(df.iloc[:count])
+    while count < len(df):
+        step = int(rng.integers(1, 41))
+        new = df.iloc[count:count + step]
+        count += len(new)
+        start = int(rng.integers(0, count))
+        if rng.random() < 0.2:
+            state = pickle.loads(pickle.dumps(state))
+        actual = state.update(new, start)
+        assert_same_result(compute_mxwll(df.iloc[:count], 'T0000', params, start=start), actual)
+    assert_same_result(compute_mxwll(df, 'T0000', params), state.result())
+
+
+def test_results_do_not_change_with_later_updates():
+    df = make_frame(0, ANALYSIS_PARAMS)
+    state = IndicatorState.from_frame(df.iloc[:400], 'T0000', ANALYSIS_PARAMS)
+    earlier = state.result(100)
+    expected = pickle.loads(pickle.dumps(earlier))
+    state.update(df.iloc[400:])
+    assert_same_result(expected, earlier)
+
+
+def test_catch_up_serves_any_window():
+    df = make_frame(1, ANALYSIS_PARAMS)
+    state = IndicatorState.from_frame(df.iloc[:500], 'T0000', ANALYSIS_PARAMS)
+    start = df.index.searchsorted(df.index[300])
+    assert_same_result(compute_mxwll(df, 'T0000', ANALYSIS_PARAMS, start=start), state.catch_up(df, start))
+    # A history that does not start with the absorbed bars is not an extension
+    assert state.catch_up(df.iloc[1:], start) is None
@@ -0,0 +1,82 @@
+# tests/test_rebuild_db.py
+
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from benchmarks import standin_server
+from benchmarks.standin_server import StandinServer
+from utils import data_fetcher, db_manager, response_archive, response_cache
+from utils.db_manager import SYNC_MODE_FAST_EOD, SYNC_MODE_FULL, initialize_db_and_tables, synchronize_database
+from utils.helpers import MARKET_TIMEZONE
+from utils.rebuild_db import rebuild_database
+from utils.response_archive import ResponseArchive
+
+
+class FrozenDatetime(datetime):
+    """
+    datetime whose now() and today() return a fixed moment, in local time unless a timezone is given.
+    """
+    moment = None
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.moment.astimezone(tz) if tz else cls.moment.astimezone().replace(tzinfo=None)
+
+    @classmethod
+    def today(cls):
+        return cls.now()
+
+
+@pytest.fixture
+def frozen_clock(monkeypatch):
+    for module in (db_manager, response_archive, standin_server):
+        monkeypatch.setattr(module, 'datetime', FrozenDatetime)
+    return FrozenDatetime
+
+
+def table_rows(path, query):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(query).fetchall()
+    finally:
+        conn.close()
+
+
+def test_rebuild_matches_fast_eod_sync(tmp_path, monkeypatch, frozen_clock):
+    archive_dir = str(tmp_path / 'archive')
+    synced_path, rebuilt_path = str(tmp_path / 'synced.db'), str(tmp_path / 'rebuilt.db')
+    # Patched module state is restored after the test; no cached responses, every response archived
+    monkeypatch.setattr(response_cache, '_default_cache', None)
+    monkeypatch.setattr(response_cache, '_default_cache_disabled', True)
+    monkeypatch.setattr(response_archive, '_default_archive', ResponseArchive(archive_dir))
+    monkeypatch.setattr(data_fetcher, 'PSX_BASE_URL', data_fetcher.PSX_BASE_URL)
+    monkeypatch.setattr(data_fetcher, 'INVESTORS_LOUNGE_BASE_URL', data_fetcher.INVESTORS_LOUNGE_BASE_URL)
+
+    with StandinServer(tickers=20, rows=30) as server:
+        data_fetcher.configure_base_urls(server.base_url, server.base_url)
+        conn = initialize_db_and_tables(synced_path)
+        try:
+            # The history up to Thursday during Thursday's session, then Friday's bars from the snapshot after the close
+            frozen_clock.moment = datetime(2024, 10, 10, 12, 0, tzinfo=MARKET_TIMEZONE)
+            synchronize_database(conn, '2024-10-10', mode=SYNC_MODE_FULL)
+            frozen_clock.moment = datetime(2024, 10, 11, 17, 30, tzinfo=MARKET_TIMEZONE)
+            summary = synchronize_database(conn, '2024-10-11', mode=SYNC_MODE_FAST_EOD)
+        finally:
+            conn.close()
+
+    assert summary['tickers']['records_added'] > 0
+    rebuilt = rebuild_database(rebuilt_path, archive_dir, workers=1)
+    assert rebuilt['snapshot_bars'] > 0
+    assert rebuilt['market_watch_snapshots'] == 2
+
+    ticker_query = "SELECT * FROM Ticker ORDER BY Ticker, Date;"
+    synced_rows = table_rows(synced_path, ticker_query)
+    assert any(row[1] == '2024-10-11' for row in synced_rows)
+    assert table_rows(rebuilt_path, ticker_query) == synced_rows
+
+    history_query = "SELECT * FROM MarketWatchHistory ORDER BY Snapshot_Time, SYMBOL;"
+    synced_history = table_rows(synced_path, history_query)
+    assert len({row[0] for row in synced_history}) == 2
+    assert table_rows(rebuilt_path, history_query) == synced_history
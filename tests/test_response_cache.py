@@ -0,0 +1,29 @@
+# tests/test_response_cache.py
+
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+from utils import response_cache
+from utils.response_cache import classify_url
+
+
+class TokyoDatetime(datetime):
+    """
+    datetime on a host in Tokyo (UTC+9) at 2024-10-12 02:00, which is still 22:00 on the 11th in Karachi.
+    """
+
+    @classmethod
+    def now(cls, tz=None):
+        moment = datetime(2024, 10, 11, 17, 0, tzinfo=timezone.utc)
+        return moment.astimezone(tz or ZoneInfo('Asia/Tokyo')).replace(tzinfo=tz)
+
+    @classmethod
+    def today(cls):
+        return cls.now()
+
+
+def test_daily_file_is_final_only_after_the_karachi_date(monkeypatch):
+    monkeypatch.setattr(response_cache, 'datetime', TokyoDatetime)
+    assert classify_url('https://dps.psx.com.pk/download/omts/2024-10-11.csv') == 'daily_file_today'
+    assert classify_url('https://dps.psx.com.pk/download/indhist/2024-10-10.xls') == 'daily_file'
+    assert classify_url('https://dps.psx.com.pk/download/omts/2024-10-12.csv') == 'daily_file_today'
@@ -0,0 +1,21 @@
+# tests/test_result_cache.py
+
+from analysis.incremental import IndicatorState
+from analysis.result_cache import IndicatorCache
+from analysis.screener import ticker_frame
+from benchmarks.bench_analysis import make_panel
+from functionalities.analyze_tickers import ANALYSIS_PARAMS
+
+
+def test_states_are_extended_on_private_copies(tmp_path):
+    cache = IndicatorCache(str(tmp_path))
+    df = ticker_frame(make_panel(1, 300, seed=0), 'T0000')
+    state = IndicatorState.from_frame(df.iloc[:200], 'T0000', ANALYSIS_PARAMS)
+    state_key = IndicatorCache.make_state_key('T0000', ANALYSIS_PARAMS)
+    cache.put('old', 'T0000', ('2024-01-01', 200), state.result(), state=state, state_key=state_key)
+
+    # Two sessions catching up from the same cached state each get the new bars once
+    first, second = cache.get_state(state_key), cache.get_state(state_key)
+    assert first.catch_up(df) is not None and second.catch_up(df) is not None
+    assert len(first) == len(second) == 300
+    assert len(cache.get('old').state) == len(cache.get_state(state_key)) == 200
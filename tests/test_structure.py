@@ -0,0 +1,87 @@
+# tests/test_structure.py
+
+import numpy as np
+import pytest
+
+from analysis.fvg import BEARISH, BULLISH
+from analysis.pivots import detect_pivots
+from analysis.structure import detect_structure
+
+
+def reference_structure(high, low, close, pivot_highs, pivot_lows, sensitivity):
+    """
+    Walks the bars one at a time following the rules in the detect_structure docstring.
+    """
+    confirmed = {BULLISH: {int(p) + sensitivity: int(p) for p in pivot_highs},
+                 BEARISH: {int(p) + sensitivity: int(p) for p in pivot_lows}}
+    tracked = {BULLISH: None, BEARISH: None}  # Side -> [pivot, broken]
+    events = []
+    blocks = []
+    for j in range(len(close)):
+        for block in blocks:
+            if block['violated_index'] >= 0 or j <= block['break_index']:
+                continue
+            if block['direction'] == BULLISH:
+                touched, through = low[j] <= block['top'], close[j] < block['bottom']
+            else:
+                touched, through = high[j] >= block['bottom'], close[j] > block['top']
+            if touched and block['mitigated_index'] < 0:
+                block['mitigated_index'] = j
+            if through:
+                block['violated_index'] = j
+
+        for side in (BULLISH, BEARISH):
+            if j in confirmed[side]:
+                tracked[side] = [confirmed[side][j], False]
+        for side in (BULLISH, BEARISH):
+            if tracked[side] is None or tracked[side][1] or j <= tracked[side][0] + sensitivity:
+                continue
+            pivot = tracked[side][0]
+            level = high[pivot] if side == BULLISH else low[pivot]
+            if not (close[j] > level if side == BULLISH else close[j] < level):
+                continue
+            tracked[side][1] = True
+            choch = bool(events) and events[-1]['direction'] != side
+            events.append({'index': j, 'direction': side, 'pivot': pivot, 'level': level, 'choch': choch})
+            candidates = range(pivot + 1, j)
+            if side == BULLISH:
+                block = min(candidates, key=lambda k: (low[k], k))
+            else:
+                block = min(candidates, key=lambda k: (-high[k], k))
+            blocks.append({'index': block, 'direction': side, 'top': high[block], 'bottom': low[block],
+                           'break_index': j, 'mitigated_index': -1, 'violated_index': -1})
+    return events, blocks
+
+
+def random_bars(rng, n, tick):
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    open_ = close + rng.normal(0, 0.5, n)
+    high = np.maximum(open_, close) + rng.uniform(0, 1, n)
+    low = np.minimum(open_, close) - rng.uniform(0, 1, n)
+    if tick:
+        # Coarse prices produce equal highs, lows and closes, exercising the inclusive/exclusive edges
+        high, low, close = (np.round(values / tick) * tick for values in (high, low, close))
+    return high, low, close
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_detect_structure_matches_bar_by_bar_reference(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(50, 800))
+    sensitivity = int(rng.choice([3, 5, 8, 10, 25]))
+    high, low, close = random_bars(rng, n, tick=rng.choice([0, 0.5, 2.0]))
+    pivots = detect_pivots(high, low, [sensitivity])[sensitivity]
+    pivot_highs, pivot_lows = pivots['highs'], pivots['lows']
+    if seed % 4 == 3:
+        # Any sorted pivot bars work, not only true extremes
+        pivot_highs = np.sort(rng.choice(n - sensitivity, size=min(40, n - sensitivity), replace=False))
+        pivot_lows = np.sort(rng.choice(n - sensitivity, size=min(40, n - sensitivity), replace=False))
+
+    structure = detect_structure(high, low, close, pivot_highs, pivot_lows, sensitivity)
+    events, blocks = reference_structure(high, low, close, pivot_highs, pivot_lows, sensitivity)
+
+    for key in ('index', 'direction', 'pivot', 'level', 'choch'):
+        assert structure['events'][key].tolist() == [event[key] for event in events], key
+    for key in ('index', 'direction', 'top', 'bottom', 'break_index', 'mitigated_index', 'violated_index'):
+        assert structure['order_blocks'][key].tolist() == [block[key] for block in blocks], key
+    assert structure['trend'] == (events[-1]['direction'] if events else 0)
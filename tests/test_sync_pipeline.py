@@ -0,0 +1,54 @@
+# tests/test_sync_pipeline.py
+
+import asyncio
+
+import pytest
+
+from utils.sync_pipeline import run_pipeline
+
+
+KEYS = [f"T{i:03d}" for i in range(60)]  # More keys than the queues hold
+
+
+async def fetch(session, key):
+    if key == 'T001':
+        raise RuntimeError("connection reset")
+    return [key] if key != 'T002' else None
+
+
+def normalize(data, key):
+    if key == 'T003':
+        raise ValueError("bad payload")
+    return [(key, 1)]
+
+
+def run(write, **kwargs):
+    return asyncio.run(asyncio.wait_for(run_pipeline(KEYS, fetch, normalize, write, queue_size=4, **kwargs), timeout=10))
+
+
+def assert_outcome(result):
+    assert result['completed'] == len(KEYS)
+    assert result['no_data'] == ['T002']
+    # One error per failing key: fetch (T001), normalize (T003) and write (T004)
+    assert len(result['errors']) == 3
+    assert [key for key in ('T001', 'T003', 'T004') if any(f"'{key}'" in error for error in result['errors'])] == ['T001', 'T003', 'T004']
+    assert result['records_added'] == len(KEYS) - 4
+
+
+@pytest.mark.parametrize('normalize_workers', [1, 4])
+def test_failures_are_reported_once_and_do_not_stall_the_pipeline(normalize_workers):
+    def write(rows, key):
+        if key == 'T004':
+            raise RuntimeError("database is locked")
+        return True, len(rows)
+
+    assert_outcome(run(write, normalize_workers=normalize_workers))
+
+
+def test_failing_awaitable_write():
+    async def write_async(rows, key):
+        if key == 'T004':
+            raise RuntimeError("database is locked")
+        return True, len(rows)
+
+    assert_outcome(run(write_async))
@@ -0,0 +1,112 @@
+# utils/connection_manager.py
+
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+# Pragmas applied to every connection. WAL lets readers keep reading while a sync is writing.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',  # Safe with WAL; only the last transactions can be lost on power failure
+    'mmap_size': 268435456,  # 256 MB memory-mapped I/O
+    'cache_size': -65536,  # Negative means KiB: 64 MB page cache per connection
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,  # Milliseconds to wait for a lock instead of failing with "database is locked"
+}
+
+
+def apply_pragmas(conn, read_only=False):
+    """
+    Applies the tuned SQLite pragmas to a connection.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+        read_only (bool): Additionally reject writes on this connection.
+    """
+    cursor = conn.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name} = {value};")
+    if read_only:
+        cursor.execute("PRAGMA query_only = ON;")
+
+
+class ConnectionManager:
+    """
+    Hands out one read connection per thread plus a single writer connection whose use is
+    serialized with a lock. Meant to be created once per process (e.g. cached with
+    st.cache_resource) and shared across Streamlit reruns and sessions.
+
+    Args:
+        db_path (str): Path to the SQLite database file.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._writer = sqlite3.connect(db_path, check_same_thread=False)
+        apply_pragmas(self._writer)
+        self._writer_lock = threading.RLock()
+        self._readers = {}  # thread ident -> connection
+        self._readers_lock = threading.Lock()
+        logging.info(f"Connection manager opened {db_path} in WAL mode.")
+
+    def reader(self):
+        """
+        Returns the read-only connection of the calling thread, creating it on first use.
+
+        Returns:
+            sqlite3.Connection: A connection that must only be used from the calling thread.
+        """
+        ident = threading.get_ident()
+        with self._readers_lock:
+            conn = self._readers.get(ident)
+            if conn is None:
+                self._close_dead_readers()
+                # check_same_thread=False only so the manager can close it; it is still used by one thread
+                conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                apply_pragmas(conn, read_only=True)
+                self._readers[ident] = conn
+            return conn
+
+    @property
+    def writer_lock(self):
+        """
+        The lock serializing writes. Hold it to write through a connection of your own, e.g. pass
+        it to utils.db_writer.DatabaseWriter; never wait on such a writer while inside write().
+        """
+        return self._writer_lock
+
+    @contextmanager
+    def write(self):
+        """
+        Context manager yielding the shared writer connection while holding the writer lock.
+        The transaction is committed on success and rolled back on error.
+
+        Yields:
+            sqlite3.Connection: The writer connection.
+        """
+        with self._writer_lock:
+            try:
+                yield self._writer
+                self._writer.commit()
+            except Exception:
+                self._writer.rollback()
+                raise
+
+    def _close_dead_readers(self):
+        # Streamlit runs scripts on short-lived threads; drop connections of threads that have exited
+        alive = {thread.ident for thread in threading.enumerate()}
+        for ident in [ident for ident in self._readers if ident not in alive]:
+            self._readers.pop(ident).close()
+
+    def close(self):
+        """
+        Closes all reader connections and the writer connection.
+        """
+        with self._readers_lock:
+            for conn in self._readers.values():
+                conn.close()
+            self._readers.clear()
+        with self._writer_lock:
+            self._writer.close()
@@ -1,5 +1,6 @@
 # utils/data_fetcher.py
 
+import os
 import requests
 import json
 import logging
@@ -9,7 +10,6 @@ import pandas as pd
 from datetime import datetime, timedelta
 from io import StringIO
 from io import BytesIO
-import aiohttp
 import asyncio
 
 # testing this script
@@ -17,15 +17,60 @@ import asyncio
 
 # when running main.py
 from utils.logger import setup_logging
+from utils.fetch_engine import FetchError, get_default_engine
+from utils import http_client
+from utils.http_client import XHR_HEADERS, DOCUMENT_HEADERS
 
 
 setup_logging()
 logger = logging.getLogger(__name__)
 
 
-# Base URLs for PSX data files
-BASE_OFF_MARKET_CSV_URL = "https://dps.psx.com.pk/download/omts/{}.csv"
-PSX_CONSTITUENT_URL = "https://dps.psx.com.pk/download/indhist/{}.xls"
+# Base URLs of the upstream sites. Override them (environment variables or configure_base_urls)
+# to run against the local stand-in server in benchmarks/standin_server.py.
+PSX_BASE_URL = os.environ.get('PSX_BASE_URL', "https://dps.psx.com.pk")
+INVESTORS_LOUNGE_BASE_URL = os.environ.get('INVESTORS_LOUNGE_BASE_URL', "https://www.investorslounge.com")
+
+# PSX endpoints and data files
+OFF_MARKET_CSV_PATH = "/download/omts/{}.csv"
+PSX_CONSTITUENT_PATH = "/download/indhist/{}.xls"
+MARKET_WATCH_PATH = "/market-watch"
+LISTINGS_PATH = "/listings-table/main/nc"
+DEFAULTERS_PATH = "/listings-table/main/dc"
+SYMBOLS_PATH = "/symbols"
+INDEX_PATH = "/indices/{}"
+TIMESERIES_PATH = "/timeseries/eod/{}"
+
+# Investors Lounge price history API
+STOCK_DATA_PATH = "/Default/SendPostRequest"
+STOCK_DATA_HEADERS = {
+    **XHR_HEADERS,
+    "Accept": "*/*",
+    "Content-Type": "application/json; charset=UTF-8",
+    "Priority": "u=1, i",
+}
+
+
+def configure_base_urls(psx_base_url=None, investors_lounge_base_url=None):
+    """
+    Points the fetchers at different upstream hosts, e.g. a local stand-in server.
+
+    Args:
+        psx_base_url (str): Base URL replacing https://dps.psx.com.pk.
+        investors_lounge_base_url (str): Base URL replacing https://www.investorslounge.com.
+    """
+    global PSX_BASE_URL, INVESTORS_LOUNGE_BASE_URL
+    if psx_base_url:
+        PSX_BASE_URL = psx_base_url.rstrip('/')
+    if investors_lounge_base_url:
+        INVESTORS_LOUNGE_BASE_URL = investors_lounge_base_url.rstrip('/')
+
+
+def psx_url(path):
+    """
+    Returns the absolute URL of a PSX path on the configured PSX host.
+    """
+    return f"{PSX_BASE_URL}{path}"
 
 
 # Data from the PDF parsed into a dictionary
@@ -184,21 +229,7 @@ def get_stock_data(ticker, date_from, date_to):
     Returns:
         list: List of stock data dictionaries or None if failed.
     """
-    url = "https://www.investorslounge.com/Default/SendPostRequest"
-    
-    headers = {
-        "Accept": "*/*",
-        "Accept-Language": "en-US,en;q=0.9,ps;q=0.8",
-        "Content-Type": "application/json; charset=UTF-8",
-        "Priority": "u=1, i",
-        "Sec-CH-UA": "\"Google Chrome\";v=\"129\", \"Not=A?Brand\";v=\"8\", \"Chromium\";v=\"129\"",
-        "Sec-CH-UA-Mobile": "?0",
-        "Sec-CH-UA-Platform": "\"Windows\"",
-        "Sec-Fetch-Dest": "empty",
-        "Sec-Fetch-Mode": "cors",
-        "Sec-Fetch-Site": "same-origin",
-        "X-Requested-With": "XMLHttpRequest"
-    }
+    url = f"{INVESTORS_LOUNGE_BASE_URL}{STOCK_DATA_PATH}"
     
     payload = {
         "url": "PriceHistory/GetPriceHistoryCompanyWise",
@@ -212,7 +243,7 @@ def get_stock_data(ticker, date_from, date_to):
     }
     
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=60)
+        response = http_client.post(url, headers=STOCK_DATA_HEADERS, json=payload)
         response.raise_for_status()
     except requests.exceptions.RequestException as e:
         logging.error(f"HTTP Request failed for ticker '{ticker}': {e}")
@@ -230,34 +261,26 @@ def get_stock_data(ticker, date_from, date_to):
         return None
 
 
-async def async_get_stock_data(session, ticker, date_from, date_to):
+async def async_get_stock_data(session, ticker, date_from, date_to, engine=None, base_url=None):
     """
     Asynchronously fetches stock data from the Investors Lounge API for a given ticker and date range.
+    Requests go through a FetchEngine so they are concurrency capped, rate limited and retried.
 
     Args:
         session (aiohttp.ClientSession): The aiohttp session to use for the request.
         ticker (str): The stock ticker symbol.
         date_from (str): Start date in 'DD MMM YYYY' format.
         date_to (str): End date in 'DD MMM YYYY' format.
+        engine (FetchEngine): Optional fetch engine shared across tickers. Defaults to the loop's get_default_engine().
+        base_url (str): Base URL of the Investors Lounge API. Defaults to INVESTORS_LOUNGE_BASE_URL.
 
     Returns:
         list: List of stock data dictionaries or None if failed.
     """
-    url = "https://www.investorslounge.com/Default/SendPostRequest"
-
-    headers = {
-        "Accept": "*/*",
-        "Accept-Language": "en-US,en;q=0.9,ps;q=0.8",
-        "Content-Type": "application/json; charset=UTF-8",
-        "Priority": "u=1, i",
-        "Sec-CH-UA": "\"Google Chrome\";v=\"129\", \"Not=A?Brand\";v=\"8\", \"Chromium\";v=\"129\"",
-        "Sec-CH-UA-Mobile": "?0",
-        "Sec-CH-UA-Platform": "\"Windows\"",
-        "Sec-Fetch-Dest": "empty",
-        "Sec-Fetch-Mode": "cors",
-        "Sec-Fetch-Site": "same-origin",
-        "X-Requested-With": "XMLHttpRequest"
-    }
+    if engine is None:
+        engine = get_default_engine()
+
+    url = f"{base_url or INVESTORS_LOUNGE_BASE_URL}{STOCK_DATA_PATH}"
 
     payload = {
         "url": "PriceHistory/GetPriceHistoryCompanyWise",
@@ -271,49 +294,59 @@ async def async_get_stock_data(session, ticker, date_from, date_to):
     }
 
     try:
-        async with session.post(url, headers=headers, json=payload, timeout=60) as response:
-            response.raise_for_status()
-            data = await response.json()
-            if not isinstance(data, list):
-                logging.error(f"Unexpected JSON structure for ticker '{ticker}': Expected a list of records.")
-                return None
-            logging.info(f"Retrieved {len(data)} records for ticker '{ticker}'.")
-            return data
-    except aiohttp.ClientError as e:
-        logging.error(f"HTTP Request failed for ticker '{ticker}': {e}")
+        data = await engine.request_json(session, 'POST', url, ticker, headers=STOCK_DATA_HEADERS, json=payload)
+    except FetchError as e:
+        engine.record_failure(ticker, f"Failed to fetch data for ticker '{ticker}' after {e.attempts} attempt(s): {e}")
         return None
-    except json.JSONDecodeError:
-        logging.error(f"Failed to parse JSON response for ticker '{ticker}'.")
+
+    if not isinstance(data, list):
+        engine.record_failure(ticker, f"Unexpected JSON structure for ticker '{ticker}': Expected a list of records.")
         return None
+    engine.record_success(ticker)
+    logging.info(f"Retrieved {len(data)} records for ticker '{ticker}'.")
+    return data
 
-async def fetch_all_tickers_data(tickers, date_from, date_to):
+async def fetch_all_tickers_data(tickers, date_from, date_to, engine=None, base_url=None):
     """
-    Asynchronously fetches stock data for all tickers.
+    Asynchronously fetches stock data for all tickers with bounded concurrency, per-host rate limiting
+    and retries. Retry and error accounting is available afterwards on engine.stats.
 
     Args:
         tickers (list): List of ticker symbols.
         date_from (str): Start date in 'DD MMM YYYY' format.
         date_to (str): End date in 'DD MMM YYYY' format.
+        engine (FetchEngine): Optional fetch engine; pass one in to inspect the stats of this run alone.
+            Defaults to the loop's get_default_engine().
+        base_url (str): Base URL of the Investors Lounge API.
 
     Returns:
         dict: Dictionary with ticker symbols as keys and their data as values.
     """
-    async with aiohttp.ClientSession() as session:
-        tasks = []
-        for ticker in tickers:
-            task = asyncio.ensure_future(async_get_stock_data(session, ticker, date_from, date_to))
-            tasks.append((ticker, task))
-
-        results = await asyncio.gather(*[task for _, task in tasks], return_exceptions=True)
+    if engine is None:
+        engine = get_default_engine()
+
+    engine.stats.start()
+    async with http_client.create_async_session() as session:
+        tasks = [
+            async_get_stock_data(session, ticker, date_from, date_to, engine=engine, base_url=base_url)
+            for ticker in tickers
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+    engine.stats.finish()
+
+    ticker_data = {}
+    for ticker, result in zip(tickers, results):
+        if isinstance(result, Exception):
+            engine.record_failure(ticker, f"Exception occurred while fetching data for ticker '{ticker}': {result}")
+            ticker_data[ticker] = None
+        else:
+            ticker_data[ticker] = result
 
-        ticker_data = {}
-        for (ticker, _), result in zip(tasks, results):
-            if isinstance(result, Exception):
-                logging.error(f"Exception occurred while fetching data for ticker '{ticker}': {result}")
-                ticker_data[ticker] = None
-            else:
-                ticker_data[ticker] = result
-        return ticker_data
+    logging.info(
+        f"Fetched {engine.stats.succeeded}/{len(tickers)} tickers in {engine.stats.elapsed:.2f}s "
+        f"({engine.stats.items_per_second:.2f} tickers/s, {engine.stats.total_retries} retries)."
+    )
+    return ticker_data
 
 
 
@@ -321,49 +354,14 @@ def fetch_kse_market_watch():
     """
     Fetches and parses market watch data from the KSE website.
     
-    Args:
-        SECTOR_MAPPING (dict): Mapping of sector codes to sector names.
-    
     Returns:
         list: List of dictionaries containing market watch data.
     """
     try:
-        # URL for the market watch page
-        url = "https://dps.psx.com.pk/market-watch"
-        
         # Fetch the page
-        response = requests.get(url, timeout=60)
+        response = http_client.get(psx_url(MARKET_WATCH_PATH))
         response.raise_for_status()
-        
-        # Parse the HTML content
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Find the table containing market data
-        table = soup.find('table', {'class': 'tbl'})
-        
-        # Process each row of the table
-        processed_data = []
-        rows = table.find('tbody').find_all('tr')
-        for row in rows:
-            columns = row.find_all('td')
-            if len(columns) >= 11:  # Ensure there are enough columns
-                processed_item = {
-                    'SYMBOL': columns[0].text.strip(),
-                    'SECTOR': SECTOR_MAPPING.get(columns[1].text.strip(), 'Unknown'),
-                    'LISTED IN': columns[2].text.strip(),
-                    'LDCP': float(columns[3].text.strip().replace(',', '')),
-                    'OPEN': float(columns[4].text.strip().replace(',', '')),
-                    'HIGH': float(columns[5].text.strip().replace(',', '')),
-                    'LOW': float(columns[6].text.strip().replace(',', '')),
-                    'CURRENT': float(columns[7].text.strip().replace(',', '')),
-                    'CHANGE': round(float(columns[8].text.strip().replace(',', '')), 2),  # Round to 2 decimal points
-                    'CHANGE (%)': round(float(columns[9].text.strip().replace('%', '').replace(',', '')), 2),  # Round to 2 decimal points
-                    'VOLUME': int(columns[10].text.strip().replace(',', '')),
-                }
-                processed_data.append(processed_item)
-        
-        logging.info(f"Fetched and processed {len(processed_data)} market watch records.")
-        return processed_data
+        return parse_kse_market_watch(response.text)
 
     except requests.exceptions.RequestException as e:
         logging.error(f"Failed to fetch market watch data: {e}")
@@ -373,6 +371,46 @@ def fetch_kse_market_watch():
         return []
 
 
+def parse_kse_market_watch(html):
+    """
+    Parses the market watch page into records, mapping sector codes with SECTOR_MAPPING.
+
+    Args:
+        html (str): HTML of the market watch page.
+
+    Returns:
+        list: List of dictionaries containing market watch data.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    # Find the table containing market data
+    table = soup.find('table', {'class': 'tbl'})
+    
+    # Process each row of the table
+    processed_data = []
+    rows = table.find('tbody').find_all('tr')
+    for row in rows:
+        columns = row.find_all('td')
+        if len(columns) >= 11:  # Ensure there are enough columns
+            processed_item = {
+                'SYMBOL': columns[0].text.strip(),
+                'SECTOR': SECTOR_MAPPING.get(columns[1].text.strip(), 'Unknown'),
+                'LISTED IN': columns[2].text.strip(),
+                'LDCP': float(columns[3].text.strip().replace(',', '')),
+                'OPEN': float(columns[4].text.strip().replace(',', '')),
+                'HIGH': float(columns[5].text.strip().replace(',', '')),
+                'LOW': float(columns[6].text.strip().replace(',', '')),
+                'CURRENT': float(columns[7].text.strip().replace(',', '')),
+                'CHANGE': round(float(columns[8].text.strip().replace(',', '')), 2),  # Round to 2 decimal points
+                'CHANGE (%)': round(float(columns[9].text.strip().replace('%', '').replace(',', '')), 2),  # Round to 2 decimal points
+                'VOLUME': int(columns[10].text.strip().replace(',', '')),
+            }
+            processed_data.append(processed_item)
+    
+    logging.info(f"Fetched and processed {len(processed_data)} market watch records.")
+    return processed_data
+
+
 
 
 
@@ -383,15 +421,27 @@ def get_defaulters_list():
     Returns:
         list: A list of dictionaries, each containing stock symbol, defaulting clause, and other details.
     """
-    url = "https://dps.psx.com.pk/listings-table/main/dc"
     try:
-        response = requests.get(url, timeout=60)
+        response = http_client.get(psx_url(DEFAULTERS_PATH))
         response.raise_for_status()
     except requests.exceptions.RequestException as e:
         logging.error(f"HTTP Request failed for defaulters list: {e}")
         return None
 
-    soup = BeautifulSoup(response.text, 'html.parser')
+    return parse_defaulters_list(response.text)
+
+
+def parse_defaulters_list(html):
+    """
+    Parses the PSX defaulters table.
+
+    Args:
+        html (str): HTML of the defaulters listing page.
+
+    Returns:
+        list: A list of dictionaries, each containing stock symbol, defaulting clause, and other details.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
     table = soup.find('table', {'class': 'tbl'})
 
     defaulters_data = []
@@ -493,9 +543,9 @@ def get_listings_data():
     Returns:
         list: A list of dictionaries, each containing stock symbol and other details.
     """
-    url = "https://dps.psx.com.pk/listings-table/main/nc"
+    url = psx_url(LISTINGS_PATH)
     try:
-        response = requests.get(url, timeout=60)
+        response = http_client.get(url)
         response.raise_for_status()
     except requests.exceptions.RequestException as e:
         logging.error(f"HTTP Request failed for listings data: {e}")
@@ -558,22 +608,10 @@ def get_kse_symbols():
             ...
         ]
     """
-    url = "https://dps.psx.com.pk/symbols"
-
-    headers = {
-        "Accept": "application/json, text/javascript, */*; q=0.01",
-        "Accept-Language": "en-US,en;q=0.9,ps;q=0.8",
-        "Sec-CH-UA": "\"Google Chrome\";v=\"129\", \"Not=A?Brand\";v=\"8\", \"Chromium\";v=\"129\"",
-        "Sec-CH-UA-Mobile": "?0",
-        "Sec-CH-UA-Platform": "\"Windows\"",
-        "Sec-Fetch-Dest": "empty",
-        "Sec-Fetch-Mode": "cors",
-        "Sec-Fetch-Site": "same-origin",
-        "X-Requested-With": "XMLHttpRequest"
-    }
+    url = psx_url(SYMBOLS_PATH)
 
     try:
-        response = requests.get(url, headers=headers, timeout=60)
+        response = http_client.get(url, headers=XHR_HEADERS)
         response.raise_for_status()
     except requests.exceptions.RequestException as e:
         logging.error(f"HTTP Request failed for index symbols: {e}")
@@ -622,25 +660,12 @@ def get_kse_ticker_detail(index_symbol):
             ...
         ]
     """
-    url = f"https://dps.psx.com.pk/indices/{index_symbol}"
-
-    headers = {
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-        "Accept-Language": "en-US,en;q=0.9",
-        "Sec-CH-UA": "\"Google Chrome\";v=\"129\", \"Not=A?Brand\";v=\"8\", \"Chromium\";v=\"129\"",
-        "Sec-CH-UA-Mobile": "?0",
-        "Sec-CH-UA-Platform": "\"Windows\"",
-        "Sec-Fetch-Dest": "document",
-        "Sec-Fetch-Mode": "navigate",
-        "Sec-Fetch-Site": "same-origin",
-        "Sec-Fetch-User": "?1",
-        "Upgrade-Insecure-Requests": "1",
-        "Referer": "https://dps.psx.com.pk/indices",
-        "Connection": "keep-alive"
-    }
+    url = psx_url(INDEX_PATH.format(index_symbol))
+
+    headers = {**DOCUMENT_HEADERS, "Accept-Language": "en-US,en;q=0.9", "Referer": psx_url("/indices")}
 
     try:
-        response = requests.get(url, headers=headers, timeout=60)
+        response = http_client.get(url, headers=headers)
         response.raise_for_status()
     except requests.exceptions.RequestException as e:
         logging.error(f"HTTP Request failed for index constituents '{index_symbol}': {e}")
@@ -725,22 +750,10 @@ def get_kse_index_historical_data(index_symbol):
             ]
         }
     """
-    url = f"https://dps.psx.com.pk/timeseries/eod/{index_symbol}"
-
-    headers = {
-        "Accept": "application/json, text/javascript, */*; q=0.01",
-        "Accept-Language": "en-US,en;q=0.9,ps;q=0.8",
-        "Sec-CH-UA": "\"Google Chrome\";v=\"129\", \"Not=A?Brand\";v=\"8\", \"Chromium\";v=\"129\"",
-        "Sec-CH-UA-Mobile": "?0",
-        "Sec-CH-UA-Platform": "\"Windows\"",
-        "Sec-Fetch-Dest": "empty",
-        "Sec-Fetch-Mode": "cors",
-        "Sec-Fetch-Site": "same-origin",
-        "X-Requested-With": "XMLHttpRequest"
-    }
+    url = psx_url(TIMESERIES_PATH.format(index_symbol))
 
     try:
-        response = requests.get(url, headers=headers, timeout=60)
+        response = http_client.get(url, headers=XHR_HEADERS)
         response.raise_for_status()
     except requests.exceptions.RequestException as e:
         logging.error(f"HTTP Request failed for index historical data '{index_symbol}': {e}")
@@ -856,12 +869,12 @@ def fetch_psx_transaction_data(date):
     """
     # Step 1: Construct URL based on the date provided
     # Step 1: Construct the URL using the provided date
-    url = BASE_OFF_MARKET_CSV_URL.format(date)
+    url = psx_url(OFF_MARKET_CSV_PATH.format(date))
     logging.info(f"Fetching PSX CSV data from {url}")
     
     # Step 2: Fetch the CSV data from the URL
     try:
-        response = requests.get(url)
+        response = http_client.get(url)
         response.raise_for_status()
         csv_data = response.text
         logging.info("CSV data fetched successfully.")
@@ -869,6 +882,20 @@ def fetch_psx_transaction_data(date):
         logging.error(f"Failed to fetch CSV data: {e}")
         return None
 
+    return parse_psx_transaction_data(csv_data)
+
+
+def parse_psx_transaction_data(csv_data):
+    """
+    Parses the PSX off-market CSV into B2B and I2I transactions.
+
+    Args:
+        csv_data (str): Contents of the omts CSV file.
+
+    Returns:
+        DataFrame: A single pandas DataFrame containing both B2B and I2I transactions with an additional 'Transaction_Type' field,
+                   or None if the file format is not recognized.
+    """
     # Step 3: Split the CSV data into 'Broker to Broker Transactions' and 'Institution to Institution Transactions' sections
     split_marker = "CROSS ,TRANSACTIONS, BETWEEN, CLIENT TO ,CLIENT & FINANCIAL, INSTITUTIONS"
     sections = csv_data.split(split_marker)
@@ -958,57 +985,107 @@ def fetch_psx_constituents(date=None):
         list: A list of dictionaries with the PSX data.
     """
     try:
-        from datetime import datetime
-        import requests
-        import pandas as pd
-        import logging
-        from io import BytesIO
-
         # Use today's date if no date is provided
         if date is None:
             date = datetime.today().strftime('%Y-%m-%d')
         
         # Construct the URL with the given date
-        url = PSX_CONSTITUENT_URL.format(date)
+        url = psx_url(PSX_CONSTITUENT_PATH.format(date))
         logging.info(f"Fetching PSX data from {url}")
 
         # Download the Excel file
-        response = requests.get(url)
+        response = http_client.get(url)
         response.raise_for_status()  # Ensure the request was successful
-
-        # Load the Excel content into a Pandas DataFrame
-        excel_file = BytesIO(response.content)
-        df = pd.read_excel(excel_file)
-
-        # Rename columns to match db_manager.py expectations
-        df.rename(columns={
-            'IDX WT %': 'IDX_WT',
-            'FF BASED SHARES': 'FF_BASED_SHARES',
-            'FF BASED MCAP': 'FF_BASED_MCAP',
-            'ORD SHARES': 'ORD_SHARES',
-            'ORD SHARES MCAP': 'ORD_SHARES_MCAP'
-        }, inplace=True)
-
-        # Ensure the columns are in the expected format
-        required_columns = [
-            'ISIN', 'SYMBOL', 'COMPANY', 'PRICE', 
-            'IDX_WT', 'FF_BASED_SHARES', 'FF_BASED_MCAP', 
-            'ORD_SHARES', 'ORD_SHARES_MCAP', 'VOLUME'
-        ]
-        if not set(required_columns).issubset(df.columns):
-            logging.error("Excel file does not contain the expected columns.")
-            return []
-
-        # Convert the DataFrame into a list of dictionaries for insertion
-        psx_data = df[required_columns].to_dict(orient='records')
-        logging.info(f"Fetched {len(psx_data)} records from PSX constituents.")
-        return psx_data
+        return parse_psx_constituents(response.content)
 
     except Exception as e:
         logging.error(f"Error fetching PSX data: {e}")
         return []
 
 
+def parse_psx_constituents(content):
+    """
+    Parses the PSX constituents Excel file.
+
+    Args:
+        content (bytes): Contents of the Excel file.
+
+    Returns:
+        list: A list of dictionaries with the PSX data, or an empty list if the expected columns are missing.
+    """
+    # Load the Excel content into a Pandas DataFrame
+    df = pd.read_excel(BytesIO(content))
+
+    # Rename columns to match db_manager.py expectations
+    df.rename(columns={
+        'IDX WT %': 'IDX_WT',
+        'FF BASED SHARES': 'FF_BASED_SHARES',
+        'FF BASED MCAP': 'FF_BASED_MCAP',
+        'ORD SHARES': 'ORD_SHARES',
+        'ORD SHARES MCAP': 'ORD_SHARES_MCAP'
+    }, inplace=True)
+
+    # Ensure the columns are in the expected format
+    required_columns = [
+        'ISIN', 'SYMBOL', 'COMPANY', 'PRICE', 
+        'IDX_WT', 'FF_BASED_SHARES', 'FF_BASED_MCAP', 
+        'ORD_SHARES', 'ORD_SHARES_MCAP', 'VOLUME'
+    ]
+    if not set(required_columns).issubset(df.columns):
+        logging.error("Excel file does not contain the expected columns.")
+        return []
+
+    # Convert the DataFrame into a list of dictionaries for insertion
+    psx_data = df[required_columns].to_dict(orient='records')
+    logging.info(f"Fetched {len(psx_data)} records from PSX constituents.")
+    return psx_data
+
+
+async def fetch_market_watch_sources_async(date=None, engine=None, executor=None):
+    """
+    Fetches the market watch, defaulters and PSX constituents sources concurrently on one shared
+    aiohttp session. Each response is parsed in a worker pool as soon as it arrives, so the HTML and
+    Excel parsing never blocks the event loop and the total time is roughly that of the slowest source.
+
+    Args:
+        date (str): Constituents date in format 'YYYY-MM-DD'. Defaults to today.
+        engine (FetchEngine): Optional fetch engine used for retries and rate limiting. Defaults to the loop's get_default_engine().
+        executor (concurrent.futures.Executor): Optional worker pool for parsing. Defaults to the loop's executor.
+
+    Returns:
+        tuple: (market_data, defaulters_data, psx_data). A source that failed is returned as an empty list.
+    """
+    if engine is None:
+        engine = get_default_engine()
+    if date is None:
+        date = datetime.today().strftime('%Y-%m-%d')
+    loop = asyncio.get_running_loop()
+
+    async def fetch_and_parse(session, key, url, parse, decode):
+        try:
+            body = await engine.request_bytes(session, 'GET', url, key)
+            data = await loop.run_in_executor(executor, parse, body.decode('utf-8', errors='replace') if decode else body)
+        except FetchError as e:
+            engine.record_failure(key, f"Failed to fetch {key} after {e.attempts} attempt(s): {e}")
+            return []
+        except Exception as e:
+            engine.record_failure(key, f"Error processing {key}: {e}")
+            return []
+        engine.record_success(key)
+        return data or []
+
+    engine.stats.start()
+    async with http_client.create_async_session() as session:
+        results = await asyncio.gather(
+            fetch_and_parse(session, 'market watch', psx_url(MARKET_WATCH_PATH), parse_kse_market_watch, True),
+            fetch_and_parse(session, 'defaulters list', psx_url(DEFAULTERS_PATH), parse_defaulters_list, True),
+            fetch_and_parse(session, 'PSX constituents', psx_url(PSX_CONSTITUENT_PATH.format(date)), parse_psx_constituents, False),
+        )
+    engine.stats.finish()
+    logging.info(f"Fetched market watch sources in {engine.stats.elapsed:.2f}s.")
+    return tuple(results)
+
+
 
 def main():
     """
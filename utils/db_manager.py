@@ -2,28 +2,32 @@
 
 
 import sqlite3
+import json
 import logging
 from datetime import datetime, timedelta
+from time import perf_counter
 import pandas as pd
 
 # when running the app main.py
 from utils.data_fetcher import (
-    fetch_kse_market_watch,
     get_listings_data,
     get_defaulters_list,
     fetch_psx_transaction_data,
     fetch_psx_constituents,
-    get_stock_data,
-    async_get_stock_data, 
-    fetch_all_tickers_data
+    fetch_market_watch_sources_async,
+    async_get_stock_data
 )
+from utils.fetch_engine import get_default_engine
+from utils.response_cache import get_default_cache
+from utils.sync_pipeline import run_pipeline
 
 # when running main.py
 from utils.logger import setup_logging
+from utils.helpers import get_previous_trading_day, MARKET_TIMEZONE, MARKET_CLOSE_TIME
+from utils.connection_manager import ConnectionManager, apply_pragmas
+from utils.db_writer import DatabaseWriter
 
 import asyncio
-import aiohttp
-from utils.data_fetcher import async_get_stock_data
 
 
 
@@ -32,6 +36,14 @@ from utils.data_fetcher import async_get_stock_data
 setup_logging()
 logger = logging.getLogger(__name__)
 
+# Ticker synchronization modes
+SYNC_MODE_INCREMENTAL = 'incremental'  # Only request the range after each ticker's watermark
+SYNC_MODE_FULL = 'full'  # Request the full history from DEFAULT_HISTORY_START
+SYNC_MODE_FAST_EOD = 'fast_eod'  # Take today's bar from the MarketWatch snapshot, history API only for gaps
+SYNC_MODES = [SYNC_MODE_INCREMENTAL, SYNC_MODE_FULL, SYNC_MODE_FAST_EOD]
+
+DEFAULT_HISTORY_START = "01 Jan 2000"
+
 def initialize_db_and_tables(db_path='data/tick_data.db'):
     """
     Initializes the SQLite database and creates the necessary tables if they don't exist.
@@ -45,110 +57,400 @@ def initialize_db_and_tables(db_path='data/tick_data.db'):
     """
     try:
         conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
+        apply_pragmas(conn)
+        create_tables(conn)
+        return conn
+    except sqlite3.Error as e:
+        logging.error(f"Database initialization failed: {e}")
+        return None
+
+
+def create_connection_manager(db_path='data/tick_data.db'):
+    """
+    Creates a ConnectionManager for the database (WAL, tuned pragmas, per-thread readers and one
+    serialized writer) and makes sure the necessary tables exist.
+
+    Args:
+        db_path (str): Path to the SQLite database file.
+
+    Returns:
+        ConnectionManager: The connection manager, or None if initialization failed.
+    """
+    try:
+        manager = ConnectionManager(db_path)
+        with manager.write() as conn:
+            create_tables(conn)
+        return manager
+    except sqlite3.Error as e:
+        logging.error(f"Database initialization failed: {e}")
+        return None
 
-    #     # Create the Ticker table
-    #     cursor.execute("""
-    #         CREATE TABLE IF NOT EXISTS Ticker (
-    #             Ticker TEXT,
-    #             Date TEXT,
-    #             Open REAL,
-    #             High REAL,
-    #             Low REAL,
-    #             Close REAL,
-    #             Change REAL,
-    #             "Change (%)" REAL,
-    #             Volume INTEGER,
-    #             PRIMARY KEY (Ticker, Date)
-    #         );
-    #     """)
-
-        # # ---- Drop MarketWatch table if it exists ---- #
-        # cursor.execute("DROP TABLE IF EXISTS MarketWatch")
-        # logging.info("MarketWatch table dropped.")
-
-    #     # Create the MarketWatch table with a unique constraint on SYMBOL, SECTOR, and LISTED IN
+
+def create_tables(conn):
+    """
+    Creates the necessary tables if they don't exist.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+    """
+    cursor = conn.cursor()
+
+    # Create the Ticker table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Ticker (
+            Ticker TEXT,
+            Date TEXT,
+            Open REAL,
+            High REAL,
+            Low REAL,
+            Close REAL,
+            Change REAL,
+            "Change (%)" REAL,
+            Volume INTEGER,
+            PRIMARY KEY (Ticker, Date)
+        );
+    """)
+
+    # # ---- Drop MarketWatch table if it exists ---- #
+    # cursor.execute("DROP TABLE IF EXISTS MarketWatch")
+    # logging.info("MarketWatch table dropped.")
+
+    # Create the MarketWatch table with a unique constraint on SYMBOL, SECTOR, and LISTED IN
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS MarketWatch (
+            SYMBOL TEXT,
+            SECTOR TEXT,
+            "LISTED IN" TEXT,
+            LDCP REAL,
+            OPEN REAL,
+            HIGH REAL,
+            LOW REAL,
+            CURRENT REAL,
+            CHANGE REAL,
+            "CHANGE (%)" REAL,
+            VOLUME INTEGER,
+            DEFAULTER BOOLEAN DEFAULT FALSE,
+            DEFAULTING_CLAUSE TEXT,
+            PRICE REAL,
+            IDX_WT REAL,
+            FF_BASED_SHARES INTEGER,
+            FF_BASED_MCAP REAL,
+            ORD_SHARES INTEGER,
+            ORD_SHARES_MCAP REAL,
+            PRIMARY KEY (SYMBOL, SECTOR, "LISTED IN")
+        );
+    """)
+
+    # Create the Transactions table for Off Market and Cross Transactions
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Transactions (
+            Date TEXT,
+            Settlement_Date TEXT,
+            Buyer_Code TEXT,
+            Seller_Code TEXT,
+            Symbol_Code TEXT,
+            Company TEXT,
+            Turnover INTEGER,
+            Rate REAL,
+            Value REAL,
+            Transaction_Type TEXT,
+            PRIMARY KEY (Date, Symbol_Code, Buyer_Code, Seller_Code)
+        );
+    """)
+
+    # Create the Portfolios table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Portfolios (
+            Portfolio_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+            Name TEXT UNIQUE NOT NULL,
+            Stocks TEXT NOT NULL
+        );
+    """)
+
+    # Create the PSXConstituents table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS PSXConstituents (
+            ISIN TEXT PRIMARY KEY,
+            SYMBOL TEXT,
+            COMPANY TEXT,
+            PRICE REAL,
+            IDX_WT REAL,
+            FF_BASED_SHARES INTEGER,
+            FF_BASED_MCAP REAL,
+            ORD_SHARES INTEGER,
+            ORD_SHARES_MCAP REAL,
+            VOLUME INTEGER
+        );
+    """)
+    conn.commit()
+
+    create_ticker_watermark_table(conn)
+    create_market_watch_history_table(conn)
+
+
+def create_ticker_watermark_table(conn):
+    """
+    Creates the TickerWatermark table holding the latest stored date and row count per ticker.
+    When the table is first created it is backfilled from the existing Ticker table.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ('TickerWatermark', 'Ticker');")
+    existing = {row[0] for row in cursor.fetchall()}
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS TickerWatermark (
+            Ticker TEXT PRIMARY KEY,
+            Last_Date TEXT NOT NULL,
+            Row_Count INTEGER NOT NULL DEFAULT 0
+        );
+    """)
+
+    if 'TickerWatermark' not in existing and 'Ticker' in existing:
         cursor.execute("""
-            CREATE TABLE IF NOT EXISTS MarketWatch (
-                SYMBOL TEXT,
-                SECTOR TEXT,
-                "LISTED IN" TEXT,
-                LDCP REAL,
-                OPEN REAL,
-                HIGH REAL,
-                LOW REAL,
-                CURRENT REAL,
-                CHANGE REAL,
-                "CHANGE (%)" REAL,
-                VOLUME INTEGER,
-                DEFAULTER BOOLEAN DEFAULT FALSE,
-                DEFAULTING_CLAUSE TEXT,
-                PRICE REAL,
-                IDX_WT REAL,
-                FF_BASED_SHARES INTEGER,
-                FF_BASED_MCAP REAL,
-                ORD_SHARES INTEGER,
-                ORD_SHARES_MCAP REAL,
-                PRIMARY KEY (SYMBOL, SECTOR, "LISTED IN")
-            );
+            INSERT OR IGNORE INTO TickerWatermark (Ticker, Last_Date, Row_Count)
+            SELECT Ticker, MAX(Date), COUNT(*) FROM Ticker GROUP BY Ticker;
         """)
+        logging.info(f"Backfilled TickerWatermark with {cursor.rowcount} tickers.")
+    conn.commit()
 
-    #     # Create the Transactions table for Off Market and Cross Transactions
-    #     cursor.execute("""
-    #         CREATE TABLE IF NOT EXISTS Transactions (
-    #             Date TEXT,
-    #             Settlement_Date TEXT,
-    #             Buyer_Code TEXT,
-    #             Seller_Code TEXT,
-    #             Symbol_Code TEXT,
-    #             Company TEXT,
-    #             Turnover INTEGER,
-    #             Rate REAL,
-    #             Value REAL,
-    #             Transaction_Type TEXT,
-    #             PRIMARY KEY (Date, Symbol_Code, Buyer_Code, Seller_Code)
-    #         );
-    #     """)
-
-    #     # Create the Portfolios table
-    #     cursor.execute("""
-    #         CREATE TABLE IF NOT EXISTS Portfolios (
-    #             Portfolio_ID INTEGER PRIMARY KEY AUTOINCREMENT,
-    #             Name TEXT UNIQUE NOT NULL,
-    #             Stocks TEXT NOT NULL
-    #         );
-    #     """)
-
-
-    #     # Crate the PSXConstituents table
-    #     cursor.execute("""
-    #     CREATE TABLE IF NOT EXISTS PSXConstituents (
-    #         ISIN TEXT PRIMARY KEY,
-    #         SYMBOL TEXT,
-    #         COMPANY TEXT,
-    #         PRICE REAL,
-    #         IDX_WT REAL,
-    #         FF_BASED_SHARES INTEGER,
-    #         FF_BASED_MCAP REAL,
-    #         ORD_SHARES INTEGER,
-    #         ORD_SHARES_MCAP REAL,
-    #         VOLUME INTEGER
-    #     );
-    # """)
-        
 
-    #     conn.commit()
-    #     logging.info(f"Database initialized with Ticker and MarketWatch and Transactions table tables at {db_path}.")
-       
-        return conn
+def update_ticker_watermark(cursor, ticker, last_date, records_added):
+    """
+    Advances the watermark of a ticker. Must be called in the same transaction as the insert.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor of the transaction that inserted the rows.
+        ticker (str): The stock ticker symbol.
+        last_date (str): Latest date ('YYYY-MM-DD') among the inserted rows.
+        records_added (int): Number of rows actually inserted.
+    """
+    cursor.execute("""
+        INSERT INTO TickerWatermark (Ticker, Last_Date, Row_Count) VALUES (?, ?, ?)
+        ON CONFLICT(Ticker) DO UPDATE SET
+            Last_Date = MAX(Last_Date, excluded.Last_Date),
+            Row_Count = Row_Count + excluded.Row_Count;
+    """, (ticker, last_date, records_added))
+
+
+def get_ticker_watermarks(conn):
+    """
+    Retrieves the watermark of every ticker in a single query.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+
+    Returns:
+        dict: Ticker symbol -> latest stored date in 'YYYY-MM-DD' format.
+    """
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT Ticker, Last_Date FROM TickerWatermark;")
+        return {row[0]: row[1] for row in cursor.fetchall()}
     except sqlite3.Error as e:
-        logging.error(f"Database initialization failed: {e}")
+        logging.error(f"Failed to retrieve ticker watermarks: {e}")
+        return {}
+
+
+def get_ticker_versions(conn, tickers):
+    """
+    Retrieves the data version of many tickers in a single query. Ticker rows are only ever
+    inserted, so the (latest date, row count) watermark changes whenever a sync adds rows.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+        tickers (list): Ticker symbols to look up.
+
+    Returns:
+        dict: Ticker symbol -> (latest date, row count). Tickers without data are omitted.
+    """
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT Ticker, Last_Date, Row_Count FROM TickerWatermark WHERE Ticker IN (SELECT value FROM json_each(?));",
+            (json.dumps(list(tickers)),)
+        )
+        return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+    except sqlite3.Error as e:
+        logging.error(f"Failed to retrieve ticker versions: {e}")
+        return {}
+
+
+def get_latest_date_for_ticker(conn, ticker):
+    """
+    Retrieves the latest stored date for a ticker from its watermark.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+        ticker (str): The stock ticker symbol.
+
+    Returns:
+        str: Latest date in 'YYYY-MM-DD' format, or None if the ticker has no data.
+    """
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT Last_Date FROM TickerWatermark WHERE Ticker = ?;", (ticker,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+    except sqlite3.Error as e:
+        logging.error(f"Failed to retrieve latest date for ticker '{ticker}': {e}")
         return None
 
 
+def get_incremental_date_ranges(watermarks, tickers, date_to):
+    """
+    Computes the delta date range to request for each ticker based on its watermark.
+
+    Args:
+        watermarks (dict): Ticker symbol -> latest stored date ('YYYY-MM-DD').
+        tickers (list): List of ticker symbols to synchronize.
+        date_to (datetime): Last date to synchronize (inclusive).
+
+    Returns:
+        tuple:
+            - dict: Ticker symbol -> start date in 'DD MMM YYYY' format, for tickers that need data.
+            - list: Tickers that are already up to date.
+    """
+    date_ranges = {}
+    up_to_date = []
+    for ticker in tickers:
+        latest_date = watermarks.get(ticker)
+        if latest_date is None:
+            # Define a default start date if no records exist
+            date_ranges[ticker] = DEFAULT_HISTORY_START
+            continue
+        next_date = datetime.strptime(latest_date, "%Y-%m-%d") + timedelta(days=1)
+        if next_date.date() > date_to.date():
+            up_to_date.append(ticker)
+        else:
+            date_ranges[ticker] = next_date.strftime("%d %b %Y")
+    return date_ranges, up_to_date
+
+
+def get_market_watch_daily_bars(conn, date):
+    """
+    Builds Ticker rows for the given date from the current MarketWatch snapshot.
+    Symbols without trades (no volume) or without prices are skipped.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+        date (str): The trading date of the snapshot in 'YYYY-MM-DD' format.
+
+    Returns:
+        dict: Ticker symbol -> (Ticker, Date, Open, High, Low, Close, Change, Change (%), Volume) tuple.
+    """
+    try:
+        cursor = conn.cursor()
+        # A symbol appears once per index it is listed in; the price fields are identical across those rows
+        cursor.execute("""
+            SELECT SYMBOL, MAX(OPEN), MAX(HIGH), MAX(LOW), MAX(CURRENT), MAX(CHANGE), MAX("CHANGE (%)"), MAX(VOLUME)
+            FROM MarketWatch
+            WHERE "LISTED IN" != 'DEFAULT'
+            GROUP BY SYMBOL;
+        """)
+        bars = {}
+        for symbol, open_, high, low, close, change, change_p, volume in cursor.fetchall():
+            if open_ and high and low and close and volume:
+                bars[symbol] = (
+                    symbol, date, round(open_, 2), round(high, 2), round(low, 2), round(close, 2),
+                    round(change or 0, 2), round(change_p or 0, 2), int(volume)
+                )
+        logging.info(f"Built {len(bars)} daily bars for {date} from the MarketWatch snapshot.")
+        return bars
+    except sqlite3.Error as e:
+        logging.error(f"Failed to build daily bars from MarketWatch: {e}")
+        return {}
+
+
+def insert_daily_bars(conn, bars, commit=True):
+    """
+    Inserts one daily bar per ticker in a single transaction and advances their watermarks.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+        bars (list): List of Ticker row tuples, at most one per ticker.
+        commit (bool): Commit after inserting. Pass False when the caller owns the transaction.
+
+    Returns:
+        tuple: (success, records_added)
+
+    Raises:
+        sqlite3.Error: If commit is False, so the caller can roll back the bars already inserted.
+    """
+    try:
+        cursor = conn.cursor()
+        records_added = 0
+        for bar in bars:
+            cursor.execute("""
+                INSERT OR IGNORE INTO Ticker 
+                (Ticker, Date, Open, High, Low, Close, Change, "Change (%)", Volume) 
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);
+            """, bar)
+            if cursor.rowcount:
+                records_added += 1
+                update_ticker_watermark(cursor, bar[0], bar[1], 1)
+        if commit:
+            conn.commit()
+        logging.info(f"Inserted {records_added} daily bars from the MarketWatch snapshot.")
+        return True, records_added
+    except sqlite3.Error as e:
+        logging.error(f"Failed to insert daily bars from MarketWatch: {e}")
+        if not commit:
+            # The caller owns the transaction and must roll this job back
+            raise
+        conn.rollback()
+        return False, 0
+
+
+def is_final_snapshot_date(sync_date, now=None):
+    """
+    Checks whether today's MarketWatch snapshot holds the final bar of sync_date: sync_date is
+    today in Karachi and the market has closed.
+
+    Args:
+        sync_date (datetime): Date being synchronized.
+        now (datetime): Current time, timezone-aware; defaults to the current time.
+
+    Returns:
+        bool: True if the snapshot can be stored as the daily bar of sync_date.
+    """
+    market_now = (now or datetime.now(MARKET_TIMEZONE)).astimezone(MARKET_TIMEZONE)
+    return sync_date.date() == market_now.date() and market_now.time() >= MARKET_CLOSE_TIME
+
+
+def split_fast_eod_tickers(watermarks, bars, tickers, sync_date):
+    """
+    Splits tickers into those whose bar for sync_date can be taken from the MarketWatch snapshot
+    and those that have a gap before sync_date and need the per-ticker history API.
+
+    Args:
+        watermarks (dict): Ticker symbol -> latest stored date ('YYYY-MM-DD').
+        bars (dict): Ticker symbol -> snapshot bar for sync_date.
+        tickers (list): List of ticker symbols to synchronize.
+        sync_date (datetime): Date of the snapshot.
+
+    Returns:
+        tuple:
+            - list: Snapshot bars to insert directly.
+            - list: Tickers that still need the history API.
+    """
+    previous_day = get_previous_trading_day(sync_date).strftime("%Y-%m-%d")
+    snapshot_bars = []
+    fallback = []
+    for ticker in tickers:
+        latest_date = watermarks.get(ticker)
+        if ticker in bars and latest_date is not None and latest_date >= previous_day:
+            snapshot_bars.append(bars[ticker])
+        else:
+            fallback.append(ticker)
+    return snapshot_bars, fallback
+
+
 async def synchronize_tickers_async(conn, tickers, summary, progress_callback=None):
     """
-    Asynchronously synchronizes tickers.
+    Asynchronously synchronizes tickers, requesting only the range after each ticker's watermark.
 
     Args:
         conn (sqlite3.Connection): SQLite database connection.
@@ -156,54 +458,36 @@ async def synchronize_tickers_async(conn, tickers, summary, progress_callback=No
         summary (dict): Summary dictionary to update.
         progress_callback (callable): Optional callback to update progress.
     """
-    total_tickers = len(tickers)
-    data_total_added = 0
-    errors = []
-
-    async with aiohttp.ClientSession() as session:
-        tasks = []
-        for idx, ticker in enumerate(tickers, start=1):
-            latest_date = get_latest_date_for_ticker(conn, ticker)
-            # Convert latest_date to 'DD MMM YYYY' format
-            if latest_date:
-                latest_date_obj = datetime.strptime(latest_date, "%Y-%m-%d")
-                date_from = latest_date_obj.strftime("%d %b %Y")
-            else:
-                # Define a default start date if no records exist
-                date_from = "01 Jan 2000"
-            date_to = datetime.today().strftime("%d %b %Y")
+    date_to = datetime.today()
+    date_ranges, up_to_date = get_incremental_date_ranges(get_ticker_watermarks(conn), tickers, date_to)
+    engine = get_default_engine()
 
-            task = asyncio.ensure_future(
-                async_get_stock_data(session, ticker, date_from, date_to)
-            )
-            tasks.append((ticker, task, idx, total_tickers))
-
-        for ticker, task, idx, total in tasks:
-            data = await task
-            if data:
-                # Insert data into the database using a ThreadPoolExecutor to avoid blocking
-                loop = asyncio.get_event_loop()
-                with ThreadPoolExecutor() as pool:
-                    success, records_added = await loop.run_in_executor(
-                        pool, insert_ticker_data_into_db, conn, data, ticker
-                    )
-                if success:
-                    data_total_added += records_added
-                    logging.info(f"Added {records_added} new records for ticker '{ticker}'.")
-                else:
-                    error_msg = f"Failed to insert data for ticker '{ticker}'."
-                    errors.append(error_msg)
-                    logging.error(error_msg)
-            else:
-                logging.info(f"No new data fetched for ticker '{ticker}'.")
+    async def fetch(session, ticker):
+        return await async_get_stock_data(session, ticker, date_ranges[ticker], date_to.strftime("%d %b %Y"), engine=engine)
+
+    def write(rows, ticker):
+        return insert_ticker_rows(conn, rows, ticker)
 
-            # Update progress if callback is provided
-            if progress_callback:
-                progress_callback(idx, total)
+    def on_progress(completed, total, ticker):
+        if progress_callback:
+            progress_callback(completed, total)
 
+    engine.stats.start()
+    result = await run_pipeline(
+        list(date_ranges), fetch, normalize_ticker_records, write,
+        fetch_workers=engine.max_concurrency, progress_callback=on_progress
+    )
+    engine.stats.finish()
+
+    data_total_added = result['records_added']
+    errors = engine.stats.errors + result['errors']
     summary['tickers']['success'] = True
     summary['tickers']['records_added'] = data_total_added
-    summary['tickers']['message'] = f"Successfully synchronized tickers with {data_total_added} new records added."
+    summary['tickers']['fetch_stats'] = engine.stats.as_dict()
+    summary['tickers']['message'] = (
+        f"Successfully synchronized tickers with {data_total_added} new records added "
+        f"({len(up_to_date)} tickers already up to date)."
+    )
     if errors:
         summary['tickers']['message'] += f" Encountered errors with {len(errors)} tickers."
         summary['tickers']['errors'] = errors
@@ -211,229 +495,380 @@ async def synchronize_tickers_async(conn, tickers, summary, progress_callback=No
 
 
 
-    
-    
 # utils/db_manager.py
-def insert_ticker_data_into_db(conn, data, ticker, batch_size=100):
+INSERT_TICKER_QUERY = """
+    INSERT OR IGNORE INTO Ticker 
+    (Ticker, Date, Open, High, Low, Close, Change, "Change (%)", Volume) 
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);
+"""
+
+
+def normalize_ticker_records(data, ticker):
     """
-    Inserts the list of stock data into the SQLite database in batches.
-    Returns a tuple of (success, records_added).
+    Parses raw Investors Lounge records into rows ready for insertion into the Ticker table.
+    The whole response is normalized column-wise with pandas instead of record by record.
+    Records with an invalid date, missing fields or a zero price/volume are dropped.
+
+    Args:
+        data (list): List of raw stock data dictionaries.
+        ticker (str): The stock ticker symbol.
+
+    Returns:
+        list: List of (Ticker, Date, Open, High, Low, Close, Change, Change (%), Volume) tuples.
+    """
+    if not data:
+        return []
+
+    df = pd.DataFrame.from_records(data)
+
+    def column(*names):
+        # First available column among the API's alternative field names
+        values = None
+        for name in names:
+            if name in df.columns:
+                values = df[name] if values is None else values.combine_first(df[name])
+        return values if values is not None else pd.Series(None, index=df.index, dtype=object)
+
+    # Parse the date part ('YYYY-MM-DD') of 'Date' or 'Date_'
+    dates = column('Date', 'Date_').astype(str).str[:10]
+    valid = pd.to_datetime(dates, format="%Y-%m-%d", errors='coerce').notna()
+
+    numeric = {}
+    for name, source in [('Open', ('Open',)), ('High', ('High',)), ('Low', ('Low',)), ('Close', ('Close',)),
+                         ('Change', ('Change',)), ('Change (%)', ('Change (%)', 'ChangeP', 'change_valueP'))]:
+        numeric[name] = pd.to_numeric(column(*source), errors='coerce').round(2)
+        valid &= numeric[name].notna()
+    volume = pd.to_numeric(column('Volume'), errors='coerce')
+    valid &= volume.notna()
+
+    # Prices and volume must be non-zero, as in the original per-record check
+    for name in ('Open', 'High', 'Low', 'Close'):
+        valid &= numeric[name] != 0
+    valid &= volume != 0
+
+    dropped = len(df) - int(valid.sum())
+    if dropped:
+        logging.warning(f"Dropped {dropped} invalid records for ticker '{ticker}'.")
+
+    rows = list(zip(
+        [ticker] * int(valid.sum()),
+        dates[valid].tolist(),
+        numeric['Open'][valid].tolist(),
+        numeric['High'][valid].tolist(),
+        numeric['Low'][valid].tolist(),
+        numeric['Close'][valid].tolist(),
+        numeric['Change'][valid].tolist(),
+        numeric['Change (%)'][valid].tolist(),
+        volume[valid].astype('int64').tolist(),
+    ))
+
+    # Log how many valid records are ready for insertion
+    logging.info(f"Prepared {len(rows)} valid records for insertion for ticker '{ticker}'.")
+    return rows
+
+
+def insert_ticker_rows(conn, rows, ticker, commit=True):
+    """
+    Inserts already normalized rows into the Ticker table with a single executemany and advances
+    the ticker's watermark in the same transaction. The number of records added is taken from the
+    connection's change counter, so no count scan of the Ticker table is needed.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+        rows (list): Normalized Ticker row tuples.
+        ticker (str): The stock ticker symbol.
+        commit (bool): Commit after inserting. Pass False to batch many tickers into one transaction.
+
+    Returns:
+        tuple: (success, records_added)
+
+    Raises:
+        sqlite3.Error: If commit is False, so the caller can roll back the rows already inserted.
     """
+    if not rows:
+        return True, 0
+
     try:
         cursor = conn.cursor()
-        insert_query = """
-            INSERT OR IGNORE INTO Ticker 
-            (Ticker, Date, Open, High, Low, Close, Change, "Change (%)", Volume) 
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);
-        """
-        
-        # Prepare data for insertion
-        data_to_insert = []
-        for record in data:
-            try:
-                # Parse and reformat the date to 'YYYY-MM-DD'
-                date_raw = record.get('Date', record.get('Date_'))  # Handle both 'Date' and 'Date_'
-                date = datetime.strptime(date_raw[:10], "%Y-%m-%d").strftime("%Y-%m-%d")  # Ensure the correct format
-
-                # Extract and round the numeric fields
-                open_ = round(float(record['Open']), 2)
-                high = round(float(record['High']), 2)
-                low = round(float(record['Low']), 2)
-                close = round(float(record['Close']), 2)
-                change = round(float(record['Change']), 2)
-                change_p = round(float(record.get('Change (%)', record.get('ChangeP', record.get('change_valueP')))), 2)
-                volume = int(record['Volume'])
-
-                if date and open_ and high and low and close and volume:
-                    data_to_insert.append((ticker, date, open_, high, low, close, change, change_p, volume))
-
-            except (ValueError, KeyError) as e:
-                logging.error(f"Error parsing data for ticker '{ticker}', record: {record}, error: {e}")
-                continue
-
-        # Log how many valid records are ready for insertion
-        logging.info(f"Prepared {len(data_to_insert)} valid records for insertion for ticker '{ticker}'.")
-
-        if not data_to_insert:
-            logging.warning(f"No valid data to insert for ticker '{ticker}'.")
-            return True, 0  # Success but no records added
-        
-        # Insert data in batches
-        total_records = len(data_to_insert)
-        records_added = 0
-        for i in range(0, total_records, batch_size):
-            batch = data_to_insert[i:i + batch_size]
-            logging.info(f"Inserting batch {i // batch_size + 1} for ticker '{ticker}' with {len(batch)} records.")
-            cursor.executemany(insert_query, batch)
+        changes_before = conn.total_changes
+        cursor.executemany(INSERT_TICKER_QUERY, rows)
+        records_added = conn.total_changes - changes_before
+        update_ticker_watermark(cursor, ticker, max(row[1] for row in rows), records_added)
+        if commit:
             conn.commit()
-            
-            # Log how many records were added
-            logging.info(f"Batch {i // batch_size + 1} inserted {cursor.rowcount} records (may include ignored records).")
-            records_added += cursor.rowcount
-        
-        # Log the total number of records added for this ticker
-        logging.info(f"Added {records_added} records for ticker '{ticker}'.")
-    
-        # Verify whether records were actually inserted by querying the database
-        cursor.execute("SELECT COUNT(*) FROM Ticker WHERE Ticker = ?;", (ticker,))
-        total_in_db = cursor.fetchone()[0]
-        logging.info(f"Total records in the database for ticker '{ticker}': {total_in_db}")
-    
+
+        logging.info(f"Added {records_added} records for ticker '{ticker}' ({len(rows) - records_added} already present).")
         return True, records_added
 
     except sqlite3.Error as e:
         logging.error(f"Failed to insert data into database for ticker '{ticker}': {e}")
+        if not commit:
+            # The caller owns the transaction and must roll this job back
+            raise
+        conn.rollback()
         return False, 0
 
 
-def insert_market_watch_data_into_db(conn, batch_size=100):
+def bulk_insert_ticker_data(conn, data_by_ticker):
     """
-    Deletes old market watch data and inserts or updates new market watch data into the SQLite database in batches.
-    Fetches data for the specified date and ensures the database has the latest information, including defaulter status
-    and PSX constituent information.
+    Normalizes and inserts raw data for many tickers in one transaction.
 
     Args:
         conn (sqlite3.Connection): SQLite database connection.
-        batch_size (int): Number of records to insert per batch.
+        data_by_ticker (dict): Ticker symbol -> list of raw stock data dictionaries.
 
     Returns:
-        tuple: (success, records_added) where 'success' is a boolean and 'records_added' is the count of records inserted/updated.
+        tuple: (success, records_added, added_by_ticker) where added_by_ticker maps each ticker to its new rows.
     """
+    added_by_ticker = {}
     try:
-        import logging
-        from datetime import datetime
+        for ticker, data in data_by_ticker.items():
+            rows = normalize_ticker_records(data, ticker) if data else []
+            success, records_added = insert_ticker_rows(conn, rows, ticker, commit=False)
+            if not success:
+                raise sqlite3.DatabaseError(f"Insert failed for ticker '{ticker}'")
+            added_by_ticker[ticker] = records_added
+        conn.commit()
+    except sqlite3.Error as e:
+        conn.rollback()
+        logging.error(f"Bulk ticker insert failed and was rolled back: {e}")
+        return False, 0, {}
 
-        cursor = conn.cursor()
+    records_added = sum(added_by_ticker.values())
+    logging.info(f"Bulk inserted {records_added} records for {len(added_by_ticker)} tickers.")
+    return True, records_added, added_by_ticker
 
-        # ---- Step 1: Delete Previous Data ---- #
-        logger.info("Deleting previous MarketWatch data...")
-        cursor.execute("DELETE FROM MarketWatch")
-        conn.commit()
-        logger.info("Previous MarketWatch data deleted.")
 
-        # ---- Step 2: Fetch Market Watch Data ---- #
-        logger.info("Fetching market watch data...")
-        market_data = fetch_kse_market_watch()
+def insert_ticker_data_into_db(conn, data, ticker):
+    """
+    Inserts the list of stock data into the SQLite database.
+    Returns a tuple of (success, records_added).
+    """
+    data_to_insert = normalize_ticker_records(data, ticker)
 
-        if not market_data:
-            logger.error("Failed to fetch market watch data.")
-            return False, 0
-        else:
-            logger.info(f"Fetched {len(market_data)} market watch records.")
+    if not data_to_insert:
+        logging.warning(f"No valid data to insert for ticker '{ticker}'.")
+        return True, 0  # Success but no records added
 
-        # ---- Step 3: Fetch Defaulters Data ---- #
-        logger.info("Fetching defaulters data...")
-        defaulters_data = get_defaulters_list()
-        defaulters_dict = {d['SYMBOL']: d for d in defaulters_data}
-
-        # ---- Step 4: Fetch PSX Constituents Data ---- #
-        date = datetime.today().strftime('%Y-%m-%d')
-        logger.info(f"Fetching PSX constituents data for date: {date}...")
-        psx_data = fetch_psx_constituents()
-        psx_constituents_dict = {d['SYMBOL']: d for d in psx_data}
-
-        # ---- Step 5: Merge and Prepare Data for Insertion ---- #
-        data_to_insert = []
-        for record in market_data:
-            try:
-                symbol = record.get('SYMBOL')
-                sector = record.get('SECTOR')
-                listed_in = record.get('LISTED IN')  # This will be split into multiple rows
-                ldcp = round(float(record['LDCP']), 2) if record.get('LDCP') else None
-                open_ = round(float(record['OPEN']), 2) if record.get('OPEN') else None
-                high = round(float(record['HIGH']), 2) if record.get('HIGH') else None
-                low = round(float(record['LOW']), 2) if record.get('LOW') else None
-                current = round(float(record['CURRENT']), 2) if record.get('CURRENT') else None
-                change = round(float(record['CHANGE']), 2) if record.get('CHANGE') else None
-                change_p = round(float(record['CHANGE (%)']), 2) if record.get('CHANGE (%)') else None
-                volume = int(record['VOLUME']) if record.get('VOLUME') else None
-                defaulter = defaulters_dict.get(symbol, {}).get('DEFAULTING CLAUSE', None) is not None
-                defaulting_clause = defaulters_dict.get(symbol, {}).get('DEFAULTING CLAUSE', None)
-
-                # Fetch PSX constituent data
-                psx_record = psx_constituents_dict.get(symbol, {})
-                price = psx_record.get('PRICE')
-                idx_wt = psx_record.get('IDX_WT')
-                ff_based_shares = psx_record.get('FF_BASED_SHARES')
-                ff_based_mcap = psx_record.get('FF_BASED_MCAP')
-                ord_shares = psx_record.get('ORD_SHARES')
-                ord_shares_mcap = psx_record.get('ORD_SHARES_MCAP')
-
-                # Split the "LISTED IN" field by comma and insert one row per index
-                listed_indices = listed_in.split(',') if listed_in else []
-                for index in listed_indices:
-                    index = index.strip()  # Remove any extra whitespace
-                    data_to_insert.append((
-                        symbol, sector, index, ldcp, open_, high, low, 
-                        current, change, change_p, volume, defaulter, 
-                        defaulting_clause, price, idx_wt, ff_based_shares, 
-                        ff_based_mcap, ord_shares, ord_shares_mcap
-                    ))
+    return insert_ticker_rows(conn, data_to_insert, ticker)
 
-            except (ValueError, KeyError) as e:
-                logger.error(f"Error parsing market watch data record: {record}, error: {e}")
-                continue
-
-        # Insert a new row with "DEFAULT" for symbols in defaulters but not in market_data
-        for symbol, defaulter in defaulters_dict.items():
-            if symbol not in [record.get('SYMBOL') for record in market_data]:
-                data_to_insert.append((
-                    symbol, None, "DEFAULT", None, None, None, None, None, 
-                    None, None, None, True, defaulter['DEFAULTING CLAUSE'], 
-                    None, None, None, None, None, None
-                ))
-
-        # ---- Step 6: Insert Data in Batches ---- #
-        insert_query = """
-            INSERT INTO MarketWatch 
-            (SYMBOL, SECTOR, "LISTED IN", LDCP, OPEN, HIGH, LOW, CURRENT, 
-             CHANGE, "CHANGE (%)", VOLUME, DEFAULTER, DEFAULTING_CLAUSE, 
-             PRICE, IDX_WT, FF_BASED_SHARES, FF_BASED_MCAP, ORD_SHARES, ORD_SHARES_MCAP)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(SYMBOL, SECTOR, "LISTED IN") 
-            DO UPDATE SET 
-                LDCP = excluded.LDCP,
-                OPEN = excluded.OPEN,
-                HIGH = excluded.HIGH,
-                LOW = excluded.LOW,
-                CURRENT = excluded.CURRENT,
-                CHANGE = excluded.CHANGE,
-                "CHANGE (%)" = excluded."CHANGE (%)",
-                VOLUME = excluded.VOLUME,
-                DEFAULTER = excluded.DEFAULTER,
-                DEFAULTING_CLAUSE = excluded.DEFAULTING_CLAUSE,
-                PRICE = excluded.PRICE,
-                IDX_WT = excluded.IDX_WT,
-                FF_BASED_SHARES = excluded.FF_BASED_SHARES,
-                FF_BASED_MCAP = excluded.FF_BASED_MCAP,
-                ORD_SHARES = excluded.ORD_SHARES,
-                ORD_SHARES_MCAP = excluded.ORD_SHARES_MCAP;
-        """
 
-        total_records = len(data_to_insert)
-        records_added = 0
+MARKET_WATCH_COLUMNS = (
+    'SYMBOL', 'SECTOR', '"LISTED IN"', 'LDCP', 'OPEN', 'HIGH', 'LOW', 'CURRENT',
+    'CHANGE', '"CHANGE (%)"', 'VOLUME', 'DEFAULTER', 'DEFAULTING_CLAUSE',
+    'PRICE', 'IDX_WT', 'FF_BASED_SHARES', 'FF_BASED_MCAP', 'ORD_SHARES', 'ORD_SHARES_MCAP'
+)
+MARKET_WATCH_KEY_SIZE = 3  # SYMBOL, SECTOR, "LISTED IN"
 
-        for i in range(0, total_records, batch_size):
-            batch = data_to_insert[i:i + batch_size]
-            logger.info(f"Inserting batch {i // batch_size + 1} with {len(batch)} records.")
-            cursor.executemany(insert_query, batch)
-            conn.commit()
 
-            # Count records added or updated
-            records_added += cursor.rowcount
+def create_market_watch_history_table(conn):
+    """
+    Creates the MarketWatchHistory table holding compact intraday quote snapshots.
+    Only symbols whose quote changed are appended per snapshot, so the quote of a symbol at time T
+    is its most recent row with Snapshot_Time <= T.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS MarketWatchHistory (
+            Snapshot_Time TEXT,
+            SYMBOL TEXT,
+            LDCP REAL,
+            OPEN REAL,
+            HIGH REAL,
+            LOW REAL,
+            CURRENT REAL,
+            VOLUME INTEGER,
+            PRIMARY KEY (SYMBOL, Snapshot_Time)
+        ) WITHOUT ROWID;
+    """)
+    conn.commit()
 
-        logger.info(f"Successfully inserted/updated {records_added} records for market watch data.")
 
-        # ---- Step 7: Confirm Database Status ---- #
-        cursor.execute("SELECT COUNT(*) FROM MarketWatch;")
-        total_in_db = cursor.fetchone()[0]
-        logger.info(f"Total records in the MarketWatch table: {total_in_db}")
+def fetch_market_watch_sources():
+    """
+    Fetches the market watch, defaulters and PSX constituents sources concurrently.
 
-        return True, records_added
+    Returns:
+        tuple: (market_data, defaulters_data, psx_data) lists of dictionaries.
+    """
+    logger.info("Fetching market watch, defaulters and PSX constituents data...")
+    return asyncio.run(fetch_market_watch_sources_async())
+
+
+def prepare_market_watch_snapshot():
+    """
+    Fetches all market watch sources and merges them into MarketWatch rows without touching the database.
+
+    Returns:
+        dict: Snapshot rows as returned by build_market_watch_rows, or None if the market watch fetch failed.
+    """
+    market_data, defaulters_data, psx_data = fetch_market_watch_sources()
+    if not market_data:
+        logger.error("Failed to fetch market watch data.")
+        return None
+    logger.info(f"Fetched {len(market_data)} market watch records.")
+    return build_market_watch_rows(market_data, defaulters_data, psx_data)
+
+
+def build_market_watch_rows(market_data, defaulters_data, psx_data):
+    """
+    Merges the market watch, defaulters and PSX constituents sources into MarketWatch rows.
+
+    Args:
+        market_data (list): Market watch records from fetch_kse_market_watch.
+        defaulters_data (list): Defaulter records from get_defaulters_list.
+        psx_data (list): Constituent records from fetch_psx_constituents.
+
+    Returns:
+        dict: Maps (SYMBOL, SECTOR, "LISTED IN") to a row tuple in MARKET_WATCH_COLUMNS order.
+    """
+    defaulters_dict = {d['SYMBOL']: d for d in defaulters_data or []}
+    # Empty Excel cells come through as NaN, which SQLite stores as NULL; use None so rows diff equal
+    psx_constituents_dict = {
+        d['SYMBOL']: {k: (None if pd.isna(v) else v) for k, v in d.items()} for d in psx_data or []
+    }
+
+    rows = {}
+    for record in market_data:
+        try:
+            symbol = record.get('SYMBOL')
+            sector = record.get('SECTOR')
+            listed_in = record.get('LISTED IN')  # This will be split into multiple rows
+            ldcp = round(float(record['LDCP']), 2) if record.get('LDCP') else None
+            open_ = round(float(record['OPEN']), 2) if record.get('OPEN') else None
+            high = round(float(record['HIGH']), 2) if record.get('HIGH') else None
+            low = round(float(record['LOW']), 2) if record.get('LOW') else None
+            current = round(float(record['CURRENT']), 2) if record.get('CURRENT') else None
+            change = round(float(record['CHANGE']), 2) if record.get('CHANGE') else None
+            change_p = round(float(record['CHANGE (%)']), 2) if record.get('CHANGE (%)') else None
+            volume = int(record['VOLUME']) if record.get('VOLUME') else None
+            defaulting_clause = defaulters_dict.get(symbol, {}).get('DEFAULTING CLAUSE', None)
+            defaulter = defaulting_clause is not None
+
+            # Fetch PSX constituent data
+            psx_record = psx_constituents_dict.get(symbol, {})
+            price = psx_record.get('PRICE')
+            idx_wt = psx_record.get('IDX_WT')
+            ff_based_shares = psx_record.get('FF_BASED_SHARES')
+            ff_based_mcap = psx_record.get('FF_BASED_MCAP')
+            ord_shares = psx_record.get('ORD_SHARES')
+            ord_shares_mcap = psx_record.get('ORD_SHARES_MCAP')
+
+            # Split the "LISTED IN" field by comma and insert one row per index
+            listed_indices = listed_in.split(',') if listed_in else []
+            for index in listed_indices:
+                index = index.strip()  # Remove any extra whitespace
+                rows[(symbol, sector, index)] = (
+                    symbol, sector, index, ldcp, open_, high, low,
+                    current, change, change_p, volume, defaulter,
+                    defaulting_clause, price, idx_wt, ff_based_shares,
+                    ff_based_mcap, ord_shares, ord_shares_mcap
+                )
+
+        except (ValueError, KeyError) as e:
+            logger.error(f"Error parsing market watch data record: {record}, error: {e}")
+            continue
+
+    # Insert a new row with "DEFAULT" for symbols in defaulters but not in market_data
+    market_symbols = {record.get('SYMBOL') for record in market_data}
+    for symbol, defaulter in defaulters_dict.items():
+        if symbol not in market_symbols:
+            rows[(symbol, None, "DEFAULT")] = (
+                symbol, None, "DEFAULT", None, None, None, None, None,
+                None, None, None, True, defaulter['DEFAULTING CLAUSE'],
+                None, None, None, None, None, None
+            )
+
+    return rows
+
+
+def apply_market_watch_snapshot(conn, rows, snapshot_time=None, commit=True):
+    """
+    Applies a MarketWatch snapshot as a diff against the stored table in a single transaction:
+    new and changed rows are replaced, rows missing from the snapshot are removed and unchanged rows
+    are not touched. Symbols whose quote changed are appended to MarketWatchHistory.
+    Readers keep seeing the previous snapshot until the transaction commits.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+        rows (dict): Snapshot rows as returned by build_market_watch_rows.
+        snapshot_time (str): Snapshot timestamp 'YYYY-MM-DD HH:MM:SS'. Defaults to now.
+        commit (bool): Commit after writing. Pass False when the caller owns the transaction.
+
+    Returns:
+        tuple: (success, records_changed) where 'records_changed' counts inserted, updated and removed rows.
+
+    Raises:
+        sqlite3.Error: If commit is False, so the caller rolls back the whole diff and readers never
+            see a partially applied snapshot.
+    """
+    if snapshot_time is None:
+        snapshot_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    columns = ', '.join(MARKET_WATCH_COLUMNS)
+    placeholders = ', '.join('?' * len(MARKET_WATCH_COLUMNS))
 
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT {columns} FROM MarketWatch;")
+        stored = {row[:MARKET_WATCH_KEY_SIZE]: row for row in cursor.fetchall()}
+
+        changed = [row for key, row in rows.items() if stored.get(key) != row]
+        removed = [key for key in stored if key not in rows]
+
+        # SECTOR is NULL for "DEFAULT" rows, which ON CONFLICT would never match; delete with IS and re-insert
+        delete_query = 'DELETE FROM MarketWatch WHERE SYMBOL IS ? AND SECTOR IS ? AND "LISTED IN" IS ?;'
+        cursor.executemany(delete_query, removed + [row[:MARKET_WATCH_KEY_SIZE] for row in changed])
+        cursor.executemany(f"INSERT INTO MarketWatch ({columns}) VALUES ({placeholders});", changed)
+
+        # One history row per symbol (prices are repeated for every index a symbol is listed in)
+        history = {}
+        for row in changed:
+            if row[2] != "DEFAULT":
+                history[row[0]] = (snapshot_time, row[0], row[3], row[4], row[5], row[6], row[7], row[10])
+        cursor.executemany("""
+            INSERT OR REPLACE INTO MarketWatchHistory
+            (Snapshot_Time, SYMBOL, LDCP, OPEN, HIGH, LOW, CURRENT, VOLUME)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?);
+        """, list(history.values()))
+
+        if commit:
+            conn.commit()
     except sqlite3.Error as e:
-        logger.error(f"Failed to insert market watch data into database: {e}")
+        logger.error(f"Failed to apply market watch snapshot: {e}")
+        if not commit:
+            # The caller owns the transaction and must roll back the rows already deleted
+            raise
+        conn.rollback()
+        return False, 0
+
+    records_changed = len(changed) + len(removed)
+    logger.info(
+        f"Market watch snapshot applied: {len(changed)} rows inserted/updated, {len(removed)} removed, "
+        f"{len(rows) - len(changed)} unchanged; {len(history)} symbols appended to history."
+    )
+    return True, records_changed
+
+
+def insert_market_watch_data_into_db(conn, commit=True):
+    """
+    Fetches the latest market watch data, including defaulter status and PSX constituent information,
+    and applies it to the MarketWatch table as an atomic diff. Nothing is written until all sources
+    have been fetched and merged, so the table is never empty while the fetches are in flight.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+        commit (bool): Commit after writing. Pass False when the caller owns the transaction.
+
+    Returns:
+        tuple: (success, records_added) where 'success' is a boolean and 'records_added' is the count of records inserted/updated/removed.
+    """
+    rows = prepare_market_watch_snapshot()
+    if rows is None:
         return False, 0
+    return apply_market_watch_snapshot(conn, rows, commit=commit)
 
 
 
@@ -689,21 +1124,28 @@ def merge_data(market_data, listings_data, defaulters_data):
 
 
 
-def insert_off_market_transaction_data(conn, data, transaction_type):
+def insert_off_market_transaction_data(conn, data, transaction_type, commit=True):
     """
     Inserts the off-market transaction data into the SQLite database.
-    Ensures no duplication by using 'INSERT OR IGNORE'.
+    Ensures no duplication by using 'INSERT OR IGNORE'. The DataFrame is converted to typed tuples
+    column-wise and written with a single executemany in one transaction.
     
     Args:
         conn: SQLite database connection object.
         data: DataFrame containing the transaction data to insert.
         transaction_type: Type of the transaction ('B2B', 'I2I', etc.)
+        commit: Commit after inserting. Pass False when the caller owns the transaction.
+
+    Returns:
+        tuple: (success, records_added, records_ignored) where records_ignored counts rows that were
+               already present in the table.
+
+    Raises:
+        sqlite3.Error: If commit is False, so the caller can roll back the rows already inserted.
     """
     if data is None or data.empty:
         logging.warning("No transaction data to insert.")
-        return
-
-    cursor = conn.cursor()
+        return True, 0, 0
 
     # Insert query without 'Buyer Name' and 'Seller Name'
     insert_query = """
@@ -714,50 +1156,53 @@ def insert_off_market_transaction_data(conn, data, transaction_type):
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?);
     """
 
-    logging.info(f"Starting insertion of {len(data)} records into the Transactions table.")
-    records_added = 0
-    for _, row in data.iterrows():
-        try:
-            cursor.execute(insert_query, (
-                row['Date'], 
-                row['Settlement Date'], 
-                row['Buyer Code'], 
-                row['Seller Code'], 
-                row['Symbol Code'], 
-                row['Company'], 
-                int(row['Turnover']), 
-                float(row['Rate']), 
-                float(row['Value']), 
-                row['Transaction_Type']
-            ))
-            records_added += cursor.rowcount
-        except sqlite3.Error as e:
-            logging.error(f"Failed to insert row: {row.to_dict()}, Error: {e}")
-            continue
-        except Exception as e:
-            logging.error(f"Unexpected error for row: {row.to_dict()}, Error: {e}")
-            continue
-
-    conn.commit()
-    logging.info(f"Inserted {records_added} records of '{transaction_type}' into the database.")
-
-    # Debug: Print the structure of the Transactions table
-    logging.info("Fetching table structure for 'Transactions'...")
-    cursor.execute("PRAGMA table_info(Transactions);")
-    columns = cursor.fetchall()
-    logging.info(f"Transactions Table Structure: {columns}")
+    def numeric(column):
+        return pd.to_numeric(data[column].astype(str).str.replace(',', '', regex=False), errors='coerce')
+
+    turnover = numeric('Turnover')
+    rate = numeric('Rate')
+    value = numeric('Value')
+    valid = turnover.notna() & rate.notna() & value.notna()
+    if not valid.all():
+        logging.error(f"Skipping {int((~valid).sum())} transaction rows with non-numeric Turnover, Rate or Value.")
+
+    def text(column):
+        # Object dtype with None for missing values, so SQLite stores NULL
+        values = data.loc[valid, column]
+        return values.astype(object).where(values.notna(), None).tolist()
+
+    rows = list(zip(
+        text('Date'),
+        text('Settlement Date'),
+        text('Buyer Code'),
+        text('Seller Code'),
+        text('Symbol Code'),
+        text('Company'),
+        turnover[valid].astype('int64').tolist(),
+        rate[valid].astype(float).tolist(),
+        value[valid].astype(float).tolist(),
+        text('Transaction_Type'),
+    ))
+
+    logging.info(f"Starting insertion of {len(rows)} records into the Transactions table.")
+    try:
+        cursor = conn.cursor()
+        changes_before = conn.total_changes
+        cursor.executemany(insert_query, rows)
+        records_added = conn.total_changes - changes_before
+        if commit:
+            conn.commit()
+    except sqlite3.Error as e:
+        logging.error(f"Failed to insert '{transaction_type}' transactions: {e}")
+        if not commit:
+            # The caller owns the transaction and must roll this job back
+            raise
+        conn.rollback()
+        return False, 0, 0
 
-    # Debug: Fetch and log the content of the Transactions table after insertion
-    logging.info("Fetching all data from 'Transactions' table to verify insertion...")
-    cursor.execute("SELECT * FROM Transactions;")
-    rows = cursor.fetchall()
-
-    if rows:
-        logging.info(f"Data in 'Transactions' table after insertion ({len(rows)} rows):")
-        for row in rows[:5]:  # Print first 5 rows for brevity
-            logging.info(row)
-    else:
-        logging.error("No data found in the 'Transactions' table after insertion.")
+    records_ignored = len(rows) - records_added
+    logging.info(f"Inserted {records_added} records of '{transaction_type}' into the database ({records_ignored} already present).")
+    return True, records_added, records_ignored
 
 
 
@@ -984,13 +1429,14 @@ def get_portfolio_by_name(conn, name):
 
 
 # ---- Insert PSX Data into the Table ---- #
-def insert_psx_constituents(conn, psx_data):
+def insert_psx_constituents(conn, psx_data, commit=True):
     """
     Inserts or updates PSX constituents data into the database.
 
     Args:
         conn (sqlite3.Connection): SQLite connection object.
         psx_data (list): A list of dictionaries containing PSX constituent data.
+        commit (bool): Commit after inserting. Pass False when the caller owns the transaction.
     """
     cursor = conn.cursor()
     insert_query = """
@@ -1025,7 +1471,8 @@ def insert_psx_constituents(conn, psx_data):
             record['VOLUME']
         ))
     
-    conn.commit()
+    if commit:
+        conn.commit()
 
 # ---- Search PSX Constituents by Name ---- #
 def search_psx_constituents_by_name(conn, company_name):
@@ -1111,7 +1558,58 @@ def get_unique_tickers_from_db(conn):
         return []
 
 
-def synchronize_database(conn, date, progress_bar=None, status_text=None):
+TICKER_PANEL_COLUMNS = ["Ticker", "Date", "Open", "High", "Low", "Close", "Volume"]
+
+
+def get_ticker_panel(conn, tickers, start_date, end_date, include_dates=True):
+    """
+    Loads the daily bars of many tickers with a single query. Bars with a missing Change or
+    "Change (%)" are skipped, as the analysis drops them anyway.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+        tickers (list): Ticker symbols to load.
+        start_date (str): First date in 'YYYY-MM-DD' format (inclusive).
+        end_date (str): Last date in 'YYYY-MM-DD' format (inclusive).
+        include_dates (bool): Include the Date column ('YYYY-MM-DD' text). Screening the whole
+            universe does not need it, and skipping it saves a string object per row.
+
+    Returns:
+        pd.DataFrame: One row per ticker and date, sorted by Ticker then Date. Empty on error.
+    """
+    columns = TICKER_PANEL_COLUMNS if include_dates else [column for column in TICKER_PANEL_COLUMNS if column != "Date"]
+    # The ticker list is bound as one JSON parameter, so any universe size fits in one statement
+    query = f"""
+        SELECT {', '.join(columns)}
+        FROM Ticker
+        WHERE Ticker IN (SELECT value FROM json_each(?)) AND Date BETWEEN ? AND ?
+          AND Change IS NOT NULL AND "Change (%)" IS NOT NULL
+        ORDER BY Ticker, Date;
+    """
+    try:
+        cursor = conn.cursor()
+        cursor.execute(query, (json.dumps(list(tickers)), start_date, end_date))
+        return pd.DataFrame.from_records(cursor.fetchall(), columns=columns)
+    except sqlite3.Error as e:
+        logging.error(f"Failed to load the ticker panel: {e}")
+        return pd.DataFrame(columns=columns)
+
+
+def get_database_path(conn):
+    """
+    Returns the file path of the connection's main database, or None for an in-memory database.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection.
+    """
+    for _, name, path in conn.execute("PRAGMA database_list;").fetchall():
+        if name == 'main':
+            return path or None
+    return None
+
+
+def synchronize_database(conn, date, progress_bar=None, status_text=None, mode=SYNC_MODE_INCREMENTAL, engine=None,
+                         write_lock=None):
     """
     Synchronizes the database by performing the following tasks:
     1. Inserts or updates Market Watch data.
@@ -1123,25 +1621,52 @@ def synchronize_database(conn, date, progress_bar=None, status_text=None):
         date (str): The date for which to synchronize data in 'YYYY-MM-DD' format.
         progress_bar (streamlit.progress): Streamlit progress bar object.
         status_text (streamlit.empty): Streamlit empty object for status updates.
+        mode (str): Ticker sync mode, one of SYNC_MODES. 'incremental' only requests the range after
+            each ticker's watermark, 'full' re-requests the whole history and 'fast_eod' takes today's
+            bar from the MarketWatch snapshot, using the history API only for tickers with gaps.
+        engine (FetchEngine): Optional fetch engine for the ticker downloads (e.g. with benchmark rate limits).
+        write_lock (threading.RLock): Lock held around every write batch, normally
+            ConnectionManager.writer_lock, so the sync does not interleave with the app's other writes.
+            The caller must not hold it while the sync runs.
 
     Returns:
-        dict: Summary of synchronization results with detailed messages.
+        dict: Summary of synchronization results with detailed messages. 'timings' holds the wall time
+            in seconds of each stage.
     """
     summary = {
         'market_watch': {'success': False, 'records_added': 0, 'message': ''},
-        'tickers': {'success': False, 'records_added': 0, 'message': '', 'errors': []},
-        'psx_transactions': {'success': False, 'records_added': 0, 'message': ''}
+        'tickers': {'success': False, 'records_added': 0, 'message': '', 'errors': [], 'fetch_stats': {}},
+        'psx_transactions': {'success': False, 'records_added': 0, 'message': ''},
+        'timings': {}
     }
+    timings = summary['timings']
+    sync_started_at = perf_counter()
+
+    # All writes go through one background writer thread that coalesces them into larger transactions.
+    # An in-memory database cannot be opened by a second connection, so it is written inline instead.
+    db_path = get_database_path(conn)
+    writer = DatabaseWriter(db_path, lock=write_lock).start() if db_path else None
+
+    def write_job(fn, *args, **kwargs):
+        if writer is None:
+            return fn(conn, *args, **kwargs)
+        return writer.submit(fn, *args, **kwargs).result()
 
     try:
         # ---- Task 1: Insert/Update Market Watch Data ---- #
+        task_started_at = perf_counter()
         try:
             logging.info("Starting synchronization: Inserting/Updating Market Watch data.")
-            success, records_added = insert_market_watch_data_into_db(conn)
+            # Fetch on this thread so the writer thread is only busy for the diff itself
+            market_watch_rows = prepare_market_watch_snapshot()
+            if market_watch_rows is None:
+                success, records_added = False, 0
+            else:
+                success, records_added = write_job(apply_market_watch_snapshot, market_watch_rows)
             summary['market_watch']['success'] = success
             summary['market_watch']['records_added'] = records_added
             if success:
-                summary['market_watch']['message'] = f"Successfully synchronized Market Watch data with {records_added} records added/updated."
+                summary['market_watch']['message'] = f"Successfully synchronized Market Watch data with {records_added} records changed."
                 logging.info(summary['market_watch']['message'])
             else:
                 summary['market_watch']['message'] = "Failed to synchronize Market Watch data."
@@ -1158,7 +1683,10 @@ def synchronize_database(conn, date, progress_bar=None, status_text=None):
                 progress_bar.progress(0.1)  # 10%
                 status_text.text("Market Watch synchronization failed.")
         
+        timings['market_watch'] = round(perf_counter() - task_started_at, 3)
+
         # ---- Task 2: Synchronize All Tickers ---- #
+        task_started_at = perf_counter()
         try:
             logging.info("Starting synchronization: Synchronizing all tickers.")
             tickers = get_unique_tickers_from_db(conn)
@@ -1168,41 +1696,106 @@ def synchronize_database(conn, date, progress_bar=None, status_text=None):
             else:
                 total_tickers = len(tickers)
                 logging.info(f"Found {total_tickers} tickers to synchronize.")
-                data_total_added = 0
                 
-                # Define date range for fetching
-                date_from = "01 Jan 2000"
-                date_to = datetime.strptime(date, "%Y-%m-%d").strftime("%d %b %Y")
+                # Define date range for fetching: the delta after each ticker's watermark, or the full history
+                sync_date = datetime.strptime(date, "%Y-%m-%d")
+                date_to = sync_date.strftime("%d %b %Y")
+                snapshot_added = 0
+                if mode == SYNC_MODE_FAST_EOD and not (
+                    summary['market_watch']['success'] and is_final_snapshot_date(sync_date)
+                ):
+                    logging.warning("MarketWatch snapshot is not a final bar for the selected date; falling back to incremental sync.")
+                    mode = SYNC_MODE_INCREMENTAL
+
+                if mode == SYNC_MODE_FULL:
+                    date_ranges, up_to_date = {ticker: DEFAULT_HISTORY_START for ticker in tickers}, []
+                elif mode == SYNC_MODE_FAST_EOD:
+                    # Today's bar comes from the snapshot; only tickers with gaps go to the history API
+                    watermarks = get_ticker_watermarks(conn)
+                    bars = get_market_watch_daily_bars(conn, date)
+                    snapshot_bars, fallback = split_fast_eod_tickers(watermarks, bars, tickers, sync_date)
+                    try:
+                        success, snapshot_added = write_job(insert_daily_bars, snapshot_bars)
+                    except sqlite3.Error:
+                        success, snapshot_added = False, 0
+                    if not success:
+                        summary['tickers']['errors'].append("Failed to insert daily bars from the MarketWatch snapshot.")
+                        fallback = tickers
+                    date_ranges, up_to_date = get_incremental_date_ranges(watermarks, fallback, sync_date)
+                    logging.info(f"Took {snapshot_added} daily bars from the MarketWatch snapshot; {len(date_ranges)} tickers fall back to the history API.")
+                else:
+                    date_ranges, up_to_date = get_incremental_date_ranges(get_ticker_watermarks(conn), tickers, sync_date)
+                logging.info(f"{len(date_ranges)} tickers need data, {len(up_to_date)} are already up to date ({mode} mode).")
                 
-                # Fetch all tickers data asynchronously
+                # Fetch, normalize and insert tickers as a streaming pipeline: stages overlap and
+                # results are written as they complete, so memory stays bounded by the queue sizes
                 loop = asyncio.new_event_loop()
                 asyncio.set_event_loop(loop)
-                ticker_data = loop.run_until_complete(fetch_all_tickers_data(tickers, date_from, date_to))
-                loop.close()
-                
-                for idx, ticker in enumerate(tickers, start=1):
-                    logging.info(f"Synchronizing ticker {idx}/{total_tickers}: {ticker}")
+                if engine is None:
+                    engine = get_default_engine(loop)
+                inline_write_seconds = [0.0]
+                writer_busy_before = writer.busy_seconds if writer is not None else 0.0
+
+                async def fetch(session, ticker):
+                    return await async_get_stock_data(session, ticker, date_ranges[ticker], date_to, engine=engine)
+
+                def write(rows, ticker):
+                    if writer is None:
+                        # All tickers go into one transaction, committed once the pipeline has drained;
+                        # each ticker gets a savepoint so a failed insert leaves none of its rows behind
+                        write_started_at = perf_counter()
+                        if not conn.in_transaction:
+                            conn.execute("BEGIN")
+                        conn.execute("SAVEPOINT ticker_rows")
+                        try:
+                            outcome = insert_ticker_rows(conn, rows, ticker, commit=False)
+                            conn.execute("RELEASE ticker_rows")
+                        except sqlite3.Error:
+                            conn.execute("ROLLBACK TO ticker_rows")
+                            conn.execute("RELEASE ticker_rows")
+                            raise
+                        finally:
+                            inline_write_seconds[0] += perf_counter() - write_started_at
+                        return outcome
+                    # Queued on the writer thread; the event loop keeps fetching while it writes
+                    return asyncio.wrap_future(writer.submit(insert_ticker_rows, rows, ticker))
+
+                def on_progress(completed, total, ticker):
+                    logging.info(f"Synchronized ticker {completed}/{total}: {ticker}")
                     if progress_bar and status_text:
-                        progress = 0.1 + (idx / total_tickers) * 0.4  # Progress between 10% to 50%
-                        progress = min(progress, 0.5)  # Ensure it doesn't exceed 50%
-                        progress_bar.progress(progress)
-                        status_text.text(f"Synchronizing ticker {idx}/{total_tickers}: {ticker}")
-                    
-                    new_data = ticker_data.get(ticker)
-                    if new_data:
-                        success, records_added = insert_ticker_data_into_db(conn, new_data, ticker)
-                        if success:
-                            data_total_added += records_added
-                            logging.info(f"Added {records_added} new records for ticker '{ticker}'.")
-                        else:
-                            error_msg = f"Failed to insert data for ticker '{ticker}'."
-                            summary['tickers']['errors'].append(error_msg)
-                            logging.error(error_msg)
-                    else:
-                        logging.info(f"No new data fetched for ticker '{ticker}'.")
+                        progress = 0.1 + (completed / total) * 0.4  # Progress between 10% to 50%
+                        progress_bar.progress(min(progress, 0.5))
+                        status_text.text(f"Synchronized ticker {completed}/{total}: {ticker}")
+
+                engine.stats.start()
+                try:
+                    pipeline_result = loop.run_until_complete(run_pipeline(
+                        list(date_ranges), fetch, normalize_ticker_records, write,
+                        fetch_workers=engine.max_concurrency, progress_callback=on_progress
+                    ))
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                finally:
+                    loop.close()
+                engine.stats.finish()
+                timings['ticker_fetch'] = pipeline_result['stage_seconds']['fetch']
+                timings['ticker_normalize'] = pipeline_result['stage_seconds']['normalize']
+                timings['ticker_insert'] = round(
+                    writer.busy_seconds - writer_busy_before if writer is not None else inline_write_seconds[0], 3
+                )
+
+                data_total_added = pipeline_result['records_added'] + snapshot_added
+                summary['tickers']['errors'].extend(engine.stats.errors)
+                summary['tickers']['errors'].extend(pipeline_result['errors'])
+                summary['tickers']['fetch_stats'] = engine.stats.as_dict()
                 summary['tickers']['success'] = True
                 summary['tickers']['records_added'] = data_total_added
-                summary['tickers']['message'] = f"Successfully synchronized tickers with {data_total_added} new records added."
+                summary['tickers']['message'] = (
+                    f"Successfully synchronized tickers with {data_total_added} new records added "
+                    f"({len(up_to_date)} tickers already up to date)."
+                )
                 if summary['tickers']['errors']:
                     summary['tickers']['message'] += f" Encountered errors with {len(summary['tickers']['errors'])} tickers."
                 if progress_bar and status_text:
@@ -1215,17 +1808,29 @@ def synchronize_database(conn, date, progress_bar=None, status_text=None):
                 progress_bar.progress(0.5)  # 50%
                 status_text.text("Ticker synchronization failed.")
         
+        timings['tickers'] = round(perf_counter() - task_started_at, 3)
+
         # ---- Task 3: Fetch and Insert PSX Transaction Data ---- #
+        task_started_at = perf_counter()
         try:
             logging.info("Starting synchronization: Fetching and Inserting PSX Transaction data.")
             logging.debug(f"Fetching PSX Transaction data for date: {date}")
             transaction_data = fetch_psx_transaction_data(date)
             if transaction_data is not None and not transaction_data.empty:
-                insert_off_market_transaction_data(conn, transaction_data, 'Off Market & Cross Transactions')
-                summary['psx_transactions']['success'] = True
-                summary['psx_transactions']['records_added'] = len(transaction_data)
-                summary['psx_transactions']['message'] = f"Successfully synchronized PSX Transaction data with {len(transaction_data)} records inserted."
-                logging.info(summary['psx_transactions']['message'])
+                success, records_added, records_ignored = write_job(
+                    insert_off_market_transaction_data, transaction_data, 'Off Market & Cross Transactions'
+                )
+                summary['psx_transactions']['success'] = success
+                summary['psx_transactions']['records_added'] = records_added
+                if success:
+                    summary['psx_transactions']['message'] = (
+                        f"Successfully synchronized PSX Transaction data with {records_added} records inserted "
+                        f"({records_ignored} already present)."
+                    )
+                    logging.info(summary['psx_transactions']['message'])
+                else:
+                    summary['psx_transactions']['message'] = "Failed to insert PSX Transaction data."
+                    logging.error(summary['psx_transactions']['message'])
             else:
                 summary['psx_transactions']['message'] = "No PSX Transaction data fetched."
                 logging.warning(summary['psx_transactions']['message'])
@@ -1240,6 +1845,7 @@ def synchronize_database(conn, date, progress_bar=None, status_text=None):
             if progress_bar and status_text:
                 progress_bar.progress(0.6)  # 60%
                 status_text.text("PSX Transaction synchronization failed.")
+        timings['transactions'] = round(perf_counter() - task_started_at, 3)
 
         # ---- Finalizing Synchronization ---- #
         try:
@@ -1256,6 +1862,17 @@ def synchronize_database(conn, date, progress_bar=None, status_text=None):
         summary['tickers']['message'] += f" | Unexpected error: {str(e)}"
         summary['psx_transactions']['message'] += f" | Unexpected error: {str(e)}"
 
+    finally:
+        if writer is not None:
+            writer.close()
+    timings['total'] = round(perf_counter() - sync_started_at, 3)
+    logging.info(f"Synchronization timings (seconds): {timings}")
+
+    response_cache = get_default_cache()
+    if response_cache is not None:
+        summary['response_cache'] = response_cache.as_dict()
+        logging.info(f"Response cache hit ratio: {response_cache.hit_ratio:.1%} ({summary['response_cache']})")
+
     return summary
 
 
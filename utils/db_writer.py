@@ -0,0 +1,162 @@
+# utils/db_writer.py
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+from utils.connection_manager import apply_pragmas
+
+
+DEFAULT_MAX_BATCH_JOBS = 256  # Max write jobs coalesced into one transaction
+DEFAULT_MAX_BATCH_DELAY = 0.02  # Seconds to wait for more jobs before committing a batch
+
+# Queue sentinel asking the writer thread to exit
+_STOP = object()
+
+
+class DatabaseWriter:
+    """
+    Single background thread that owns a write connection and executes write jobs from a queue.
+
+    Jobs that arrive close together are coalesced into one transaction, each wrapped in its own
+    savepoint so a failing job does not roll back the others. Callers get a
+    concurrent.futures.Future per job, which resolves once the batch has been committed; async
+    code can await it with asyncio.wrap_future without blocking the event loop.
+
+    A job is a function called as fn(conn, *args, commit=False, **kwargs) on the writer thread.
+    The write functions in utils/db_manager.py accept a commit flag for this purpose.
+
+    Args:
+        db_path (str): Path to the SQLite database file.
+        max_batch_jobs (int): Maximum number of jobs per transaction.
+        max_batch_delay (float): Seconds to wait for further jobs before committing a batch.
+        lock (threading.Lock): Held while each batch executes, e.g. ConnectionManager.writer_lock,
+            so the batches are serialized with the other writers of the process.
+    """
+
+    def __init__(self, db_path, max_batch_jobs=DEFAULT_MAX_BATCH_JOBS, max_batch_delay=DEFAULT_MAX_BATCH_DELAY, lock=None):
+        self.db_path = db_path
+        self.max_batch_jobs = max_batch_jobs
+        self.max_batch_delay = max_batch_delay
+        self.lock = lock if lock is not None else threading.Lock()
+        self.jobs_completed = 0
+        self.transactions = 0
+        self.busy_seconds = 0.0  # Time spent executing batches, i.e. the pure write cost
+        self._queue = queue.Queue()
+        self._ready = threading.Event()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="DatabaseWriter", daemon=True)
+
+    def start(self):
+        """
+        Starts the writer thread and waits until its connection is open.
+        """
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+        return self
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Queues a write job.
+
+        Args:
+            fn (callable): Write function called as fn(conn, *args, commit=False, **kwargs).
+
+        Returns:
+            concurrent.futures.Future: Resolves to the function's return value after commit.
+        """
+        future = Future()
+        self._queue.put((fn, args, kwargs, future))
+        return future
+
+    def flush(self):
+        """
+        Blocks until every job queued so far has been committed.
+        """
+        self.submit(lambda conn, commit=False: None).result()
+
+    def close(self):
+        """
+        Commits outstanding jobs, stops the writer thread and closes its connection.
+        """
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _next_batch(self):
+        # Block for the first job, then coalesce whatever arrives within max_batch_delay
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_batch_delay
+        while batch[-1] is not _STOP and len(batch) < self.max_batch_jobs:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=max(remaining, 0)) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        try:
+            # Autocommit mode: transactions are controlled explicitly below
+            conn = sqlite3.connect(self.db_path, isolation_level=None)
+            apply_pragmas(conn)
+        except sqlite3.Error as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+
+        stopping = False
+        while not stopping:
+            batch = self._next_batch()
+            if batch[-1] is _STOP:
+                stopping = True
+                batch.pop()
+            if batch:
+                with self.lock:
+                    self._execute_batch(conn, batch)
+        conn.close()
+        logging.info(f"Database writer stopped after {self.jobs_completed} jobs in {self.transactions} transactions.")
+
+    def _execute_batch(self, conn, batch):
+        started_at = time.perf_counter()
+        results = []
+        try:
+            conn.execute("BEGIN")
+            for fn, args, kwargs, future in batch:
+                conn.execute("SAVEPOINT job")
+                try:
+                    results.append((future, fn(conn, *args, commit=False, **kwargs), None))
+                    conn.execute("RELEASE job")
+                except Exception as e:
+                    conn.execute("ROLLBACK TO job")
+                    conn.execute("RELEASE job")
+                    logging.error(f"Write job {getattr(fn, '__name__', fn)} failed and was rolled back: {e}")
+                    results.append((future, None, e))
+            conn.execute("COMMIT")
+            self.transactions += 1
+        except sqlite3.Error as e:
+            # The transaction itself failed; none of the jobs in this batch were committed
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            logging.error(f"Write batch of {len(batch)} jobs failed: {e}")
+            results = [(future, None, e) for _, _, _, future in batch]
+        self.busy_seconds += time.perf_counter() - started_at
+
+        for future, result, error in results:
+            self.jobs_completed += 1
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
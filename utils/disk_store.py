@@ -0,0 +1,133 @@
+# utils/disk_store.py
+
+import logging
+import os
+import sqlite3
+import time
+
+
+class DiskStore:
+    """
+    Size-bounded store of bodies as files under a directory, with an SQLite index of their size and
+    last access time. When the total size exceeds max_bytes the least recently used entries are
+    evicted. utils.response_cache and analysis.result_cache keep their entries in one, each adding
+    its own columns to the index.
+
+    The store does no locking of its own; callers serialize access to it.
+
+    Args:
+        directory (str): Store directory.
+        max_bytes (int): Upper bound on the total size of stored bodies.
+        columns (dict): Extra index column name -> SQL type. Columns missing from an existing index are added.
+        suffix (str): File name suffix of the bodies, e.g. '.pkl'.
+        name (str): Name used in log messages.
+    """
+
+    def __init__(self, directory, max_bytes, columns=None, suffix='', name='Disk store'):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.name = name
+        columns = columns or {}
+        os.makedirs(directory, exist_ok=True)
+        self.index = sqlite3.connect(os.path.join(directory, 'index.db'), check_same_thread=False)
+        definitions = ''.join(f"{column} {sql_type}, " for column, sql_type in columns.items())
+        self.index.execute(f"CREATE TABLE IF NOT EXISTS Entries (Key TEXT PRIMARY KEY, {definitions}Size INTEGER, Last_Access REAL);")
+        existing = {row[1] for row in self.index.execute("PRAGMA table_info(Entries);").fetchall()}
+        for column, sql_type in columns.items():
+            if column not in existing:
+                self.index.execute(f"ALTER TABLE Entries ADD COLUMN {column} {sql_type};")
+        self.index.commit()
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}{self.suffix}")
+
+    def read(self, key):
+        """
+        Returns the stored body of a key.
+
+        Raises:
+            OSError: If the body file is missing or unreadable.
+        """
+        with open(self.path(key), 'rb') as body_file:
+            return body_file.read()
+
+    def write(self, key, body, **columns):
+        """
+        Writes a body and its index row, replacing any entry with the same key, then evicts least
+        recently used entries if the store is over its size bound.
+
+        Args:
+            key (str): Entry key.
+            body (bytes): Body to store.
+            **columns: Values of the extra index columns.
+
+        Returns:
+            list: Keys of the evicted entries.
+        """
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Readers never see a partially written body
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as body_file:
+            body_file.write(body)
+        os.replace(temp_path, path)
+        names = ['Key', *columns, 'Size', 'Last_Access']
+        self.index.execute(
+            f"INSERT OR REPLACE INTO Entries ({', '.join(names)}) VALUES ({', '.join('?' * len(names))});",
+            (key, *columns.values(), len(body), time.time())
+        )
+        self.index.commit()
+        return self.evict()
+
+    def touch(self, key):
+        """
+        Marks an entry as just used.
+        """
+        self.index.execute("UPDATE Entries SET Last_Access = ? WHERE Key = ?;", (time.time(), key))
+        self.index.commit()
+
+    def delete(self, keys):
+        """
+        Removes entries and their bodies in one index transaction.
+        """
+        for key in keys:
+            try:
+                os.remove(self.path(key))
+            except OSError:
+                pass
+            self.index.execute("DELETE FROM Entries WHERE Key = ?;", (key,))
+        self.index.commit()
+
+    def evict(self):
+        """
+        Removes least recently used entries until the store is within max_bytes.
+
+        Returns:
+            list: Keys of the evicted entries.
+        """
+        total = self.index.execute("SELECT COALESCE(SUM(Size), 0) FROM Entries;").fetchone()[0]
+        if total <= self.max_bytes:
+            return []
+        evicted = []
+        for key, size in self.index.execute("SELECT Key, Size FROM Entries ORDER BY Last_Access;").fetchall():
+            if total <= self.max_bytes:
+                break
+            evicted.append(key)
+            total -= size
+        self.delete(evicted)
+        logging.info(f"{self.name} evicted {len(evicted)} entries; {total} bytes remain.")
+        return evicted
+
+    def clear(self):
+        """
+        Removes every entry.
+        """
+        self.delete([row[0] for row in self.index.execute("SELECT Key FROM Entries;").fetchall()])
+
+    def totals(self):
+        """
+        Returns:
+            tuple: (entries, bytes) currently stored.
+        """
+        return self.index.execute("SELECT COUNT(*), COALESCE(SUM(Size), 0) FROM Entries;").fetchone()
@@ -0,0 +1,316 @@
+# utils/fetch_engine.py
+
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+import weakref
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from utils.response_archive import get_default_archive
+from utils.response_cache import ResponseCache, get_default_cache, ttl_for_url
+
+
+# Defaults tuned for a full-universe sync (~500+ symbols) against investorslounge.com
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_RATE_PER_HOST = 4.0  # Requests per second allowed per host
+DEFAULT_BURST = 8  # Token bucket capacity per host
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_BACKOFF_BASE = 0.5  # Seconds
+DEFAULT_BACKOFF_CAP = 30.0  # Seconds
+DEFAULT_TIMEOUT = 60  # Seconds
+
+# HTTP status codes that are worth retrying (throttling and transient server errors)
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class FetchError(Exception):
+    """
+    Raised when a request still fails after all retries, or fails with a non-retryable error.
+    """
+
+    def __init__(self, key, message, attempts, status=None):
+        super().__init__(message)
+        self.key = key
+        self.attempts = attempts
+        self.status = status
+
+
+class TokenBucket:
+    """
+    Asynchronous token bucket limiting the request rate against a single host.
+
+    Args:
+        rate (float): Tokens added per second.
+        capacity (int): Maximum number of tokens the bucket can hold (burst size).
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        """
+        Waits until a token is available and consumes it.
+        """
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class FetchStats:
+    """
+    Collects request, retry and error accounting for a single fetch run.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.retries = {}  # key -> number of retries performed
+        self.errors = []  # Human readable error messages, one per failed key
+        self.started_at = None
+        self.finished_at = None
+
+    def start(self):
+        self.started_at = time.monotonic()
+
+    def finish(self):
+        self.finished_at = time.monotonic()
+
+    @property
+    def total_retries(self):
+        return sum(self.retries.values())
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return end - self.started_at
+
+    @property
+    def items_per_second(self):
+        completed = self.succeeded + self.failed
+        return completed / self.elapsed if self.elapsed > 0 else 0.0
+
+    def as_dict(self):
+        """
+        Returns the statistics as a plain dictionary suitable for summaries and JSON output.
+        """
+        return {
+            'requests': self.requests,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'retries': self.total_retries,
+            'retries_by_key': {key: count for key, count in self.retries.items() if count},
+            'elapsed_seconds': round(self.elapsed, 3),
+            'items_per_second': round(self.items_per_second, 2),
+        }
+
+
+class FetchEngine:
+    """
+    Reusable async fetch engine with a global concurrency cap, a token bucket rate limiter per host
+    and exponential backoff with full jitter on throttling, server errors and timeouts.
+
+    Args:
+        max_concurrency (int): Maximum number of requests in flight at once.
+        rate_per_host (float): Sustained requests per second allowed per host.
+        burst (int): Token bucket capacity per host.
+        max_retries (int): Retries per key after the first attempt.
+        backoff_base (float): Base delay in seconds for exponential backoff.
+        backoff_cap (float): Upper bound in seconds for a single backoff delay.
+        timeout (float): Total timeout in seconds for a single request.
+        response_cache (ResponseCache): Optional on-disk response cache consulted before each request.
+        response_archive (ResponseArchive): Optional raw response archive every downloaded body is appended to.
+    """
+
+    def __init__(self, max_concurrency=DEFAULT_MAX_CONCURRENCY, rate_per_host=DEFAULT_RATE_PER_HOST,
+                 burst=DEFAULT_BURST, max_retries=DEFAULT_MAX_RETRIES, backoff_base=DEFAULT_BACKOFF_BASE,
+                 backoff_cap=DEFAULT_BACKOFF_CAP, timeout=DEFAULT_TIMEOUT, response_cache=None,
+                 response_archive=None):
+        self.max_concurrency = max_concurrency
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.response_cache = response_cache
+        self.response_archive = response_archive
+        self.stats = FetchStats()
+        self._semaphore = None
+        self._buckets = {}
+
+    def _get_semaphore(self):
+        # Created lazily so the engine can be constructed outside of a running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def _get_bucket(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rate_per_host, self.burst)
+        return self._buckets[host]
+
+    def backoff_delay(self, attempt, retry_after=None):
+        """
+        Computes the delay before the next attempt using exponential backoff with full jitter.
+        A server supplied Retry-After (seconds) takes precedence when present.
+        """
+        if retry_after is not None:
+            return min(self.backoff_cap, retry_after)
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    async def request_json(self, session, method, url, key, **kwargs):
+        """
+        Performs an HTTP request and decodes the JSON body, retrying transient failures.
+
+        Args:
+            session (aiohttp.ClientSession): The aiohttp session to use for the request.
+            method (str): HTTP method ('GET' or 'POST').
+            url (str): Request URL.
+            key (str): Identifier used for retry and error accounting (e.g. the ticker symbol).
+            **kwargs: Extra arguments passed to session.request.
+
+        Returns:
+            object: The decoded JSON body.
+
+        Raises:
+            FetchError: If the request fails permanently or exhausts its retries.
+        """
+        body = await self._request(session, method, url, key, **kwargs)
+        try:
+            return json.loads(body)
+        except ValueError as e:
+            raise FetchError(key, f"Invalid JSON response: {e}", 1)
+
+    async def request_bytes(self, session, method, url, key, **kwargs):
+        """
+        Performs an HTTP request and returns the raw body (e.g. HTML pages or Excel files), retrying transient failures.
+
+        Args:
+            session (aiohttp.ClientSession): The aiohttp session to use for the request.
+            method (str): HTTP method ('GET' or 'POST').
+            url (str): Request URL.
+            key (str): Identifier used for retry and error accounting.
+            **kwargs: Extra arguments passed to session.request.
+
+        Returns:
+            bytes: The response body.
+
+        Raises:
+            FetchError: If the request fails permanently or exhausts its retries.
+        """
+        return await self._request(session, method, url, key, **kwargs)
+
+    async def _request(self, session, method, url, key, **kwargs):
+        payload = kwargs.get('json', kwargs.get('data'))
+        entry = None
+        if self.response_cache is not None:
+            cache_key = ResponseCache.make_key(method, url, payload)
+            entry = self.response_cache.lookup(cache_key)
+            if entry is not None:
+                if entry.fresh:
+                    return entry.body
+                kwargs['headers'] = {**(kwargs.get('headers') or {}), **entry.conditional_headers()}
+
+        semaphore = self._get_semaphore()
+        bucket = self._get_bucket(url)
+        self.stats.retries.setdefault(key, 0)
+        attempt = 0
+
+        while True:
+            retry_after = None
+            status = None
+            try:
+                async with semaphore:
+                    await bucket.acquire()
+                    self.stats.requests += 1
+                    async with session.request(method, url, timeout=self.timeout, **kwargs) as response:
+                        status = response.status
+                        if status in RETRYABLE_STATUSES:
+                            header = response.headers.get('Retry-After')
+                            if header and header.isdigit():
+                                retry_after = float(header)
+                            error = f"HTTP {status}"
+                        elif status == 304 and entry is not None:
+                            self.response_cache.revalidated(cache_key, ttl_for_url(url))
+                            return entry.body
+                        else:
+                            response.raise_for_status()
+                            body = await response.read()
+                            if self.response_cache is not None and status == 200:
+                                self.response_cache.store(cache_key, url, body, response.headers, ttl_for_url(url))
+                            if self.response_archive is not None and status == 200:
+                                self.response_archive.record(method, url, body, key=key, payload=payload)
+                            return body
+            except aiohttp.ClientResponseError as e:
+                raise FetchError(key, f"HTTP {e.status}: {e.message}", attempt + 1, e.status)
+            except asyncio.TimeoutError:
+                error = "Request timed out"
+            except aiohttp.ClientError as e:
+                error = f"Connection error: {e}"
+
+            if attempt >= self.max_retries:
+                raise FetchError(key, error, attempt + 1, status)
+
+            delay = self.backoff_delay(attempt, retry_after)
+            attempt += 1
+            self.stats.retries[key] = attempt
+            logging.warning(f"{error} for '{key}', retrying in {delay:.2f}s (attempt {attempt + 1}/{self.max_retries + 1}).")
+            await asyncio.sleep(delay)
+
+    def record_success(self, key):
+        self.stats.succeeded += 1
+
+    def record_failure(self, key, message):
+        self.stats.failed += 1
+        self.stats.errors.append(message)
+        logging.error(message)
+
+
+_default_engines = weakref.WeakKeyDictionary()  # Event loop -> FetchEngine
+_default_engines_lock = threading.Lock()
+
+
+def get_default_engine(loop=None):
+    """
+    Returns the shared fetch engine of an event loop, creating it on first use with the process-wide
+    response cache and archive. Every fetch on the loop that does not bring its own engine goes
+    through it, so they share one concurrency cap and per-host rate limit. The engine's semaphore
+    and token buckets belong to the loop, hence one engine per loop rather than per process.
+
+    Its stats accumulate over every fetch on the loop; callers pass their own engine to measure a single run.
+
+    Args:
+        loop (asyncio.AbstractEventLoop): The event loop. Defaults to the running loop.
+
+    Returns:
+        FetchEngine: The loop's shared engine.
+    """
+    loop = loop or asyncio.get_running_loop()
+    with _default_engines_lock:
+        engine = _default_engines.get(loop)
+        if engine is None:
+            engine = FetchEngine(response_cache=get_default_cache(), response_archive=get_default_archive())
+            _default_engines[loop] = engine
+        return engine
@@ -1,5 +1,12 @@
 import pandas as pd
 import logging
+from datetime import time
+from zoneinfo import ZoneInfo
+
+# PSX trades on Karachi time, whatever the timezone of the machine running the app.
+# Market dates (today's file, the final daily bar) are taken in this timezone.
+MARKET_TIMEZONE = ZoneInfo('Asia/Karachi')
+MARKET_CLOSE_TIME = time(17, 0)
 
 def format_date(date_input, output_format="%Y-%m-%d"):
     """
@@ -22,3 +29,20 @@ def format_date(date_input, output_format="%Y-%m-%d"):
     except Exception as e:
         logging.error(f"Date formatting failed for '{date_input}': {e}")
         return None
+
+
+def get_previous_trading_day(date):
+    """
+    Returns the last weekday strictly before the given date. Exchange holidays are not known here,
+    so callers should treat the result as a lower bound for "already up to date".
+
+    Args:
+        date (datetime): The reference date.
+
+    Returns:
+        datetime: The previous weekday (Monday to Friday).
+    """
+    date -= pd.Timedelta(days=1)
+    while date.weekday() >= 5:  # 5 = Saturday, 6 = Sunday
+        date -= pd.Timedelta(days=1)
+    return date
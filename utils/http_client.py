@@ -0,0 +1,254 @@
+# utils/http_client.py
+
+import threading
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from utils.response_archive import get_default_archive
+from utils.response_cache import ResponseCache, get_default_cache, ttl_for_url
+
+try:
+    import brotli  # noqa: F401  (enables 'br' decoding in both requests/urllib3 and aiohttp)
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+
+DEFAULT_TIMEOUT = 60
+DEFAULT_CONNECTIONS_PER_HOST = 8  # Matches the FetchEngine default concurrency
+DEFAULT_TOTAL_CONNECTIONS = 64
+DNS_CACHE_TTL = 300  # Seconds
+
+# Headers sent with every request
+DEFAULT_HEADERS = {
+    "Accept-Encoding": ACCEPT_ENCODING,
+    "Accept-Language": "en-US,en;q=0.9,ps;q=0.8",
+    "Sec-CH-UA": "\"Google Chrome\";v=\"129\", \"Not=A?Brand\";v=\"8\", \"Chromium\";v=\"129\"",
+    "Sec-CH-UA-Mobile": "?0",
+    "Sec-CH-UA-Platform": "\"Windows\"",
+}
+
+# Extra headers for XHR/JSON endpoints
+XHR_HEADERS = {
+    "Accept": "application/json, text/javascript, */*; q=0.01",
+    "Sec-Fetch-Dest": "empty",
+    "Sec-Fetch-Mode": "cors",
+    "Sec-Fetch-Site": "same-origin",
+    "X-Requested-With": "XMLHttpRequest",
+}
+
+# Extra headers for page navigations
+DOCUMENT_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Sec-Fetch-Dest": "document",
+    "Sec-Fetch-Mode": "navigate",
+    "Sec-Fetch-Site": "same-origin",
+    "Sec-Fetch-User": "?1",
+    "Upgrade-Insecure-Requests": "1",
+}
+
+
+class HttpStats:
+    """
+    Process-wide counters for requests made through this module.
+
+    bytes_received counts decoded response bodies. connections_created and connections_reused
+    show how well keep-alive pooling is working.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.bytes_received = 0
+            self.connections_created = 0
+            self.connections_reused = 0
+
+    def add(self, requests=0, bytes_received=0, connections_created=0, connections_reused=0):
+        with self._lock:
+            self.requests += requests
+            self.bytes_received += bytes_received
+            self.connections_created += connections_created
+            self.connections_reused += connections_reused
+
+    def as_dict(self):
+        return {
+            'requests': self.requests,
+            'bytes_received': self.bytes_received,
+            'connections_created': self.connections_created,
+            'connections_reused': self.connections_reused,
+        }
+
+
+stats = HttpStats()
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Returns the shared keep-alive requests.Session, creating it on first use.
+
+    Returns:
+        requests.Session: Session with pooled connections and the default headers.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=DEFAULT_CONNECTIONS_PER_HOST, pool_maxsize=DEFAULT_CONNECTIONS_PER_HOST)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers.update(DEFAULT_HEADERS)
+            _session = session
+        return _session
+
+
+def _count_pool_connections(session):
+    total = 0
+    for adapter in set(session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                total += pool.num_connections
+    return total
+
+
+def _cached_response(entry, url):
+    response = requests.Response()
+    response.status_code = 200
+    response.reason = 'OK'
+    response.url = url
+    response.headers = CaseInsensitiveDict(entry.headers)
+    response.encoding = get_encoding_from_headers(response.headers)
+    response._content = entry.body
+    return response
+
+
+def request(method, url, headers=None, timeout=DEFAULT_TIMEOUT, cache=True, archive=True, **kwargs):
+    """
+    Performs a blocking HTTP request on the shared session. Responses are served from and stored in
+    the on-disk response cache; expired entries are revalidated with a conditional request.
+
+    Args:
+        method (str): HTTP method ('GET' or 'POST').
+        url (str): Request URL.
+        headers (dict): Extra headers merged over DEFAULT_HEADERS (e.g. XHR_HEADERS).
+        timeout (float): Timeout in seconds.
+        cache (bool): Use the response cache.
+        archive (bool): Append fresh 200 responses to the raw response archive.
+        **kwargs: Extra arguments passed to requests.Session.request.
+
+    Returns:
+        requests.Response: The response. Errors are raised as requests exceptions, as with requests.get.
+    """
+    payload = kwargs.get('json', kwargs.get('data'))
+    response_cache = get_default_cache() if cache else None
+    entry = None
+    if response_cache is not None:
+        key = ResponseCache.make_key(method, url, payload)
+        entry = response_cache.lookup(key)
+        if entry is not None:
+            if entry.fresh:
+                return _cached_response(entry, url)
+            headers = {**(headers or {}), **entry.conditional_headers()}
+
+    session = get_session()
+    connections_before = _count_pool_connections(session)
+    response = session.request(method, url, headers=headers, timeout=timeout, **kwargs)
+    created = _count_pool_connections(session) - connections_before
+    stats.add(requests=1, bytes_received=len(response.content), connections_created=max(created, 0),
+              connections_reused=1 if created <= 0 else 0)
+
+    if response_cache is not None:
+        if response.status_code == 304 and entry is not None:
+            response_cache.revalidated(key, ttl_for_url(url))
+            return _cached_response(entry, url)
+        if response.status_code == 200:
+            response_cache.store(key, url, response.content, response.headers, ttl_for_url(url))
+    response_archive = get_default_archive() if archive else None
+    if response_archive is not None and response.status_code == 200:
+        response_archive.record(method, url, response.content, payload=payload)
+    return response
+
+
+def get(url, headers=None, timeout=DEFAULT_TIMEOUT, **kwargs):
+    return request('GET', url, headers=headers, timeout=timeout, **kwargs)
+
+
+def post(url, headers=None, timeout=DEFAULT_TIMEOUT, **kwargs):
+    return request('POST', url, headers=headers, timeout=timeout, **kwargs)
+
+
+def close_session():
+    """
+    Closes the shared requests.Session and its pooled connections.
+    """
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def _create_trace_config():
+    trace_config = aiohttp.TraceConfig()
+
+    async def on_request_end(session, context, params):
+        stats.add(requests=1)
+
+    async def on_response_chunk_received(session, context, params):
+        stats.add(bytes_received=len(params.chunk))
+
+    async def on_connection_create_end(session, context, params):
+        stats.add(connections_created=1)
+
+    async def on_connection_reuseconn(session, context, params):
+        stats.add(connections_reused=1)
+
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_response_chunk_received.append(on_response_chunk_received)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+    return trace_config
+
+
+def create_async_session(limit=DEFAULT_TOTAL_CONNECTIONS, limit_per_host=DEFAULT_CONNECTIONS_PER_HOST):
+    """
+    Creates an aiohttp session with a keep-alive connection pool, per-host connection limits,
+    a DNS cache and the default headers. aiohttp sessions are bound to an event loop, so create
+    one per asyncio.run and share it across all requests of that run.
+
+    Args:
+        limit (int): Maximum number of open connections.
+        limit_per_host (int): Maximum number of open connections per host.
+
+    Returns:
+        aiohttp.ClientSession: The session; use it as an async context manager.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        use_dns_cache=True,
+        ttl_dns_cache=DNS_CACHE_TTL,
+    )
+    return aiohttp.ClientSession(connector=connector, headers=DEFAULT_HEADERS, trace_configs=[_create_trace_config()])
+
+
+def get_stats():
+    """
+    Returns the request, byte and connection counters.
+
+    Returns:
+        dict: Counters as a dictionary.
+    """
+    return stats.as_dict()
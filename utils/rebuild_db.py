@@ -0,0 +1,231 @@
+# utils/rebuild_db.py
+#
+# Regenerates the database from the raw response archive (utils/response_archive.py) without
+# any network access. Partitions are parsed in parallel across processes; all writes are then
+# replayed in fetch order in a single transaction on the main process.
+#
+# Usage (from the project root):
+#     python -m utils.rebuild_db --db data/tick_data_rebuilt.db --workers 4
+
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from utils.data_fetcher import (
+    parse_kse_market_watch,
+    parse_defaulters_list,
+    parse_psx_constituents,
+    parse_psx_transaction_data,
+)
+from utils.db_manager import (
+    initialize_db_and_tables,
+    normalize_ticker_records,
+    insert_ticker_rows,
+    insert_off_market_transaction_data,
+    build_market_watch_rows,
+    apply_market_watch_snapshot,
+    get_market_watch_daily_bars,
+    get_ticker_watermarks,
+    insert_daily_bars,
+    is_final_snapshot_date,
+    split_fast_eod_tickers,
+)
+from utils.helpers import MARKET_TIMEZONE
+from utils.response_archive import DEFAULT_ARCHIVE_DIR, ResponseArchive, partition_endpoint, read_partition
+
+
+# Parsers for snapshot endpoints; every archived snapshot is kept and replayed in fetch order
+SNAPSHOT_PARSERS = {
+    'market_watch': lambda body: parse_kse_market_watch(body.decode('utf-8', errors='replace')),
+    'defaulters': lambda body: parse_defaulters_list(body.decode('utf-8', errors='replace')),
+    'constituents': parse_psx_constituents,
+}
+
+
+ARCHIVE_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def record_ticker(record):
+    """
+    Returns the ticker symbol of an archived price history response.
+    """
+    if record.get('key'):
+        return record['key']
+    return json.loads(record['payload']['data'])['company']
+
+
+def parse_partition(path):
+    """
+    Parses one archive partition. Runs in a worker process.
+
+    Args:
+        path (str): Partition file path.
+
+    Returns:
+        dict: Parsed data with 'ticker_rows' (list of (fetched_at, ticker, rows)), 'transactions'
+              (list of DataFrames), 'snapshots' (endpoint -> list of (fetched_at, data)), 'responses'
+              and 'errors'.
+    """
+    endpoint = partition_endpoint(path)
+    result = {'ticker_rows': [], 'transactions': [], 'snapshots': {}, 'responses': 0, 'errors': []}
+
+    for record in read_partition(path):
+        result['responses'] += 1
+        try:
+            if endpoint == 'price_history':
+                ticker = record_ticker(record)
+                data = json.loads(record['body'])
+                if isinstance(data, list) and data:
+                    result['ticker_rows'].append((record['fetched_at'], ticker, normalize_ticker_records(data, ticker)))
+            elif endpoint == 'transactions':
+                transactions = parse_psx_transaction_data(record['body'].decode('utf-8', errors='replace'))
+                if transactions is not None and not transactions.empty:
+                    result['transactions'].append(transactions)
+            elif endpoint in SNAPSHOT_PARSERS:
+                snapshot = (record['fetched_at'], SNAPSHOT_PARSERS[endpoint](record['body']))
+                result['snapshots'].setdefault(endpoint, []).append(snapshot)
+        except Exception as e:
+            result['errors'].append(f"{path}: failed to parse {record['url']}: {e}")
+    return result
+
+
+def merge_results(results):
+    """
+    Merges per-partition results, keeping every snapshot of each snapshot endpoint.
+    """
+    merged = {'ticker_rows': [], 'transactions': [], 'snapshots': {}, 'responses': 0, 'errors': []}
+    for result in results:
+        merged['ticker_rows'].extend(result['ticker_rows'])
+        merged['transactions'].extend(result['transactions'])
+        for endpoint, snapshots in result['snapshots'].items():
+            merged['snapshots'].setdefault(endpoint, []).extend(snapshots)
+        merged['responses'] += result['responses']
+        merged['errors'].extend(result['errors'])
+    return merged
+
+
+def nearest_snapshot(snapshots, fetched_at):
+    """
+    Returns the data of the snapshot fetched closest to fetched_at, or an empty list if there is none.
+    Archive times share one format, so they are compared as parsed datetimes.
+    """
+    if not snapshots:
+        return []
+    target = datetime.strptime(fetched_at, ARCHIVE_TIME_FORMAT)
+    return min(snapshots, key=lambda snapshot: abs(datetime.strptime(snapshot[0], ARCHIVE_TIME_FORMAT) - target))[1]
+
+
+def replay_market_watch(conn, fetched_at, market_data, snapshots, summary):
+    """
+    Applies one archived MarketWatch snapshot. A snapshot fetched after the Karachi close also holds
+    the final bar of that day, which a fast EOD sync stored in the Ticker table, so its daily bars
+    are inserted the same way for tickers without a gap before that day.
+
+    Args:
+        conn (sqlite3.Connection): SQLite database connection; the caller owns the transaction.
+        fetched_at (str): Archive fetch time of the snapshot, in the archiving host's local time.
+        market_data (list): Parsed MarketWatch snapshot.
+        snapshots (dict): Endpoint -> list of (fetched_at, data) of all archived snapshots.
+        summary (dict): Rebuild summary to update.
+    """
+    rows = build_market_watch_rows(
+        market_data,
+        nearest_snapshot(snapshots.get('defaulters'), fetched_at),
+        nearest_snapshot(snapshots.get('constituents'), fetched_at),
+    )
+    success, records_changed = apply_market_watch_snapshot(conn, rows, snapshot_time=fetched_at, commit=False)
+    summary['market_watch_rows'] += records_changed
+    summary['market_watch_snapshots'] += 1
+
+    # A naive datetime's astimezone treats it as local time, matching how the archive stamps responses
+    fetched = datetime.strptime(fetched_at, ARCHIVE_TIME_FORMAT).astimezone(MARKET_TIMEZONE)
+    if not is_final_snapshot_date(fetched, now=fetched):
+        return
+    date = fetched.strftime('%Y-%m-%d')
+    bars = get_market_watch_daily_bars(conn, date)
+    snapshot_bars, _ = split_fast_eod_tickers(get_ticker_watermarks(conn), bars, list(bars), datetime.strptime(date, '%Y-%m-%d'))
+    success, records_added = insert_daily_bars(conn, snapshot_bars, commit=False)
+    summary['snapshot_bars'] += records_added
+
+
+def rebuild_database(db_path, archive_dir=DEFAULT_ARCHIVE_DIR, workers=None):
+    """
+    Rebuilds a database from the raw response archive.
+
+    Args:
+        db_path (str): Path of the database to create. Must not exist yet.
+        archive_dir (str): Archive root directory.
+        workers (int): Number of parser processes. Defaults to the CPU count.
+
+    Returns:
+        dict: Summary with row counts and per-stage timings.
+    """
+    if os.path.exists(db_path):
+        raise FileExistsError(f"{db_path} already exists; choose a new path for the rebuilt database.")
+
+    partitions = ResponseArchive(archive_dir).partitions()
+    logging.info(f"Rebuilding {db_path} from {len(partitions)} archive partitions.")
+
+    started_at = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        merged = merge_results(executor.map(parse_partition, partitions))
+    parse_seconds = time.perf_counter() - started_at
+
+    summary = {
+        'partitions': len(partitions),
+        'responses': merged['responses'],
+        'ticker_rows': 0,
+        'transactions': 0,
+        'market_watch_rows': 0,
+        'market_watch_snapshots': 0,
+        'snapshot_bars': 0,
+        'errors': merged['errors'],
+        'parse_seconds': round(parse_seconds, 3),
+    }
+
+    started_at = time.perf_counter()
+    conn = initialize_db_and_tables(db_path)
+    try:
+        # Replay the price history responses and MarketWatch snapshots in fetch order, so each snapshot
+        # sees the watermarks the sync saw and INSERT OR IGNORE keeps the first archived value of each row.
+        # Within the same second the snapshot goes first, as synchronize_database fetches it first.
+        snapshots = merged['snapshots']
+        replay = [(fetched_at, 0, market_data) for fetched_at, market_data in snapshots.get('market_watch', [])]
+        replay.extend((fetched_at, 1, (ticker, rows)) for fetched_at, ticker, rows in merged['ticker_rows'])
+        replay.sort(key=lambda write: write[:2])
+        for fetched_at, kind, data in replay:
+            if kind == 0:
+                replay_market_watch(conn, fetched_at, data, snapshots, summary)
+            else:
+                ticker, rows = data
+                success, records_added = insert_ticker_rows(conn, rows, ticker, commit=False)
+                summary['ticker_rows'] += records_added
+        for transactions in merged['transactions']:
+            success, records_added, _ = insert_off_market_transaction_data(conn, transactions, 'Off Market & Cross Transactions', commit=False)
+            summary['transactions'] += records_added
+        conn.commit()
+    finally:
+        conn.close()
+    summary['insert_seconds'] = round(time.perf_counter() - started_at, 3)
+
+    logging.info(f"Rebuilt {db_path}: {summary}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the database from the raw response archive without network access.")
+    parser.add_argument('--db', default='data/tick_data_rebuilt.db', help="Path of the database to create.")
+    parser.add_argument('--archive', default=DEFAULT_ARCHIVE_DIR, help="Archive root directory.")
+    parser.add_argument('--workers', type=int, default=None, help="Parser processes (default: CPU count).")
+    args = parser.parse_args()
+
+    summary = rebuild_database(args.db, args.archive, args.workers)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# utils/response_archive.py
+
+import base64
+import gzip
+import io
+import json
+import os
+import threading
+from datetime import datetime
+
+from utils.response_cache import classify_url
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+DEFAULT_ARCHIVE_DIR = 'data/archive'
+ZSTD_LEVEL = 10
+
+# Partition files are zstd compressed when zstandard is installed, gzip otherwise
+ARCHIVE_EXTENSION = '.jsonl.zst' if zstandard is not None else '.jsonl.gz'
+
+
+def archive_endpoint(url):
+    """
+    Maps a URL to the endpoint name used to partition the archive.
+
+    Args:
+        url (str): Request URL.
+
+    Returns:
+        str: Endpoint name, e.g. 'price_history', 'market_watch' or 'transactions'.
+    """
+    if '/download/omts/' in url:
+        return 'transactions'
+    if '/download/indhist/' in url:
+        return 'constituents'
+    if url.endswith('/listings-table/main/dc'):
+        return 'defaulters'
+    return classify_url(url)
+
+
+class ResponseArchive:
+    """
+    Append-only archive of raw HTTP responses, partitioned as <directory>/<fetch date>/<endpoint>.jsonl.zst.
+
+    Each response is one JSON line (URL, method, payload, fetch time and body) compressed as its own
+    zstd frame, so partitions can be appended to safely and read back as a single stream.
+    utils/rebuild_db.py re-parses the archive to regenerate the database without network access.
+
+    Args:
+        directory (str): Archive root directory.
+    """
+
+    def __init__(self, directory=DEFAULT_ARCHIVE_DIR):
+        self.directory = directory
+        self.responses = 0
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL) if zstandard is not None else None
+
+    def partition_path(self, endpoint, date):
+        return os.path.join(self.directory, date, f"{endpoint}{ARCHIVE_EXTENSION}")
+
+    def record(self, method, url, body, key=None, payload=None, fetched_at=None):
+        """
+        Appends a raw response to its partition.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Request URL.
+            body (bytes): Raw (decoded) response body.
+            key (str): Optional identifier such as the ticker symbol.
+            payload (object): JSON payload of the request, if any.
+            fetched_at (datetime): Fetch time. Defaults to now.
+        """
+        fetched_at = fetched_at or datetime.now()
+        try:
+            body_text, encoding = body.decode('utf-8'), 'utf-8'
+        except UnicodeDecodeError:
+            body_text, encoding = base64.b64encode(body).decode('ascii'), 'base64'
+        line = json.dumps({
+            'fetched_at': fetched_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'method': method.upper(),
+            'url': url,
+            'key': key,
+            'payload': payload,
+            'encoding': encoding,
+            'body': body_text,
+        }) + '\n'
+        data = line.encode('utf-8')
+        frame = self._compressor.compress(data) if self._compressor is not None else gzip.compress(data)
+
+        path = self.partition_path(archive_endpoint(url), fetched_at.strftime('%Y-%m-%d'))
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'ab') as partition:
+                partition.write(frame)
+            self.responses += 1
+            self.bytes_written += len(frame)
+
+    def partitions(self):
+        """
+        Lists the archive partition files in date order.
+
+        Returns:
+            list: Paths of all partition files.
+        """
+        paths = []
+        if not os.path.isdir(self.directory):
+            return paths
+        for date in sorted(os.listdir(self.directory)):
+            date_dir = os.path.join(self.directory, date)
+            if os.path.isdir(date_dir):
+                paths.extend(
+                    os.path.join(date_dir, name) for name in sorted(os.listdir(date_dir))
+                    if name.endswith(('.jsonl.zst', '.jsonl.gz'))
+                )
+        return paths
+
+
+def partition_endpoint(path):
+    """
+    Returns the endpoint name of a partition file.
+    """
+    return os.path.basename(path).split('.', 1)[0]
+
+
+def read_partition(path):
+    """
+    Reads the archived responses of a partition.
+
+    Args:
+        path (str): Partition file path.
+
+    Yields:
+        dict: Archived response with the body decoded back to bytes under 'body'.
+    """
+    if path.endswith('.zst'):
+        if zstandard is None:
+            raise ImportError(f"zstandard is required to read {path}; install it with 'pip install zstandard'.")
+        raw = open(path, 'rb')
+        stream = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+    else:
+        raw = None
+        stream = gzip.open(path, 'rb')
+
+    with stream:
+        for line in io.TextIOWrapper(stream, encoding='utf-8'):
+            record = json.loads(line)
+            if record['encoding'] == 'base64':
+                record['body'] = base64.b64decode(record['body'])
+            else:
+                record['body'] = record['body'].encode('utf-8')
+            yield record
+    if raw is not None:
+        raw.close()
+
+
+_default_archive = None
+_default_archive_disabled = False
+_default_archive_lock = threading.Lock()
+
+
+def get_default_archive():
+    """
+    Returns the process-wide response archive, creating it on first use.
+
+    Returns:
+        ResponseArchive: The shared archive, or None if archiving was disabled with set_default_archive(None).
+    """
+    global _default_archive
+    with _default_archive_lock:
+        if _default_archive is None and not _default_archive_disabled:
+            _default_archive = ResponseArchive()
+        return _default_archive
+
+
+def set_default_archive(archive):
+    """
+    Replaces the process-wide response archive. Pass None to disable archiving.
+    """
+    global _default_archive, _default_archive_disabled
+    with _default_archive_lock:
+        _default_archive = archive
+        _default_archive_disabled = archive is None
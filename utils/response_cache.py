@@ -0,0 +1,244 @@
+# utils/response_cache.py
+
+import hashlib
+import json
+import re
+import threading
+import time
+from datetime import datetime
+
+from utils.disk_store import DiskStore
+from utils.helpers import MARKET_TIMEZONE
+
+DEFAULT_CACHE_DIR = 'data/http_cache'
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256 MB
+
+# Time-to-live in seconds per endpoint class. None means the response never expires.
+CACHE_TTLS = {
+    'market_watch': 30,  # Intraday quotes
+    'index': 60,  # Index pages and timeseries
+    'price_history': 900,
+    'listings': 3600,  # Listings and defaulters tables
+    'symbols': 86400,
+    'daily_file': None,  # Off-market CSV and constituents XLS of a past date never change
+    'daily_file_today': 300,  # ... but today's file may still be published or replaced
+    'default': 300,
+}
+
+# PSX files published per date, e.g. /download/omts/2024-10-11.csv and /download/indhist/2024-10-11.xls
+DAILY_FILE_PATTERN = re.compile(r'/download/(?:omts|indhist)/(\d{4}-\d{2}-\d{2})\.(?:csv|xls)$')
+
+
+def classify_url(url, today=None):
+    """
+    Maps a URL to its endpoint class in CACHE_TTLS.
+
+    Args:
+        url (str): Request URL.
+        today (str): Today's date as 'YYYY-MM-DD'. Defaults to the current date in Karachi, where PSX
+            publishes the files, so a host ahead of Karachi never treats today's file as final.
+
+    Returns:
+        str: The endpoint class.
+    """
+    match = DAILY_FILE_PATTERN.search(url)
+    if match:
+        today = today or datetime.now(MARKET_TIMEZONE).strftime('%Y-%m-%d')
+        return 'daily_file' if match.group(1) < today else 'daily_file_today'
+    if url.endswith('/market-watch'):
+        return 'market_watch'
+    if '/listings-table/' in url:
+        return 'listings'
+    if url.endswith('/symbols'):
+        return 'symbols'
+    if '/indices/' in url or '/timeseries/' in url:
+        return 'index'
+    if 'SendPostRequest' in url:
+        return 'price_history'
+    return 'default'
+
+
+def ttl_for_url(url):
+    """
+    Returns the time-to-live in seconds for a URL, or None if its response never expires.
+    """
+    return CACHE_TTLS[classify_url(url)]
+
+
+class CacheEntry:
+    """
+    A cached response body with the headers needed to serve and revalidate it.
+    """
+
+    def __init__(self, key, body, headers, expires_at):
+        self.key = key
+        self.body = body
+        self.headers = headers
+        self.expires_at = expires_at
+
+    @property
+    def fresh(self):
+        return self.expires_at is None or time.time() < self.expires_at
+
+    def conditional_headers(self):
+        """
+        Returns the If-None-Match / If-Modified-Since headers for revalidating this entry.
+        """
+        headers = {}
+        if self.headers.get('ETag'):
+            headers['If-None-Match'] = self.headers['ETag']
+        if self.headers.get('Last-Modified'):
+            headers['If-Modified-Since'] = self.headers['Last-Modified']
+        return headers
+
+
+class ResponseCache:
+    """
+    On-disk HTTP response cache keyed by a hash of method, URL and payload.
+
+    Bodies are stored in a utils.disk_store.DiskStore, whose SQLite index also holds the validators
+    and expiry of each entry. Expired entries that carry an ETag or Last-Modified header are
+    revalidated with a conditional request instead of being downloaded again. When the total size
+    exceeds max_bytes the least recently used entries are evicted.
+
+    Args:
+        directory (str): Cache directory.
+        max_bytes (int): Upper bound on the total size of cached bodies.
+    """
+
+    # Response headers kept with each entry
+    STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')  # Bodies are stored decoded
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._store = DiskStore(directory, max_bytes, {'Url': 'TEXT', 'Headers': 'TEXT', 'Expires_At': 'REAL'},
+                                name="Response cache")
+
+    @staticmethod
+    def make_key(method, url, payload=None):
+        """
+        Builds the cache key of a request.
+
+        Args:
+            method (str): HTTP method.
+            url (str): Request URL.
+            payload (object): JSON payload or form data of the request, if any.
+
+        Returns:
+            str: Hex digest identifying the request.
+        """
+        payload_text = json.dumps(payload, sort_keys=True, default=str) if payload is not None else ''
+        return hashlib.sha256(f"{method.upper()} {url}\n{payload_text}".encode('utf-8')).hexdigest()
+
+    def lookup(self, key):
+        """
+        Returns the cached entry for a key, fresh or stale, or None. Fresh entries count as hits;
+        stale entries count as misses unless they are then revalidated.
+        """
+        with self._lock:
+            row = self._store.index.execute("SELECT Headers, Expires_At FROM Entries WHERE Key = ?;", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            try:
+                body = self._store.read(key)
+            except OSError:
+                # Body went missing; drop the index entry and treat it as a miss
+                self._store.delete([key])
+                self.misses += 1
+                return None
+            entry = CacheEntry(key, body, json.loads(row[0]), row[1])
+            if entry.fresh:
+                self.hits += 1
+                self._store.touch(key)
+            else:
+                self.misses += 1
+            return entry
+
+    def store(self, key, url, body, headers, ttl):
+        """
+        Stores a response body and evicts least recently used entries if the cache is over its size bound.
+
+        Args:
+            key (str): Cache key from make_key.
+            url (str): Request URL (kept for inspection).
+            body (bytes): Response body.
+            headers (Mapping): Response headers.
+            ttl (float): Seconds until the entry expires, or None if it never does.
+        """
+        stored_headers = {name: headers[name] for name in self.STORED_HEADERS if headers.get(name)}
+        expires_at = None if ttl is None else time.time() + ttl
+        with self._lock:
+            self._store.write(key, body, Url=url, Headers=json.dumps(stored_headers), Expires_At=expires_at)
+
+    def revalidated(self, key, ttl):
+        """
+        Marks a stale entry as fresh again after the server answered 304 Not Modified.
+        """
+        expires_at = None if ttl is None else time.time() + ttl
+        with self._lock:
+            self.misses -= 1
+            self.revalidations += 1
+            self._store.index.execute("UPDATE Entries SET Expires_At = ?, Last_Access = ? WHERE Key = ?;", (expires_at, time.time(), key))
+            self._store.index.commit()
+
+    def clear(self):
+        """
+        Removes every cached entry.
+        """
+        with self._lock:
+            self._store.clear()
+
+    @property
+    def hit_ratio(self):
+        """
+        Share of lookups served without downloading the body (fresh hits plus 304 revalidations).
+        """
+        lookups = self.hits + self.revalidations + self.misses
+        return (self.hits + self.revalidations) / lookups if lookups else 0.0
+
+    def as_dict(self):
+        with self._lock:
+            entries, size = self._store.totals()
+        return {
+            'hits': self.hits,
+            'revalidations': self.revalidations,
+            'misses': self.misses,
+            'hit_ratio': round(self.hit_ratio, 3),
+            'entries': entries,
+            'bytes': size,
+        }
+
+
+_default_cache = None
+_default_cache_disabled = False
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    """
+    Returns the process-wide response cache, creating it on first use.
+
+    Returns:
+        ResponseCache: The shared cache, or None if caching was disabled with set_default_cache(None).
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None and not _default_cache_disabled:
+            _default_cache = ResponseCache()
+        return _default_cache
+
+
+def set_default_cache(cache):
+    """
+    Replaces the process-wide response cache. Pass None to disable caching (e.g. for benchmarks).
+    """
+    global _default_cache, _default_cache_disabled
+    with _default_cache_lock:
+        _default_cache = cache
+        _default_cache_disabled = cache is None
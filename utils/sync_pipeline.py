@@ -0,0 +1,176 @@
+# utils/sync_pipeline.py
+
+import asyncio
+import inspect
+import logging
+import threading
+import time
+
+from utils.http_client import create_async_session
+
+
+DEFAULT_FETCH_WORKERS = 8
+DEFAULT_NORMALIZE_WORKERS = 4  # Normalization is mostly pandas, which releases the GIL for much of its work
+DEFAULT_QUEUE_SIZE = 16  # Max items buffered between stages; bounds peak memory
+
+# Sentinel passed down the queues once the upstream stage has finished
+_DONE = object()
+# Passed down the queues in place of data for a key whose error has already been recorded
+_FAILED = object()
+
+
+async def run_pipeline(keys, fetch, normalize, write, fetch_workers=DEFAULT_FETCH_WORKERS,
+                       queue_size=DEFAULT_QUEUE_SIZE, progress_callback=None, normalize_workers=DEFAULT_NORMALIZE_WORKERS):
+    """
+    Runs a fetch -> normalize -> write producer/consumer pipeline over the given keys.
+
+    The three stages run concurrently and are connected by bounded asyncio queues, so a slow
+    writer applies backpressure to the fetchers and at most roughly
+    fetch_workers + normalize_workers + 2 * queue_size responses are held in memory at any time,
+    regardless of how many keys are processed. Results are consumed in completion order.
+
+    Args:
+        keys (list): Items to process (e.g. ticker symbols).
+        fetch (callable): Coroutine function (session, key) -> raw data or None. The session is a
+            pooled keep-alive session from utils.http_client shared by all fetch workers.
+        normalize (callable): Function (raw_data, key) -> rows; run in worker threads, so it must be thread-safe.
+        write (callable): Function (rows, key) -> (success, records_added), or an awaitable resolving to it
+            (e.g. a future from the background DatabaseWriter). Awaitable writes are kept in flight
+            concurrently, up to queue_size at a time, so the writer can coalesce them.
+        fetch_workers (int): Number of concurrent fetch workers.
+        queue_size (int): Capacity of each inter-stage queue.
+        progress_callback (callable): Optional callback (completed, total, key) called once per key.
+        normalize_workers (int): Number of concurrent normalize workers.
+
+    Returns:
+        dict: Pipeline summary with 'records_added', 'completed', 'no_data' (keys without data),
+            'errors' (one message per key whose fetch, normalize or write failed), 'elapsed_seconds' and
+            'stage_seconds' ('fetch': time until the last fetch finished, 'normalize': normalize time summed over workers,
+            'drain': time from the last fetch to the last write).
+    """
+    total = len(keys)
+    key_queue = asyncio.Queue()
+    for key in keys:
+        key_queue.put_nowait(key)
+    raw_queue = asyncio.Queue(maxsize=queue_size)
+    row_queue = asyncio.Queue(maxsize=queue_size)
+    loop = asyncio.get_running_loop()
+
+    result = {'records_added': 0, 'completed': 0, 'no_data': [], 'errors': [], 'elapsed_seconds': 0.0}
+    stage_seconds = {'fetch': 0.0, 'normalize': 0.0, 'drain': 0.0}
+    stage_lock = threading.Lock()
+    started_at = time.monotonic()
+
+    def timed_normalize(data, key):
+        normalize_started_at = time.monotonic()
+        try:
+            return normalize(data, key)
+        finally:
+            with stage_lock:
+                stage_seconds['normalize'] += time.monotonic() - normalize_started_at
+
+    async def fetch_worker(session):
+        while True:
+            try:
+                key = key_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                data = await fetch(session, key)
+            except Exception as e:
+                error_msg = f"Exception occurred while fetching data for '{key}': {e}"
+                result['errors'].append(error_msg)
+                logging.error(error_msg)
+                data = _FAILED
+            await raw_queue.put((key, data))
+
+    async def normalize_worker():
+        while True:
+            item = await raw_queue.get()
+            if item is _DONE:
+                # The writer is told once every normalize worker has finished
+                return
+            key, data = item
+            rows = None
+            if data is _FAILED:
+                rows = _FAILED
+            elif data:
+                try:
+                    rows = await loop.run_in_executor(None, timed_normalize, data, key)
+                except Exception as e:
+                    error_msg = f"Failed to normalize data for '{key}': {e}"
+                    result['errors'].append(error_msg)
+                    logging.error(error_msg)
+                    rows = _FAILED
+            await row_queue.put((key, rows))
+
+    def complete(key, outcome):
+        if outcome is _FAILED:
+            pass  # Already recorded in result['errors']
+        elif outcome is None:
+            result['no_data'].append(key)
+        else:
+            success, records_added = outcome
+            if success:
+                result['records_added'] += records_added
+            else:
+                error_msg = f"Failed to insert data for '{key}'."
+                result['errors'].append(error_msg)
+                logging.error(error_msg)
+        result['completed'] += 1
+        if progress_callback:
+            progress_callback(result['completed'], total, key)
+
+    async def await_write(key, pending_write):
+        try:
+            outcome = await pending_write
+        except Exception as e:
+            logging.error(f"Write for '{key}' raised: {e}")
+            outcome = (False, 0)
+        complete(key, outcome)
+
+    async def writer():
+        in_flight = set()
+        while True:
+            item = await row_queue.get()
+            if item is _DONE:
+                break
+            key, rows = item
+            if rows is _FAILED:
+                complete(key, _FAILED)
+                continue
+            if not rows:
+                complete(key, None)
+                continue
+            try:
+                outcome = write(rows, key)
+            except Exception as e:
+                # A failing write must not stop the writer, or the bounded queues fill and the pipeline hangs
+                logging.error(f"Write for '{key}' raised: {e}")
+                outcome = (False, 0)
+            if not inspect.isawaitable(outcome):
+                complete(key, outcome)
+                continue
+            in_flight.add(asyncio.ensure_future(await_write(key, outcome)))
+            if len(in_flight) >= queue_size:
+                _, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+        if in_flight:
+            await asyncio.wait(in_flight)
+
+    async with create_async_session() as session:
+        normalize_tasks = [asyncio.create_task(normalize_worker()) for _ in range(max(1, normalize_workers))]
+        writer_task = asyncio.create_task(writer())
+        await asyncio.gather(*[fetch_worker(session) for _ in range(max(1, min(fetch_workers, total)))])
+        fetched_at = time.monotonic()
+        for _ in normalize_tasks:
+            await raw_queue.put(_DONE)
+        await asyncio.gather(*normalize_tasks)
+        await row_queue.put(_DONE)
+        await writer_task
+
+    finished_at = time.monotonic()
+    stage_seconds['fetch'] = fetched_at - started_at
+    stage_seconds['drain'] = finished_at - fetched_at
+    result['stage_seconds'] = {stage: round(seconds, 3) for stage, seconds in stage_seconds.items()}
+    result['elapsed_seconds'] = round(finished_at - started_at, 3)
+    return result